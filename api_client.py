@@ -1,40 +1,352 @@
 # api_client.py
-import os, time, random
-from typing import Dict, Any
-from openai import OpenAI
-from openai import RateLimitError, APIError, APIConnectionError, APITimeoutError
+from __future__ import annotations
+import os, time, random, asyncio, hashlib, threading, logging
+from typing import Dict, Any, Tuple, Iterator, TYPE_CHECKING
+from circuit_breaker import get_breaker, OPEN
+from rate_limiter import get_rate_limiter, estimate_tokens, INTERACTIVE
+
+# openai + httpx take ~0.4s to import; they load with the first client instead of at app start
+if TYPE_CHECKING:
+    import httpx
+    from openai import OpenAI, AsyncOpenAI
+
+logger = logging.getLogger("talentscout.api")
 
 OPENAI_MODEL_DEFAULT = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+POOL_MAX_CONNECTIONS = int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", "10"))
+# Total wall-clock budget for one chat() call, retries and backoffs included
+CHAT_DEADLINE = float(os.getenv("CHAT_DEADLINE", "12"))
+
+BREAKER = get_breaker("openai")
+LIMITER = get_rate_limiter()
 
 def _jittered_backoff(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
     return min(cap, base * (2 ** attempt)) + random.uniform(0, 0.25)
 
+# ---------- Process-wide pooled clients ----------
+class ClientManager:
+    """
+    Keeps long-lived OpenAI clients (and their HTTP connection pools) keyed by
+    base URL, API key and timeout. Async clients are additionally keyed by event
+    loop, since an httpx.AsyncClient cannot be shared across loops.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync: Dict[Tuple, OpenAI] = {}
+        self._async: Dict[Tuple, Tuple[asyncio.AbstractEventLoop, AsyncOpenAI]] = {}
+        self._stats = {"clients_created": 0, "client_reuses": 0, "requests": 0, "connections_opened": 0}
+
+    @staticmethod
+    def _key(base_url: str | None, api_key: str | None, timeout: float) -> Tuple:
+        base_url = base_url or os.getenv("OPENAI_BASE_URL") or ""
+        api_key = api_key or os.getenv("OPENAI_API_KEY") or ""
+        # Never keep the raw key around in dict keys or stats
+        return base_url, hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16], float(timeout)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _limits(self) -> httpx.Limits:
+        import httpx
+        return httpx.Limits(max_connections=POOL_MAX_CONNECTIONS,
+                            max_keepalive_connections=POOL_MAX_KEEPALIVE)
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._count("connections_opened")
+
+    async def _atrace(self, event_name: str, info: Dict[str, Any]) -> None:
+        self._trace(event_name, info)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        request.extensions["trace"] = self._trace
+        self._count("requests")
+
+    async def _on_arequest(self, request: httpx.Request) -> None:
+        request.extensions["trace"] = self._atrace
+        self._count("requests")
+
+    def get(self, base_url: str | None = None, api_key: str | None = None, timeout: float = 30) -> OpenAI:
+        key = self._key(base_url, api_key, timeout)
+        with self._lock:
+            client = self._sync.get(key)
+            if client is not None:
+                self._stats["client_reuses"] += 1
+                return client
+            from openai import OpenAI, DefaultHttpxClient
+            # Retries are owned by chat()/achat() so they can respect the deadline
+            client = OpenAI(
+                api_key=api_key, base_url=base_url or None, timeout=timeout, max_retries=0,
+                http_client=DefaultHttpxClient(limits=self._limits(),
+                                               event_hooks={"request": [self._on_request]}),
+            )
+            self._sync[key] = client
+            self._stats["clients_created"] += 1
+            return client
+
+    def get_async(self, base_url: str | None = None, api_key: str | None = None, timeout: float = 30) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        key = self._key(base_url, api_key, timeout) + (id(loop),)
+        with self._lock:
+            # Drop clients whose loop has gone away (e.g. finished asyncio.run calls)
+            for k in [k for k, (lp, _) in self._async.items() if lp.is_closed()]:
+                self._async.pop(k, None)
+            hit = self._async.get(key)
+            if hit is not None and hit[0] is loop:
+                self._stats["client_reuses"] += 1
+                return hit[1]
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+            client = AsyncOpenAI(
+                api_key=api_key, base_url=base_url or None, timeout=timeout, max_retries=0,
+                http_client=DefaultAsyncHttpxClient(limits=self._limits(),
+                                                    event_hooks={"request": [self._on_arequest]}),
+            )
+            self._async[key] = (loop, client)
+            self._stats["clients_created"] += 1
+            return client
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "sync_clients": len(self._sync), "async_clients": len(self._async)}
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._sync = list(self._sync.values()), {}
+            async_clients, self._async = list(self._async.values()), {}
+        for c in clients:
+            try:
+                c.close()
+            except Exception:
+                pass
+        # An async client can only be closed on its own loop; one whose loop is gone has nothing left to close
+        for loop, c in async_clients:
+            try:
+                if loop.is_closed():
+                    continue
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(c.close(), loop)
+                else:
+                    loop.run_until_complete(c.close())
+            except Exception:
+                pass
+
+CLIENTS = ClientManager()
+
+def client_stats() -> Dict[str, int]:
+    return CLIENTS.stats()
+
+# ---------- Result contract (public: other providers such as cassette.py return the same shape) ----------
+def ok_result(content: str) -> Dict[str, Any]:
+    return {"ok": True, "content": content, "insufficient_quota": False, "error": ""}
+
+def fail_result(error: str, insufficient_quota: bool = False) -> Dict[str, Any]:
+    return {"ok": False, "content": None, "insufficient_quota": insufficient_quota, "error": error}
+
+def _classify(e: Exception) -> Dict[str, Any] | None:
+    # None means "retry after backoff"; a dict is a final result
+    from openai import RateLimitError, APIError, APIConnectionError, APITimeoutError
+    if isinstance(e, RateLimitError):
+        msg = str(e).lower()
+        if "insufficient_quota" in msg or "exceeded your current quota" in msg:
+            return fail_result("insufficient_quota", insufficient_quota=True)
+        return None
+    if isinstance(e, (APIError, APIConnectionError, APITimeoutError)):
+        return None
+    return fail_result(str(e))
+
+def _throttled(e: Exception) -> bool:
+    from openai import RateLimitError
+    return isinstance(e, RateLimitError)
+
+def _usage(resp: Any) -> int | None:
+    return getattr(getattr(resp, "usage", None), "total_tokens", None)
+
+def _record(final: Dict[str, Any] | None) -> None:
+    # Retryable errors and exhausted quota mean the provider is unusable right now
+    if final is None or final["insufficient_quota"]:
+        BREAKER.record_failure()
+    else:
+        BREAKER.release()
+
+class ChatStreamError(RuntimeError):
+    pass
+
 def chat(messages: list[Dict[str, Any]],
          model: str | None = None,
          temperature: float = 0.2,
          timeout: int = 30,
-         max_tries: int = 5) -> Dict[str, Any]:
-    client = OpenAI()
+         max_tries: int = 5,
+         deadline: float | None = None,
+         priority: int = INTERACTIVE) -> Dict[str, Any]:
+    """
+    One completion within the deadline. Every attempt first queues for the shared
+    RPM/TPM budget at `priority` (rate_limiter.INTERACTIVE or BACKGROUND).
+    """
     model = model or OPENAI_MODEL_DEFAULT
-    
+    budget_end = time.monotonic() + (CHAT_DEADLINE if deadline is None else deadline)
+    tokens, prompt = estimate_tokens(messages), estimate_tokens(messages, completion=0)
+
     for i in range(max_tries):
+        if budget_end - time.monotonic() <= 0:
+            return fail_result("deadline_exceeded")
+        if not BREAKER.allow():
+            return fail_result("circuit_open")
+        if not LIMITER.acquire(tokens, priority, deadline=budget_end):
+            BREAKER.release()
+            return fail_result("rate_limited")
+        remaining = budget_end - time.monotonic()
+        actual = prompt  # an attempt that gets no completion back is charged its prompt only
         try:
+            client = CLIENTS.get(timeout=timeout)
             resp = client.chat.completions.create(
                 model=model,
                 temperature=temperature,
                 messages=messages,
-                timeout=timeout,
+                timeout=min(timeout, remaining),
+            )
+            BREAKER.record_success()
+            actual = _usage(resp) or tokens
+            return ok_result(resp.choices[0].message.content)
+        except Exception as e:
+            final = _classify(e)
+            _record(final)
+            if final is not None:
+                return final
+            if BREAKER.state == OPEN:
+                return fail_result("circuit_open")
+            pause = _jittered_backoff(i)
+            if time.monotonic() + pause >= budget_end:
+                return fail_result("deadline_exceeded")
+            if _throttled(e):
+                # Pause every queued caller, not just this one; the next acquire() waits it out
+                LIMITER.hold(pause)
+            else:
+                time.sleep(pause)
+        finally:
+            LIMITER.settle(tokens, actual)
+
+    return fail_result("max_retries")
+
+async def achat(messages: list[Dict[str, Any]],
+                model: str | None = None,
+                temperature: float = 0.2,
+                timeout: int = 30,
+                max_tries: int = 5,
+                deadline: float | None = None,
+                priority: int = INTERACTIVE) -> Dict[str, Any]:
+    model = model or OPENAI_MODEL_DEFAULT
+    budget_end = time.monotonic() + (CHAT_DEADLINE if deadline is None else deadline)
+    tokens, prompt = estimate_tokens(messages), estimate_tokens(messages, completion=0)
+
+    for i in range(max_tries):
+        if budget_end - time.monotonic() <= 0:
+            return fail_result("deadline_exceeded")
+        if not BREAKER.allow():
+            return fail_result("circuit_open")
+        if not await LIMITER.aacquire(tokens, priority, deadline=budget_end):
+            BREAKER.release()
+            return fail_result("rate_limited")
+        remaining = budget_end - time.monotonic()
+        actual = prompt  # an attempt that gets no completion back is charged its prompt only
+        try:
+            client = CLIENTS.get_async(timeout=timeout)
+            resp = await client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                messages=messages,
+                timeout=min(timeout, remaining),
             )
-            content = resp.choices[0].message.content
-            return {"ok": True, "content": content, "insufficient_quota": False, "error": ""}
-        except RateLimitError as e:
-            msg = str(e).lower()
-            if "insufficient_quota" in msg or "exceeded your current quota" in msg:
-                return {"ok": False, "content": None, "insufficient_quota": True, "error": "insufficient_quota"}
-            time.sleep(_jittered_backoff(i))
-        except (APIError, APIConnectionError, APITimeoutError):
-            time.sleep(_jittered_backoff(i))
+            BREAKER.record_success()
+            actual = _usage(resp) or tokens
+            return ok_result(resp.choices[0].message.content)
         except Exception as e:
-            return {"ok": False, "content": None, "insufficient_quota": False, "error": str(e)}
-    
-    return {"ok": False, "content": None, "insufficient_quota": False, "error": "max_retries"}
\ No newline at end of file
+            final = _classify(e)
+            _record(final)
+            if final is not None:
+                return final
+            if BREAKER.state == OPEN:
+                return fail_result("circuit_open")
+            pause = _jittered_backoff(i)
+            if time.monotonic() + pause >= budget_end:
+                return fail_result("deadline_exceeded")
+            if _throttled(e):
+                await LIMITER.ahold(pause)
+            else:
+                await asyncio.sleep(pause)
+        finally:
+            await LIMITER.asettle(tokens, actual)
+
+    return fail_result("max_retries")
+
+def chat_stream(messages: list[Dict[str, Any]],
+                model: str | None = None,
+                temperature: float = 0.2,
+                timeout: int = 30,
+                max_tries: int = 3,
+                deadline: float | None = None,
+                priority: int = INTERACTIVE) -> Iterator[str]:
+    """
+    Yields content deltas as they arrive. Retries (within the deadline) only happen
+    before the first delta; failures raise ChatStreamError with the same error codes
+    chat() reports. However the attempt ends, the rate limiter is settled with the
+    usage the provider reported, or an estimate from the prompt and streamed text.
+    """
+    model = model or OPENAI_MODEL_DEFAULT
+    budget_end = time.monotonic() + (CHAT_DEADLINE if deadline is None else deadline)
+    tokens = estimate_tokens(messages)
+
+    for i in range(max_tries):
+        if budget_end - time.monotonic() <= 0:
+            raise ChatStreamError("deadline_exceeded")
+        if not BREAKER.allow():
+            raise ChatStreamError("circuit_open")
+        if not LIMITER.acquire(tokens, priority, deadline=budget_end):
+            BREAKER.release()
+            raise ChatStreamError("rate_limited")
+        remaining = budget_end - time.monotonic()
+        started, chars, usage = False, 0, None
+        try:
+            client = CLIENTS.get(timeout=timeout)
+            stream = client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                messages=messages,
+                timeout=min(timeout, remaining),
+                stream=True,
+            )
+            for chunk in stream:
+                usage = _usage(chunk) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    started = True
+                    chars += len(delta)
+                    yield delta
+            BREAKER.record_success()
+            return
+        except GeneratorExit:
+            # Consumer stopped early; the provider did answer
+            BREAKER.record_success()
+            raise
+        except Exception as e:
+            final = _classify(e)
+            _record(final)
+            if started:
+                raise ChatStreamError(str(e)) from e
+            if final is not None:
+                raise ChatStreamError(final["error"]) from e
+            if BREAKER.state == OPEN:
+                raise ChatStreamError("circuit_open") from e
+            pause = _jittered_backoff(i)
+            if time.monotonic() + pause >= budget_end:
+                raise ChatStreamError("deadline_exceeded") from e
+            if _throttled(e):
+                LIMITER.hold(pause)
+            else:
+                time.sleep(pause)
+        finally:
+            LIMITER.settle(tokens, usage or estimate_tokens(messages, completion=chars // 4))
+
+    raise ChatStreamError("max_retries")
\ No newline at end of file
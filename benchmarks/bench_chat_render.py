@@ -0,0 +1,78 @@
+# benchmarks/bench_chat_render.py
+"""
+Rerun time of the chat view at 50/200/1000 messages: every message as a live
+chat bubble (previous show_chat) vs the windowed renderer in chat_view.
+
+    python benchmarks/bench_chat_render.py [--sizes 50 200 1000] [--reruns 10]
+
+Each rerun goes through Streamlit's AppTest, so the time includes building and
+serialising the page elements, not just the Python loop.
+"""
+import os, sys, time, argparse, statistics, tempfile, textwrap
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+SCRIPT = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, {root!r})
+    import streamlit as st
+
+    def legacy_badge(sent):
+        label, score = sent.get("label", "neutral"), sent.get("score", 0.5)
+        cls = "pos" if label == "positive" else "neg" if label == "negative" else "neu"
+        return f"  <span class='badge {{cls}}'>sentiment: {{label}} · {{score}}</span>"
+
+    def legacy_show_chat(messages):
+        for m in messages:
+            with st.chat_message(m["role"]):
+                if m["role"] == "user" and m.get("meta") and m["meta"].get("sentiment"):
+                    st.markdown(f"{{m['content']}}{{legacy_badge(m['meta']['sentiment'])}}", unsafe_allow_html=True)
+                else:
+                    st.markdown(m["content"])
+
+    if "messages" not in st.session_state:
+        st.session_state.messages = [
+            {{"role": "user", "content": f"Answer {{i}}: I would use an index and cache the hot keys.",
+              "meta": {{"sentiment": {{"label": ("positive", "neutral", "negative")[i % 3], "score": 0.7}}}}}}
+            if i % 2 else
+            {{"role": "assistant", "content": f"Q{{i}}. [Python, intermediate] How would you profile a slow endpoint?",
+              "meta": {{}}}}
+            for i in range({n})
+        ]
+    if {windowed!r}:
+        from chat_view import render_chat
+        render_chat(st.session_state.messages)
+    else:
+        legacy_show_chat(st.session_state.messages)
+""")
+
+def measure(n: int, windowed: bool, reruns: int) -> float:
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(SCRIPT.format(root=ROOT, n=n, windowed=windowed))
+        path = f.name
+    try:
+        at = AppTest.from_file(path, default_timeout=120).run()  # first run seeds state
+        times = []
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - t0)
+        return statistics.median(times)
+    finally:
+        os.remove(path)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    ap.add_argument("--reruns", type=int, default=10)
+    args = ap.parse_args()
+    print(f"{'messages':>8}  {'legacy ms':>10}  {'windowed ms':>11}  speedup")
+    for n in args.sizes:
+        legacy = measure(n, False, args.reruns)
+        windowed = measure(n, True, args.reruns)
+        print(f"{n:>8}  {legacy * 1e3:>10.1f}  {windowed * 1e3:>11.1f}  {legacy / windowed:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_country_index.py
+"""
+Throughput of country resolution: CountryIndex vs the previous per-call fuzzy scan.
+
+    python benchmarks/bench_country_index.py [--n 100000]
+"""
+import os, sys, time, random, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycountry
+from rapidfuzz import process, fuzz
+from country_index import CountryIndex, COUNTRY_ALIASES_PATH
+
+COUNTRIES = [c.name for c in pycountry.countries]
+
+def legacy_resolve(raw: str):
+    # Previous main_app path: fuzzy scan over every name, then pycountry's own lookup
+    cand, score, _ = process.extractOne(raw.strip(), COUNTRIES, scorer=fuzz.WRatio)
+    fixed = cand if score >= 90 else raw
+    try:
+        c = pycountry.countries.lookup(fixed)
+        return c.name, c.alpha_2
+    except LookupError:
+        return None
+
+def workload(n: int, rng: random.Random):
+    pool = ["India", "india", "IN", "IND", "United States", "USA", "UK", "Bharat", "Germany", "germny",
+            "Bangladesh", "Untied States", "Narnia", "Viet Nam", "Brasil", "Japan", "jp", "France"]
+    return [rng.choice(pool) for _ in range(n)]
+
+def run(fn, inputs):
+    t0 = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--legacy-n", type=int, default=5_000, help="legacy path is slow; extrapolated to --n")
+    args = ap.parse_args()
+    rng = random.Random(11)
+
+    t0 = time.perf_counter()
+    index = CountryIndex.from_file(COUNTRY_ALIASES_PATH)
+    build = time.perf_counter() - t0
+
+    inputs = workload(args.n, rng)
+    new_t = run(index.resolve, inputs)
+    legacy_t = run(legacy_resolve, inputs[:args.legacy_n]) * args.n / args.legacy_n
+
+    print(f"index build: {build*1e3:.1f} ms, {len(index.by_key)} keys")
+    print(f"{args.n} lookups  index: {new_t:.3f}s ({args.n/new_t:,.0f}/s)  "
+          f"legacy (extrapolated): {legacy_t:.2f}s ({args.n/legacy_t:,.0f}/s)  speedup {legacy_t/new_t:.0f}x")
+    print(f"index stats: {index.stats}")
+
+if __name__ == "__main__":
+    main()
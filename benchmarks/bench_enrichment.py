@@ -0,0 +1,87 @@
+# benchmarks/bench_enrichment.py
+"""
+Per-turn NLP overhead on the request thread: the previous detect_language +
+analyze_sentiment pair vs the enrichment engine (sync and ENRICH_ASYNC).
+
+    python benchmarks/bench_enrichment.py [--sessions 200]
+
+Each session replays a typical screening transcript (consent, contact fields,
+stack, free-text answers); answers vary per session, field replies repeat.
+"""
+import os, sys, time, random, argparse, statistics
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enrichment import Enricher
+
+def legacy_pair():
+    # Previous text_utils path: module-level langdetect.detect (unseeded) + VADER
+    from langdetect import detect
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    analyzer = SentimentIntensityAnalyzer()
+
+    def turn(text: str):
+        try:
+            lang = detect(text)
+        except Exception:
+            lang = "en"
+        comp = analyzer.polarity_scores(text)["compound"]
+        return lang, comp
+    return turn
+
+ANSWERS = [
+    "I would add an index on the foreign key and check the query plan before and after.",
+    "Use a connection pool and keep transactions short so locks are released quickly.",
+    "Honestly I am not sure, I have not worked with that part of Django much.",
+    "Profile first with cProfile, then cache the expensive calls and batch the database writes.",
+    "A goroutine leak usually comes from a blocked channel; I would add context cancellation.",
+    "This was a frustrating bug, the retries kept hammering the service until it fell over.",
+]
+
+def transcript(rng: random.Random, i: int):
+    return ["yes", f"Candidate {i} Sharma", f"cand{i}@example.com", f"+9198765{i:05d}"[:13], str(rng.randint(0, 15)),
+            "Backend Engineer; ML Engineer", "Pune, India", "Python, Django, PostgreSQL, Docker",
+            *rng.sample(ANSWERS, 4), f"{rng.choice(ANSWERS)} (session {i})", "exit"]
+
+def timed(fn, turns):
+    per = []
+    for t in turns:
+        t0 = time.perf_counter()
+        fn(t)
+        per.append(time.perf_counter() - t0)
+    return per
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=200)
+    args = ap.parse_args()
+    rng = random.Random(7)
+    turns = [t for i in range(args.sessions) for t in transcript(rng, i)]
+
+    legacy = legacy_pair()
+    legacy(turns[0])  # load profiles outside the timing, as a warm process would have
+    eng = Enricher()
+    eng.language("warm up the detector profiles"), eng.sentiment("warm up")
+    eng_async = Enricher()
+    eng_async.language("warm up the detector profiles"), eng_async.sentiment("warm up")
+
+    rows = [
+        ("legacy detect + sentiment", timed(legacy, turns)),
+        ("enrichment, sync", timed(lambda t: (eng.language(t), eng.sentiment(t)), turns)),
+        ("enrichment, ENRICH_ASYNC", timed(lambda t: (eng_async.language(t), eng_async.submit_sentiment(t)), turns)),
+    ]
+    print(f"{len(turns)} turns over {args.sessions} sessions")
+    print(f"{'path':<28} {'mean us':>9} {'p50 us':>8} {'p95 us':>8} {'total ms':>9}")
+    for name, per in rows:
+        per_sorted = sorted(per)
+        print(f"{name:<28} {statistics.mean(per) * 1e6:>9.0f} {per_sorted[len(per) // 2] * 1e6:>8.0f} "
+              f"{per_sorted[int(len(per) * 0.95)] * 1e6:>8.0f} {sum(per) * 1e3:>9.1f}")
+    print("enrichment stats:", eng.stats)
+
+    # Same text, repeated: the unseeded detector may disagree with itself
+    probe = "Python Django Docker"
+    legacy_langs = {legacy(probe)[0] for _ in range(30)}
+    fresh = [Enricher().language(probe) for _ in range(30)]
+    print(f"'{probe}' x30 -> legacy {sorted(legacy_langs)}, enrichment {sorted(set(fresh))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_json_extract.py
+"""
+Micro-benchmark: single-pass extract_first_json_object vs the previous regex/json.loads cascade.
+
+    python benchmarks/bench_json_extract.py [--repeat 20]
+"""
+import os, sys, json, re, time, random, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_utils import extract_first_json_object, _ensure_text
+
+def legacy_extract(text):
+    # Verbatim copy of the implementation replaced in text_utils
+    if isinstance(text, dict):
+        return text
+    if isinstance(text, list):
+        return {"questions": text} if any(isinstance(i, dict) and "question" in i for i in text) else {"items": text}
+    if text is None:
+        return {}
+    s = _ensure_text(text)
+    m = re.search(r"``````", s, flags=re.DOTALL)
+    if not m:
+        m = re.search(r"(\{.*?\}|\[.*?\])", s, flags=re.DOTALL)
+    candidate = m.group(1) if m else s
+    try:
+        parsed = json.loads(candidate)
+        if isinstance(parsed, list):
+            return {"questions": parsed} if any(isinstance(i, dict) and "question" in i for i in parsed) else {"items": parsed}
+        if isinstance(parsed, dict):
+            return parsed
+    except Exception:
+        pass
+    try:
+        parsed = json.loads(s)
+        if isinstance(parsed, list):
+            return {"questions": parsed} if any(isinstance(i, dict) and "question" in i for i in parsed) else {"items": parsed}
+        if isinstance(parsed, dict):
+            return parsed
+    except Exception:
+        pass
+    try:
+        inner = json.loads(candidate)
+        if isinstance(inner, (str, bytes, bytearray)):
+            parsed = json.loads(_ensure_text(inner))
+            if isinstance(parsed, list):
+                return {"questions": parsed} if any(isinstance(i, dict) and "question" in i for i in parsed) else {"items": parsed}
+            if isinstance(parsed, dict):
+                return parsed
+        if isinstance(inner, dict):
+            return inner
+        if isinstance(inner, list):
+            return {"questions": inner} if any(isinstance(i, dict) and "question" in i for i in inner) else {"items": inner}
+    except Exception:
+        return {}
+    return {}
+
+def _questions(n: int, rng: random.Random):
+    topics = ["Python", "Django", "PostgreSQL", "Docker", "React", "Kubernetes"]
+    return [{"topic": rng.choice(topics),
+             "question": f"Explain case {i}: how would you handle {{state}} and [edge] cases? " + "detail " * rng.randint(5, 40),
+             "difficulty": rng.choice(["beginner", "intermediate", "advanced"]),
+             "meta": {"tags": ["a", "b"], "score": {"min": 0, "max": 10}}}
+            for i in range(n)]
+
+def corpus(rng: random.Random):
+    prose = "Sure! Below are the questions you asked for. " * 20
+    out = {}
+    for n in (10, 100, 1000):
+        body = json.dumps({"questions": _questions(n, rng)}, indent=2)
+        out[f"plain/{n}"] = body
+        out[f"prose+fence/{n}"] = f"{prose}\n```json\n{body}\n```\nLet me know if you need more."
+        out[f"prose+inline/{n}"] = f"{prose}{body} Hope this helps."
+        out[f"brackets+inline/{n}"] = f"See [1] and {{docs}} first. {body}"
+        out[f"truncated/{n}"] = f"{prose}{body[: len(body) * 9 // 10]}"
+    return out
+
+def bench(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best, bool(res.get("questions")) and len(res["questions"]) > 1
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    rng = random.Random(7)
+    print(f"{'case':<20}{'size KB':>9}{'legacy ms':>12}{'ok':>5}{'new ms':>10}{'ok':>5}{'speedup':>9}")
+    for name, text in corpus(rng).items():
+        lt, lok = bench(legacy_extract, text, args.repeat)
+        nt, nok = bench(extract_first_json_object, text, args.repeat)
+        print(f"{name:<20}{len(text)/1024:>9.1f}{lt*1e3:>12.3f}{'y' if lok else 'n':>5}"
+              f"{nt*1e3:>10.3f}{'y' if nok else 'n':>5}{lt/nt:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
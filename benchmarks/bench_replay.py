@@ -0,0 +1,117 @@
+# benchmarks/bench_replay.py
+"""
+Deterministic, offline regression run of the provider-facing paths, served from
+a cassette (PROVIDER=cassette, see cassette.py).
+
+    python benchmarks/bench_replay.py --record [--spawn-fake]      # capture once (OPENAI_* env or the stand-in)
+    python benchmarks/bench_replay.py [--cassette PATH] [--latency-scale 0] [--save run.json] [--compare old.json]
+
+Workload: every stack in STACKS through generate_questions, then every question
+against each of ANSWERS through grade_answer, with the grading band widened so
+all of them go to the provider. Reported per stage: calls, parse success (no
+fallback), p50/p95 latency; then extract_first_json_object over every recorded
+reply, and cassette hits/misses. Prompt changes alter the messages and so their
+keys: replaying an older cassette shows them as misses. Record one cassette per
+prompt version and compare the saved summaries.
+"""
+import os, sys, json, time, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STACKS = [
+    {"languages": ["Python"], "frameworks": ["Django"], "databases": ["PostgreSQL"], "tools": ["Docker"]},
+    {"languages": ["Java"], "frameworks": ["Spring"], "databases": ["MySQL"], "tools": ["Kubernetes"]},
+    {"languages": ["JavaScript"], "frameworks": ["React"], "databases": ["MongoDB"], "tools": []},
+    {"languages": ["Go"], "frameworks": [], "databases": ["Redis"], "tools": ["Terraform"]},
+]
+ANSWERS = [
+    "A generator uses yield to produce values lazily, for example streaming a large file line by line without loading it.",
+    "I would profile first, add an index for the slow query and cache the hot read path with a short TTL.",
+    "Not sure.",
+]
+
+def _configure_env(args) -> None:
+    # Read by llm_service / grading_cascade / cassette at import
+    os.environ["PROVIDER"] = "cassette"
+    os.environ["CASSETTE_MODE"] = "record" if args.record else "replay"
+    os.environ["CASSETTE_LATENCY_SCALE"] = str(args.latency_scale)
+    if args.cassette:
+        os.environ["CASSETTE_PATH"] = args.cassette
+    os.environ["QUESTION_CACHE"] = "false"
+    os.environ["EVAL_ANSWERS"] = "true"
+    os.environ["GRADE_BAND_LOW"], os.environ["GRADE_BAND_HIGH"] = "0", "1.01"
+
+def _summary(xs, ok: int) -> dict:
+    xs = sorted(xs)
+    if not xs:
+        return {"calls": 0}
+    return {"calls": len(xs), "parse_ok": round(ok / len(xs), 3),
+            "p50_ms": round(xs[len(xs) // 2] * 1e3, 2), "p95_ms": round(xs[int(len(xs) * 0.95)] * 1e3, 2)}
+
+def run(args) -> dict:
+    from llm_service import generate_questions, grade_answer
+    from text_utils import extract_first_json_object
+    from cassette import get_cassette
+
+    q_times, q_ok, g_times, g_ok, questions = [], 0, [], 0, []
+    for stack in STACKS:
+        t0 = time.perf_counter()
+        qs, err = generate_questions(stack, "en")
+        q_times.append(time.perf_counter() - t0)
+        q_ok += not err
+        questions += qs
+    for q in questions:
+        for a in ANSWERS:
+            t0 = time.perf_counter()
+            g = grade_answer(q, a, language="en")
+            g_times.append(time.perf_counter() - t0)
+            g_ok += g.get("tier") == "llm"
+
+    cas = get_cassette()
+    cas.flush()
+    replies = [e["content"] for e in cas.entries()]
+    x_ok, t0 = 0, time.perf_counter()
+    for _ in range(args.repeat):
+        x_ok = sum(1 for r in replies if extract_first_json_object(r))
+    x_us = (time.perf_counter() - t0) / max(len(replies) * args.repeat, 1) * 1e6
+    return {"questions": _summary(q_times, q_ok), "grades": _summary(g_times, g_ok),
+            "extract": {"replies": len(replies), "parse_ok": round(x_ok / max(len(replies), 1), 3),
+                        "us_per_reply": round(x_us, 2)},
+            "cassette": cas.snapshot()}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--record", action="store_true", help="call the real provider and record its replies")
+    ap.add_argument("--spawn-fake", action="store_true", help="record against tools/fake_llm_server.py in-process")
+    ap.add_argument("--cassette", default="", help="cassette file (default CASSETTE_PATH)")
+    ap.add_argument("--latency-scale", type=float, default=0.0, help="replay recorded latency x scale")
+    ap.add_argument("--repeat", type=int, default=20, help="extract_first_json_object passes")
+    ap.add_argument("--save", default="", help="write the summary as JSON")
+    ap.add_argument("--compare", default="", help="print deltas against a saved summary")
+    args = ap.parse_args()
+
+    if args.spawn_fake:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+        from fake_llm_server import FakeProvider, serve
+        httpd = serve(FakeProvider(latency="lognormal:300,0.4"), "127.0.0.1", 0)
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    _configure_env(args)
+
+    out = run(args)
+    for stage in ("questions", "grades", "extract"):
+        print(f"{stage:<10} " + " · ".join(f"{k} {v}" for k, v in out[stage].items()))
+    print("cassette   " + " · ".join(f"{k} {v}" for k, v in out["cassette"].items()))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        for stage in ("questions", "grades", "extract"):
+            for k, v in out[stage].items():
+                prev = old.get(stage, {}).get(k)
+                if isinstance(v, (int, float)) and isinstance(prev, (int, float)) and prev != v:
+                    print(f"  {stage}.{k}: {prev} -> {v} ({v - prev:+.3f})")
+
+if __name__ == "__main__":
+    main()
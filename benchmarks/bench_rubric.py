@@ -0,0 +1,88 @@
+# benchmarks/bench_rubric.py
+"""
+Offline grading fallback: the previous _heuristic_grade vs the compiled rubric engine.
+
+    python benchmarks/bench_rubric.py [--pairs 20000]
+
+Questions are spread over every topic in the tech vocabulary; answers mix
+on-topic keywords, filler prose and repeated short replies. Also reports how
+many topics each version has a keyword list for.
+"""
+import os, sys, time, json, random, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rubric_engine import RubricEngine, RUBRIC_PATH
+from stack_matcher import TECH_VOCAB_PATH
+
+def legacy_grade(question, answer):
+    # Copy of the previous llm_service._heuristic_grade
+    topic = (question.get("topic") or "").lower()
+    text = " " + (answer or "").lower() + " "
+    KEYWORDS = {
+        "python": ["function", "class", "list", "dict", "loop", "with", "context", "generator", "example"],
+        "django": ["model", "view", "template", "orm", "queryset", "middleware", "settings", "migration"],
+        "react": ["state", "props", "hook", "component", "useeffect", "memo", "render", "jsx"],
+        "sql": ["select", "join", "index", "transaction", "foreign key", "where", "group by", "explain"],
+        "docker": ["image", "container", "dockerfile", "build", "compose", "registry", "volume", "network"],
+        "kubernetes": ["pod", "deployment", "service", "ingress", "namespace", "cluster", "helm", "scaling"],
+        "pytorch": ["tensor", "autograd", "module", "optimizer", "dataset", "dataloader", "backward"],
+    }
+    kws = KEYWORDS.get(topic, [])
+    hits = sum(1 for k in kws if k in text)
+    verdict = "pass" if hits >= 2 or len(answer.strip()) >= 80 else "needs_improvement"
+    return {"verdict": verdict}
+
+FILLER = ("I think in my last project we had to deal with this when the team grew and the "
+          "service started to get more traffic than we planned for").split()
+
+def workload(n: int, rng: random.Random):
+    topics = [t for cat in json.load(open(TECH_VOCAB_PATH, encoding="utf-8"))["categories"].values() for t in cat]
+    rubric = {t: list(kws) for t, kws in json.load(open(RUBRIC_PATH, encoding="utf-8"))["topics"].items()}
+    pairs = []
+    for i in range(n):
+        t = rng.choice(topics)
+        if i % 10 == 0:
+            answer = "not sure"
+        else:
+            words = rng.sample(FILLER, rng.randint(5, 20)) + rng.sample(rubric[t], min(len(rubric[t]), rng.randint(0, 5)))
+            rng.shuffle(words)
+            answer = " ".join(words)
+        pairs.append(({"topic": t, "difficulty": rng.choice(["beginner", "intermediate", "advanced"])}, answer))
+    return topics, pairs
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=20000)
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    engine = RubricEngine.from_file()
+    compile_ms = (time.perf_counter() - t0) * 1e3
+    topics, pairs = workload(args.pairs, random.Random(7))
+
+    t0 = time.perf_counter()
+    old = [legacy_grade(q, a) for q, a in pairs]
+    t_old = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = [engine.grade(q, a) for q, a in pairs]
+    t_new = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    engine.grade_batch(pairs)
+    t_batch = time.perf_counter() - t0
+
+    legacy_topics = {"python", "django", "react", "sql", "docker", "kubernetes", "pytorch"}
+    print(f"{len(pairs)} pairs over {len(topics)} topics; rubric compiled in {compile_ms:.1f} ms "
+          f"({len(engine.keywords)} keywords)")
+    print(f"{'grader':<24} {'us/pair':>8} {'pass rate':>10} {'topics with keywords':>21}")
+    print(f"{'legacy heuristic':<24} {t_old / len(pairs) * 1e6:>8.1f} "
+          f"{sum(g['verdict'] == 'pass' for g in old) / len(old):>10.1%} "
+          f"{sum(t.lower() in legacy_topics for t in topics):>21}")
+    print(f"{'rubric engine':<24} {t_new / len(pairs) * 1e6:>8.1f} "
+          f"{sum(g['verdict'] == 'pass' for g in new) / len(new):>10.1%} "
+          f"{sum(engine.topic_index(t) is not None for t in topics):>21}")
+    print(f"{'rubric grade_batch':<24} {t_batch / len(pairs) * 1e6:>8.1f}")
+    # Short non-answers should never pass on length or substrings
+    fails = sum(g["verdict"] == "pass" for (q, a), g in zip(pairs, new) if a == "not sure")
+    print(f"'not sure' answers passed: rubric {fails}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_sessions.py
+"""
+Headless throughput of the interview core: many InterviewSession objects in one
+process, no Streamlit, no event log, no LLM (PROVIDER=offline, so questions come
+from the fallback set and answers are graded by the rubric).
+
+    python benchmarks/bench_sessions.py [--sessions 1000] [--profile]
+
+Location is filled in directly: its validation is a cached geocoder lookup that
+would otherwise time the network. --profile prints the top cProfile entries.
+Every finished session is also round-tripped through dumps()/loads() (the
+years cycle through 0..14, so zero-year candidates are included); any session
+whose restored snapshot differs fails the run.
+"""
+import os, sys, time, random, argparse, statistics
+os.environ.setdefault("PROVIDER", "offline")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interview_session import InterviewSession
+
+ANSWERS = [
+    "A generator uses yield to produce values lazily, for example streaming a large file line by line.",
+    "I would check the query plan with EXPLAIN, add an index and keep transactions short.",
+    "Not sure, I have not used that much.",
+    "Build a small image with a multi-stage Dockerfile and cache the dependency layer.",
+]
+
+def run_one(i: int, rng: random.Random) -> tuple:
+    s = InterviewSession(sid=f"bench{i:06d}", events=None, async_grading=False, batch_grading=False, enrich_async=False)
+    per_turn = []
+
+    def turn(text):
+        t0 = time.perf_counter()
+        s.handle(text)
+        per_turn.append(time.perf_counter() - t0)
+
+    s.start()
+    for text in ["yes", f"Candidate {chr(65 + i % 26)}mith", f"cand{i}@example.com", "+919876543210", str(i % 15),
+                 "Backend Engineer; ML Engineer"]:
+        turn(text)
+    s.candidate["current_location"] = "Pune, India"
+    turn("Python, Django, PostgreSQL, Docker")
+    while s.phase == "questions":
+        turn(f"{rng.choice(ANSWERS)} (session {i})")
+    turn("exit")
+    return s, per_turn
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=1000)
+    ap.add_argument("--profile", action="store_true")
+    args = ap.parse_args()
+    rng = random.Random(7)
+    run_one(-1, rng)  # warm caches (matcher, rubric, enrichment profiles)
+
+    if args.profile:
+        import cProfile, pstats
+        prof = cProfile.Profile()
+        prof.enable()
+    t0 = time.perf_counter()
+    turns, snap_bytes, phases, mismatched = [], 0, {}, []
+    for i in range(args.sessions):
+        s, per_turn = run_one(i, rng)
+        turns += per_turn
+        data = s.dumps()
+        snap_bytes += len(data.encode("utf-8"))
+        back = InterviewSession.loads(data, events=None, async_grading=False, batch_grading=False, enrich_async=False)
+        if back.snapshot() != s.snapshot() or back.candidate != s.candidate:
+            mismatched.append(s.sid)
+        phases[s.phase] = phases.get(s.phase, 0) + 1
+    wall = time.perf_counter() - t0
+    if args.profile:
+        prof.disable()
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(20)
+
+    turns.sort()
+    print(f"{args.sessions} sessions, {len(turns)} turns in {wall:.2f}s "
+          f"({args.sessions / wall:,.0f} sessions/s, {len(turns) / wall:,.0f} turns/s); final phases {phases}")
+    print(f"turn latency: mean {statistics.mean(turns) * 1e3:.2f} ms, p50 {turns[len(turns) // 2] * 1e3:.2f} ms, "
+          f"p95 {turns[int(len(turns) * 0.95)] * 1e3:.2f} ms")
+    print(f"snapshot size: {snap_bytes / args.sessions:,.0f} bytes/session")
+    if mismatched:
+        sys.exit(f"snapshot round-trip changed {len(mismatched)} sessions, e.g. {mismatched[:3]}")
+
+if __name__ == "__main__":
+    main()
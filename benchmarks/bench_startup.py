@@ -0,0 +1,89 @@
+# benchmarks/bench_startup.py
+"""
+Import-time and rerun-time report for main_app.
+
+    python benchmarks/bench_startup.py [--reruns 10] [--top 15] [--max-import-ms N] [--max-rerun-ms N]
+
+1. Runs `python -X importtime` over every module main_app imports at the top
+   level (read from its source, so new imports are picked up) and lists the
+   slowest ones by cumulative time.
+2. Drives main_app through Streamlit's AppTest: one cold run, then warm
+   reruns, reporting the script-only timings main_app records itself.
+
+The --max-* options make the script exit non-zero over budget, for CI.
+"""
+import os, re, sys, ast, time, argparse, subprocess, statistics
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def app_imports(path: str) -> list:
+    tree = ast.parse(open(path, encoding="utf-8").read())
+    mods = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            mods += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            mods.append(node.module)
+    return list(dict.fromkeys(mods))
+
+def importtime(mods: list) -> tuple:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(mods)],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    top = []
+    for m in _LINE.finditer(proc.stderr):
+        self_us, cum_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        if len(indent) <= 1:  # imported directly by the command, not as a dependency
+            top.append((cum_us / 1e3, self_us / 1e3, name))
+    return sum(t[0] for t in top), sorted(top, reverse=True)
+
+def reruns(n: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+    from perf_stats import get_rerun_timings
+    t0 = time.perf_counter()
+    at = AppTest.from_file(os.path.join(ROOT, "main_app.py"), default_timeout=120).run()
+    cold = time.perf_counter() - t0
+    walls = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        at.run()
+        walls.append(time.perf_counter() - t0)
+    if at.exception:
+        sys.exit(f"main_app raised: {at.exception[0].value}")
+    return {"cold_ms": cold * 1e3, "warm_wall_ms": statistics.median(walls) * 1e3,
+            "script": get_rerun_timings().summary()}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--reruns", type=int, default=10)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--max-import-ms", type=float, default=None)
+    ap.add_argument("--max-rerun-ms", type=float, default=None)
+    args = ap.parse_args()
+
+    mods = app_imports(os.path.join(ROOT, "main_app.py"))
+    total, rows = importtime(mods)
+    print(f"Imports of main_app ({len(mods)} statements): {total:.0f} ms cumulative")
+    print(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+    for cum, own, name in rows[:args.top]:
+        print(f"  {cum:>13.1f}  {own:>8.1f}  {name}")
+
+    r = reruns(args.reruns)
+    s = r["script"]
+    print(f"\nAppTest: cold run {r['cold_ms']:.0f} ms, warm rerun {r['warm_wall_ms']:.1f} ms (median wall)")
+    print(f"Script-only rerun timings: p50 {s.get('p50_ms')} ms, p95 {s.get('p95_ms')} ms, max {s.get('max_ms')} ms "
+          f"over {s.get('count')} runs")
+
+    failed = []
+    if args.max_import_ms is not None and total > args.max_import_ms:
+        failed.append(f"imports {total:.0f} ms > {args.max_import_ms:.0f} ms")
+    if args.max_rerun_ms is not None and s.get("p50_ms", 0) > args.max_rerun_ms:
+        failed.append(f"rerun p50 {s['p50_ms']} ms > {args.max_rerun_ms:.0f} ms")
+    if failed:
+        sys.exit("Over budget: " + "; ".join(failed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# candidate_manifest.py
+import os, json, bisect, threading
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def _name_key(name: Optional[str]) -> str:
+    return " ".join((name or "").split()).casefold()
+
+class CandidateManifest:
+    """
+    ID -> {"name", "created", "status"} for the JSON-file store, kept in an
+    append-only JSONL journal so a save or delete writes one line instead of
+    rewriting the index. Entries stay in creation order; two sorted key lists
+    (ID and casefolded name) serve prefix search by bisection. The journal is
+    compacted once dead lines outnumber live entries, and re-read when another
+    process has changed it.
+    """
+
+    def __init__(self, path: str, rebuild: Iterable[Tuple[str, dict]] | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._ids: List[str] = []
+        self._names: List[Tuple[str, str]] = []
+        self._lines = 0
+        self._stamp: tuple = ()
+        self._offset = 0
+        with self._lock:
+            if os.path.exists(path):
+                self._reload()
+            elif rebuild is not None:
+                for cid, meta in rebuild:
+                    self._apply({"op": "put", "id": cid, **meta})
+                self._compact()
+
+    # ---------- journal ----------
+    def _file_stamp(self) -> tuple:
+        try:
+            s = os.stat(self.path)
+            return (s.st_ino, s.st_size, s.st_mtime_ns)
+        except FileNotFoundError:
+            return ()
+
+    def _reload(self) -> None:
+        # Same file and only appended to: replay the tail; otherwise start over
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        if not stamp or not self._stamp or stamp[0] != self._stamp[0] or stamp[1] < self._offset:
+            self._entries, self._ids, self._names = {}, [], []
+            self._lines, self._offset = 0, 0
+        if stamp:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # partial line from a concurrent writer; pick it up next time
+                    self._offset += len(raw)
+                    try:
+                        self._apply(json.loads(raw))
+                    except ValueError:
+                        continue
+        self._stamp = self._file_stamp()
+
+    def _append(self, op: dict) -> None:
+        line = (json.dumps(op, ensure_ascii=False) + "\n").encode("utf-8")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(line)
+        # Read our own line back so lines appended meanwhile by other processes are applied too
+        self._reload()
+        if self._lines > 2 * len(self._entries) + 1024:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for cid, meta in self._entries.items():
+                f.write(json.dumps({"op": "put", "id": cid, **meta}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+        self._lines = len(self._entries)
+        self._offset = os.path.getsize(self.path)
+        self._stamp = self._file_stamp()
+
+    # ---------- in-memory index ----------
+    def _unindex(self, cid: str, meta: dict) -> None:
+        i = bisect.bisect_left(self._ids, cid)
+        if i < len(self._ids) and self._ids[i] == cid:
+            del self._ids[i]
+        pair = (_name_key(meta.get("name")), cid)
+        j = bisect.bisect_left(self._names, pair)
+        if j < len(self._names) and self._names[j] == pair:
+            del self._names[j]
+
+    def _apply(self, op: dict) -> None:
+        self._lines += 1
+        cid = op.get("id")
+        if not cid:
+            return
+        old = self._entries.get(cid)
+        if old is not None:
+            self._unindex(cid, old)
+        if op.get("op") == "del":
+            self._entries.pop(cid, None)
+            return
+        meta = {"name": op.get("name"), "created": op.get("created"), "status": op.get("status")}
+        self._entries[cid] = meta
+        bisect.insort(self._ids, cid)
+        bisect.insort(self._names, (_name_key(meta["name"]), cid))
+
+    # ---------- public API ----------
+    def get(self, cid: str) -> Optional[dict]:
+        with self._lock:
+            self._reload()
+            meta = self._entries.get(cid)
+            return dict(meta, id=cid) if meta else None
+
+    def put(self, cid: str, name: Optional[str], created: float, status: str) -> None:
+        with self._lock:
+            self._reload()
+            old = self._entries.get(cid)
+            if old is not None:
+                created = old.get("created") or created
+                if old == {"name": name, "created": created, "status": status}:
+                    return
+            self._append({"op": "put", "id": cid, "name": name, "created": created, "status": status})
+
+    def remove(self, cid: str) -> None:
+        with self._lock:
+            self._reload()
+            if cid in self._entries:
+                self._append({"op": "del", "id": cid})
+
+    def version(self) -> tuple:
+        # Changes whenever any process saves or deletes a record
+        with self._lock:
+            self._reload()
+            return self._stamp
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            self._reload()
+            return list(self._ids)
+
+    def query(self, prefix: str = "", offset: int = 0, limit: int = 20) -> Tuple[List[dict], int]:
+        # Newest first; a non-empty prefix matches the start of the ID or the name
+        with self._lock:
+            self._reload()
+            if not prefix:
+                total = len(self._entries)
+                page = islice(reversed(self._entries), offset, offset + limit)
+                return [dict(self._entries[c], id=c) for c in page], total
+            hits = set()
+            i = bisect.bisect_left(self._ids, prefix)
+            while i < len(self._ids) and self._ids[i].startswith(prefix):
+                hits.add(self._ids[i])
+                i += 1
+            key = _name_key(prefix)
+            j = bisect.bisect_left(self._names, (key,))
+            while j < len(self._names) and self._names[j][0].startswith(key):
+                hits.add(self._names[j][1])
+                j += 1
+            ordered = sorted(hits, key=lambda c: self._entries[c].get("created") or 0, reverse=True)
+            return [dict(self._entries[c], id=c) for c in ordered[offset: offset + limit]], len(ordered)
@@ -0,0 +1,209 @@
+# cassette.py
+import os, json, mmap, time, zlib, atexit, struct, hashlib, logging, threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from api_client import chat as upstream_chat, chat_stream as upstream_chat_stream, ChatStreamError, ok_result, fail_result
+
+logger = logging.getLogger("talentscout.cassette")
+
+# PROVIDER=cassette: "record" calls api_client and keeps every good reply, "replay" serves them with no network
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "replay").lower()
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", os.path.join(os.path.dirname(__file__), "data", "cassettes", "llm.cas"))
+# Replay sleeps recorded latency x scale (0 = instant, 1 = as recorded)
+CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "0"))
+
+# Data file: records appended as | key (16B) | payload length (u32) | latency s (f32) | zlib(JSON) |
+# Index file (<path>.idx): | magic | count (u32) | data size (u64) | (key, record offset u64) x count, sorted by key |
+# The index is rebuilt from the data file whenever its recorded data size no longer matches.
+_REC = struct.Struct("<16sIf")
+_IDX_HEADER = struct.Struct("<8sIQ")
+_IDX_ENTRY = struct.Struct("<16sQ")
+_IDX_MAGIC = b"TSCAS01\0"
+_STREAM_CHUNK = 24
+
+def message_key(messages: List[Dict[str, Any]]) -> bytes:
+    blob = json.dumps(messages, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).digest()[:16]
+
+class Cassette:
+    """
+    Replies keyed by a hash of the request messages. Replay binary-searches the
+    memory-mapped index and inflates one record per hit; record appends to the
+    data file and rewrites the index on flush(). A key recorded twice serves its
+    latest reply.
+    """
+
+    def __init__(self, path: str = CASSETTE_PATH, mode: str = CASSETTE_MODE):
+        self.path, self.mode = path, mode
+        self._lock = threading.Lock()
+        self._new: Dict[bytes, int] = {}
+        self._dirty = False
+        self._mm = self._idx = None
+        self.n = 0
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._data = open(path, "a+b")
+            self._new = dict(self._scan())
+        else:
+            self._data = open(path, "rb") if os.path.exists(path) else None
+            self._open_index()
+
+    # ---- index ----
+    def _scan(self) -> Iterator[tuple]:
+        # (key, offset) for every complete record; a torn tail from a crash is ignored
+        self._data.seek(0, os.SEEK_END)
+        size, off = self._data.tell(), 0
+        while off + _REC.size <= size:
+            self._data.seek(off)
+            key, length, _ = _REC.unpack(self._data.read(_REC.size))
+            if off + _REC.size + length > size:
+                break
+            yield key, off
+            off += _REC.size + length
+
+    def _data_size(self) -> int:
+        self._data.seek(0, os.SEEK_END)
+        return self._data.tell()
+
+    def _write_index(self, entries: Dict[bytes, int]) -> None:
+        tmp = self.path + ".idx.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_IDX_HEADER.pack(_IDX_MAGIC, len(entries), self._data_size()))
+            for key in sorted(entries):
+                f.write(_IDX_ENTRY.pack(key, entries[key]))
+        os.replace(tmp, self.path + ".idx")
+
+    def _open_index(self) -> None:
+        if self._data is None:
+            logger.warning("No cassette at %s; every request will miss", self.path)
+            return
+        idx_path = self.path + ".idx"
+        fresh = False
+        if os.path.exists(idx_path):
+            with open(idx_path, "rb") as f:
+                head = f.read(_IDX_HEADER.size)
+            fresh = (len(head) == _IDX_HEADER.size and _IDX_HEADER.unpack(head)[0] == _IDX_MAGIC
+                     and _IDX_HEADER.unpack(head)[2] == self._data_size())
+        if not fresh:
+            logger.info("Rebuilding cassette index for %s", self.path)
+            self._write_index(dict(self._scan()))
+        self._idx = open(idx_path, "rb")
+        self.n = _IDX_HEADER.unpack(self._idx.read(_IDX_HEADER.size))[1]
+        if self.n:
+            self._mm = mmap.mmap(self._idx.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _find(self, key: bytes) -> Optional[int]:
+        if key in self._new:
+            return self._new[key]
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, off = _IDX_ENTRY.unpack_from(self._mm, _IDX_HEADER.size + mid * _IDX_ENTRY.size)
+            if k == key:
+                return off
+            if k < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _read(self, off: int) -> Dict[str, Any]:
+        self._data.seek(off)
+        _, length, latency = _REC.unpack(self._data.read(_REC.size))
+        rec = json.loads(zlib.decompress(self._data.read(length)))
+        rec["latency"] = latency
+        return rec
+
+    # ---- public ----
+    def get(self, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            off = self._find(message_key(messages)) if self._data is not None else None
+            self.stats["hits" if off is not None else "misses"] += 1
+            return self._read(off) if off is not None else None
+
+    def put(self, messages: List[Dict[str, Any]], content: str, latency: float, **meta: Any) -> None:
+        payload = zlib.compress(json.dumps({"messages": messages, "content": content, **meta},
+                                           ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+        key = message_key(messages)
+        with self._lock:
+            off = self._data_size()
+            self._data.write(_REC.pack(key, len(payload), latency) + payload)
+            self._data.flush()
+            self._new[key] = off
+            self._dirty = True
+            self.stats["recorded"] += 1
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Every served record (latest per key), in key order."""
+        offsets = dict(self._new)
+        for i in range(self.n):
+            k, off = _IDX_ENTRY.unpack_from(self._mm, _IDX_HEADER.size + i * _IDX_ENTRY.size)
+            offsets.setdefault(k, off)
+        for key in sorted(offsets):
+            with self._lock:
+                yield self._read(offsets[key])
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._write_index(self._new)
+                self._dirty = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, "path": self.path, "entries": self.n + len(self._new), **self.stats}
+
+_cassette: Cassette | None = None
+_cassette_lock = threading.Lock()
+
+def get_cassette() -> Cassette:
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette()
+            if _cassette.mode == "record":
+                atexit.register(_cassette.flush)
+        return _cassette
+
+def cassette_stats() -> Dict[str, Any]:
+    return get_cassette().snapshot()
+
+# ---------- api_client-compatible entry points ----------
+def chat(messages: List[Dict[str, Any]], model: str | None = None, temperature: float = 0.2, **kw: Any) -> Dict[str, Any]:
+    """Same contract as api_client.chat; a replay miss fails with "cassette_miss"."""
+    cas = get_cassette()
+    if cas.mode == "record":
+        t0 = time.perf_counter()
+        res = upstream_chat(messages, model=model, temperature=temperature, **kw)
+        if res["ok"]:
+            cas.put(messages, res["content"], time.perf_counter() - t0, model=model, temperature=temperature)
+        return res
+    rec = cas.get(messages)
+    if rec is None:
+        return fail_result("cassette_miss")
+    if CASSETTE_LATENCY_SCALE > 0:
+        time.sleep(rec["latency"] * CASSETTE_LATENCY_SCALE)
+    return ok_result(rec["content"])
+
+def chat_stream(messages: List[Dict[str, Any]], model: str | None = None, temperature: float = 0.2,
+                **kw: Any) -> Iterator[str]:
+    """Same contract as api_client.chat_stream; shares keys (and recordings) with chat()."""
+    cas = get_cassette()
+    if cas.mode == "record":
+        t0, parts = time.perf_counter(), []
+        for delta in upstream_chat_stream(messages, model=model, temperature=temperature, **kw):
+            parts.append(delta)
+            yield delta
+        cas.put(messages, "".join(parts), time.perf_counter() - t0, model=model, temperature=temperature)
+        return
+    rec = cas.get(messages)
+    if rec is None:
+        raise ChatStreamError("cassette_miss")
+    content = rec["content"]
+    pieces = [content[i:i + _STREAM_CHUNK] for i in range(0, len(content), _STREAM_CHUNK)]
+    pause = rec["latency"] * CASSETTE_LATENCY_SCALE / max(len(pieces), 1)
+    for piece in pieces:
+        if pause > 0:
+            time.sleep(pause)
+        yield piece
@@ -0,0 +1,67 @@
+# chat_view.py
+import os, html
+from functools import lru_cache
+from typing import List
+import streamlit as st
+
+# Messages rendered as live chat bubbles; older ones collapse into one pre-rendered block
+CHAT_WINDOW = int(os.getenv("CHAT_WINDOW", "30"))
+ROLE_LABELS = {"user": "Candidate", "assistant": "TalentScout"}
+
+@lru_cache(maxsize=256)
+def sent_badge(label: str, score) -> str:
+    cls = "pos" if label == "positive" else "neg" if label == "negative" else "neu"
+    return f"  <span class='badge {cls}'>sentiment: {label} · {score}</span>"
+
+def badge_for(m: dict) -> str:
+    sent = (m.get("meta") or {}).get("sentiment") if m.get("role") == "user" else None
+    if not sent or "label" not in sent:
+        return ""
+    return sent_badge(sent.get("label", "neutral"), sent.get("score", 0.5))
+
+@lru_cache(maxsize=4096)
+def _block_line(role: str, content: str, badge: str) -> str:
+    # Escaped: the block renders with HTML enabled for the badges
+    return f"**{ROLE_LABELS.get(role, role)}:** {html.escape(content)}{badge}"
+
+def _enrich_version(m: dict) -> int:
+    # Bumped by InterviewSession when a badge is attached after the message was added
+    return (m.get("meta") or {}).get("ev", 0)
+
+def _older_block(messages: List[dict], upto: int) -> str:
+    # Messages only ever get appended, so the block is extended rather than rebuilt; the key
+    # also holds each message's enrichment version, so a late badge rebuilds it (lines are cached)
+    versions = tuple(_enrich_version(m) for m in messages[:upto])
+    cache = st.session_state.get("_chat_block")
+    if not cache or cache["n"] > upto or cache["ev"] != versions[:cache["n"]]:
+        cache = {"n": 0, "ev": (), "text": ""}
+    if cache["n"] < upto:
+        lines = [_block_line(m["role"], m["content"], badge_for(m)) for m in messages[cache["n"]:upto]]
+        text = "\n\n".join(lines)
+        cache = {"n": upto, "ev": versions, "text": f"{cache['text']}\n\n{text}" if cache["text"] else text}
+    st.session_state._chat_block = cache
+    return cache["text"]
+
+def _load_earlier():
+    st.session_state.chat_window = st.session_state.get("chat_window", CHAT_WINDOW) + CHAT_WINDOW
+
+def reset():
+    # Call after replacing st.session_state.messages wholesale (e.g. resume)
+    st.session_state.pop("_chat_block", None)
+    st.session_state.pop("chat_window", None)
+
+def render_chat(messages: List[dict], controls: bool = True) -> None:
+    window = st.session_state.get("chat_window", CHAT_WINDOW)
+    start = max(0, len(messages) - window)
+    if start:
+        with st.expander(f"Earlier conversation ({start} messages)"):
+            st.markdown(_older_block(messages, start), unsafe_allow_html=True)
+        if controls:
+            st.button("Load earlier messages", on_click=_load_earlier)
+    for m in messages[start:]:
+        with st.chat_message(m["role"]):
+            badge = badge_for(m)
+            if badge:
+                st.markdown(f"{m['content']}{badge}", unsafe_allow_html=True)
+            else:
+                st.markdown(m["content"])
@@ -0,0 +1,88 @@
+# country_index.py
+import os, re, json, threading
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional
+
+COUNTRY_ALIASES_PATH = os.getenv("COUNTRY_ALIASES_PATH",
+                                 os.path.join(os.path.dirname(__file__), "resources", "country_aliases.json"))
+COUNTRY_FUZZY_CUTOFF = float(os.getenv("COUNTRY_FUZZY_CUTOFF", "90"))
+
+class Country(NamedTuple):
+    name: str       # pycountry display name, e.g. "United States"
+    alpha_2: str
+    alpha_3: str
+
+def _key(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip()).casefold()
+
+class CountryIndex:
+    """
+    Every spelling we accept (alpha-2, alpha-3, name, official and common names,
+    resources/country_aliases.json) maps to its Country in one dict, built once.
+    Misses fall back to a memoized fuzzy match over the display names.
+    """
+
+    def __init__(self, aliases: Dict[str, str] | None = None):
+        import pycountry
+        self.by_key: Dict[str, Country] = {}
+        self.by_alpha2: Dict[str, Country] = {}
+        for c in pycountry.countries:
+            rec = Country(c.name, c.alpha_2, c.alpha_3)
+            self.by_alpha2[c.alpha_2] = rec
+            for attr in ("alpha_2", "alpha_3", "name", "official_name", "common_name"):
+                val = getattr(c, attr, None)
+                if val:
+                    self.by_key.setdefault(_key(val), rec)
+        for alias, alpha_2 in (aliases or {}).items():
+            rec = self.by_alpha2.get(alpha_2.upper())
+            if rec:
+                self.by_key[_key(alias)] = rec
+        self._by_name = {_key(c.name): c for c in self.by_alpha2.values()}
+        self.names: List[str] = list(self._by_name)
+        self.stats = {"exact": 0, "fuzzy": 0, "miss": 0}
+
+    @classmethod
+    def from_file(cls, path: str = COUNTRY_ALIASES_PATH) -> "CountryIndex":
+        aliases = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                aliases = json.load(f)
+        return cls(aliases)
+
+    @lru_cache(maxsize=4096)
+    def _fuzzy(self, key: str) -> Optional[Country]:
+        from rapidfuzz import process, fuzz
+        best = process.extractOne(key, self.names, scorer=fuzz.WRatio, score_cutoff=COUNTRY_FUZZY_CUTOFF)
+        return self._by_name[best[0]] if best else None
+
+    def resolve(self, text: str) -> Optional[Country]:
+        key = _key(text)
+        if not key:
+            return None
+        hit = self.by_key.get(key)
+        if hit:
+            self.stats["exact"] += 1
+            return hit
+        hit = self._fuzzy(key)
+        self.stats["fuzzy" if hit else "miss"] += 1
+        return hit
+
+    def get(self, alpha_2: str) -> Optional[Country]:
+        return self.by_alpha2.get((alpha_2 or "").upper())
+
+    def canon_table(self) -> Dict[str, str]:
+        # Lowercase spelling -> display name, the shape field_validators.canon_countries() uses
+        return {k: c.name for k, c in self.by_key.items()}
+
+_index: CountryIndex | None = None
+_index_lock = threading.Lock()
+
+def get_country_index() -> CountryIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CountryIndex.from_file()
+        return _index
+
+def resolve_country(text: str) -> Optional[Country]:
+    return get_country_index().resolve(text)
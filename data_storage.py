@@ -1,49 +1,339 @@
 # data_storage.py
-import os, json
+import os, json, time, sqlite3, threading
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
+
+from candidate_manifest import CandidateManifest
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 CAND_DIR = os.path.join(DATA_DIR, "candidates")
 PROF_DIR = os.path.join(DATA_DIR, "profiles")
+ANSW_DIR = os.path.join(DATA_DIR, "answers")
 os.makedirs(CAND_DIR, exist_ok=True)
 os.makedirs(PROF_DIR, exist_ok=True)
 
-def _cpath(cid: str) -> str:
-    return os.path.join(CAND_DIR, f"{cid}.json")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+STORAGE_DB = os.getenv("STORAGE_DB", os.path.join(DATA_DIR, "talentscout.sqlite3"))
+MANIFEST_PATH = os.path.join(DATA_DIR, "candidates.manifest.jsonl")
+
+# Listing status: profile saved only, or interview answers saved as well
+STATUS_PROFILE = "profile"
+STATUS_INTERVIEWED = "interviewed"
+
+class CandidateStore(ABC):
+    """Backend interface; module-level functions below delegate to the configured store."""
+
+    @abstractmethod
+    def save_candidate(self, cid: str, data: dict) -> None: ...
+    @abstractmethod
+    def load_candidate(self, cid: str) -> Optional[dict]: ...
+    @abstractmethod
+    def delete_candidate(self, cid: str) -> bool: ...
+    @abstractmethod
+    def save_answers(self, cid: str, answers: List[dict]) -> None: ...
+    @abstractmethod
+    def load_answers(self, cid: str) -> List[dict]: ...
+    @abstractmethod
+    def save_profile(self, email: str, profile: dict) -> None: ...
+    @abstractmethod
+    def load_profile(self, email: str) -> Optional[dict]: ...
+    @abstractmethod
+    def iter_candidates(self) -> Iterator[Tuple[str, dict]]: ...
+    @abstractmethod
+    def list_candidate_ids(self) -> List[str]: ...
+    @abstractmethod
+    def list_candidates(self, prefix: str = "", offset: int = 0, limit: int = 20) -> Tuple[List[dict], int]: ...
+    @abstractmethod
+    def listing_version(self): ...
+
+# ---------- JSON files (default, development) ----------
+class JsonStore(CandidateStore):
+    def __init__(self, manifest_path: str = MANIFEST_PATH):
+        # First start on an existing tree builds the manifest from the files once
+        self.manifest = CandidateManifest(manifest_path, rebuild=self._scan())
+
+    def _scan(self) -> Iterator[Tuple[str, dict]]:
+        paths = [os.path.join(CAND_DIR, n) for n in os.listdir(CAND_DIR) if n.endswith(".json")]
+        for p in sorted(paths, key=os.path.getmtime):
+            cid = os.path.basename(p)[:-5]
+            try:
+                rec = self._read(p) or {}
+            except ValueError:
+                continue
+            status = STATUS_INTERVIEWED if os.path.exists(self._apath(cid)) else STATUS_PROFILE
+            yield cid, {"name": rec.get("full_name"), "created": os.path.getmtime(p), "status": status}
+
+    def _cpath(self, cid: str) -> str:
+        return os.path.join(CAND_DIR, f"{cid}.json")
+
+    def _apath(self, cid: str) -> str:
+        return os.path.join(ANSW_DIR, f"{cid}.json")
+
+    def _ppath(self, email: str) -> str:
+        safe = (email or "").replace("/", "_")
+        return os.path.join(PROF_DIR, f"{safe}.json")
+
+    @staticmethod
+    def _read(p: str):
+        if not os.path.exists(p):
+            return None
+        with open(p, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write(p: str, obj) -> None:
+        with open(p, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+
+    def save_candidate(self, cid: str, data: dict) -> None:
+        self._write(self._cpath(cid), data)
+        entry = self.manifest.get(cid) or {}
+        self.manifest.put(cid, data.get("full_name"), time.time(), entry.get("status") or STATUS_PROFILE)
+
+    def load_candidate(self, cid: str) -> Optional[dict]:
+        return self._read(self._cpath(cid))
+
+    def delete_candidate(self, cid: str) -> bool:
+        p = self._cpath(cid)
+        if os.path.exists(p):
+            os.remove(p)
+            if os.path.exists(self._apath(cid)):
+                os.remove(self._apath(cid))
+            self.manifest.remove(cid)
+            return True
+        return False
+
+    def save_answers(self, cid: str, answers: List[dict]) -> None:
+        os.makedirs(ANSW_DIR, exist_ok=True)
+        self._write(self._apath(cid), answers)
+        entry = self.manifest.get(cid)
+        if entry:
+            self.manifest.put(cid, entry["name"], entry["created"], STATUS_INTERVIEWED)
+
+    def load_answers(self, cid: str) -> List[dict]:
+        return self._read(self._apath(cid)) or []
+
+    def save_profile(self, email: str, profile: dict) -> None:
+        self._write(self._ppath(email), profile)
+
+    def load_profile(self, email: str) -> Optional[dict]:
+        return self._read(self._ppath(email))
+
+    def list_candidate_ids(self) -> List[str]:
+        return self.manifest.ids()
+
+    def list_candidates(self, prefix: str = "", offset: int = 0, limit: int = 20) -> Tuple[List[dict], int]:
+        return self.manifest.query(prefix, offset, limit)
+
+    def listing_version(self):
+        return self.manifest.version()
+
+    def iter_candidates(self) -> Iterator[Tuple[str, dict]]:
+        for cid in self.list_candidate_ids():
+            rec = self.load_candidate(cid)
+            if rec is not None:
+                yield cid, rec
+
+# ---------- SQLite (WAL) ----------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id          TEXT PRIMARY KEY,
+    full_name   TEXT,
+    email       TEXT,
+    phone       TEXT,
+    location    TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'profile',
+    payload     TEXT NOT NULL,          -- full Candidate JSON
+    answers     TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS ix_candidates_email    ON candidates(email);
+CREATE INDEX IF NOT EXISTS ix_candidates_phone    ON candidates(phone);
+CREATE INDEX IF NOT EXISTS ix_candidates_location ON candidates(location);
+CREATE INDEX IF NOT EXISTS ix_candidates_created  ON candidates(created_at);
+CREATE INDEX IF NOT EXISTS ix_candidates_name     ON candidates(full_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS candidate_positions (
+    candidate_id TEXT NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    position     TEXT NOT NULL,
+    PRIMARY KEY (candidate_id, position)
+);
+CREATE INDEX IF NOT EXISTS ix_positions_position ON candidate_positions(position);
+-- Single-row change counter; listings cached by the UI are valid while it is unchanged
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0);
+CREATE TABLE IF NOT EXISTS profiles (
+    email      TEXT PRIMARY KEY,
+    payload    TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+class SqliteStore(CandidateStore):
+    def __init__(self, path: str = STORAGE_DB):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection) -> None:
+        conn.execute("UPDATE store_meta SET value = value + 1 WHERE key='version'")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside the writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def save_candidate(self, cid: str, data: dict, created_at: float | None = None) -> None:
+        now = time.time()
+        positions = [p for p in (data.get("desired_positions") or []) if isinstance(p, str)]
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO candidates (id, full_name, email, phone, location, created_at, updated_at, payload)"
+                " VALUES (?,?,?,?,?,?,?,?)"
+                " ON CONFLICT(id) DO UPDATE SET full_name=excluded.full_name, email=excluded.email,"
+                " phone=excluded.phone, location=excluded.location, updated_at=excluded.updated_at,"
+                " payload=excluded.payload",
+                (cid, data.get("full_name"), data.get("email"), data.get("phone"),
+                 data.get("current_location"), created_at or now, now, json.dumps(data, ensure_ascii=False)),
+            )
+            conn.execute("DELETE FROM candidate_positions WHERE candidate_id=?", (cid,))
+            conn.executemany("INSERT OR IGNORE INTO candidate_positions (candidate_id, position) VALUES (?,?)",
+                             [(cid, p) for p in positions])
+            self._bump(conn)
+
+    def load_candidate(self, cid: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT payload FROM candidates WHERE id=?", (cid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_candidate(self, cid: str) -> bool:
+        conn = self._conn()
+        with conn:
+            gone = conn.execute("DELETE FROM candidates WHERE id=?", (cid,)).rowcount > 0
+            if gone:
+                self._bump(conn)
+            return gone
+
+    def save_answers(self, cid: str, answers: List[dict]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE candidates SET answers=?, status=?, updated_at=? WHERE id=?",
+                         (json.dumps(answers, ensure_ascii=False), STATUS_INTERVIEWED, time.time(), cid))
+            self._bump(conn)
+
+    def load_answers(self, cid: str) -> List[dict]:
+        row = self._conn().execute("SELECT answers FROM candidates WHERE id=?", (cid,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def save_profile(self, email: str, profile: dict) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO profiles (email, payload, updated_at) VALUES (?,?,?)",
+                         (email, json.dumps(profile, ensure_ascii=False), time.time()))
+
+    def load_profile(self, email: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT payload FROM profiles WHERE email=?", (email,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_candidate_ids(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT id FROM candidates ORDER BY id")]
+
+    def list_candidates(self, prefix: str = "", offset: int = 0, limit: int = 20) -> Tuple[List[dict], int]:
+        # Newest first; a non-empty prefix matches the start of the ID or the name
+        where, args = "", []
+        if prefix:
+            like = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where = " WHERE (id >= ? AND id < ?) OR full_name LIKE ? ESCAPE '\\'"
+            args = [prefix, prefix + "\U0010ffff", like]
+        conn = self._conn()
+        total = conn.execute("SELECT COUNT(*) FROM candidates" + where, args).fetchone()[0]
+        rows = conn.execute("SELECT id, full_name, created_at, status FROM candidates" + where +
+                            " ORDER BY created_at DESC LIMIT ? OFFSET ?", args + [limit, offset]).fetchall()
+        return [{"id": r[0], "name": r[1], "created": r[2], "status": r[3]} for r in rows], total
+
+    def listing_version(self):
+        return self._conn().execute("SELECT value FROM store_meta WHERE key='version'").fetchone()[0]
+
+    def iter_candidates(self) -> Iterator[Tuple[str, dict]]:
+        for cid, payload in self._conn().execute("SELECT id, payload FROM candidates ORDER BY id"):
+            yield cid, json.loads(payload)
+
+    def find_candidates(self, email: str | None = None, phone: str | None = None,
+                        location: str | None = None, position: str | None = None,
+                        since: float | None = None, limit: int = 100) -> List[str]:
+        sql, args = "SELECT c.id FROM candidates c", []
+        where = []
+        if position:
+            sql += " JOIN candidate_positions p ON p.candidate_id = c.id"
+            where.append("p.position = ?"); args.append(position)
+        for col, val in (("c.email", email), ("c.phone", phone), ("c.location", location)):
+            if val:
+                where.append(f"{col} = ?"); args.append(val)
+        if since is not None:
+            where.append("c.created_at >= ?"); args.append(since)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY c.created_at DESC LIMIT ?"
+        args.append(limit)
+        return [r[0] for r in self._conn().execute(sql, args)]
+
+BACKENDS = {"json": JsonStore, "sqlite": SqliteStore}
+_store: CandidateStore | None = None
+_store_lock = threading.Lock()
+
+def get_store() -> CandidateStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BACKENDS[STORAGE_BACKEND]()
+        return _store
 
 def save_candidate(cid: str, data: dict) -> None:
-    with open(_cpath(cid), "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    get_store().save_candidate(cid, data)
 
 def load_candidate(cid: str):
-    p = _cpath(cid)
-    if not os.path.exists(p):
-        return None
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return get_store().load_candidate(cid)
 
 def delete_candidate(cid: str) -> bool:
-    p = _cpath(cid)
-    if os.path.exists(p):
-        os.remove(p)
-        return True
-    return False
+    return get_store().delete_candidate(cid)
 
-# ---------- Personalization by email ----------
-def _ppath(email: str) -> str:
-    safe = (email or "").replace("/", "_")
-    return os.path.join(PROF_DIR, f"{safe}.json")
+def save_answers(cid: str, answers: List[dict]) -> None:
+    get_store().save_answers(cid, answers)
+
+def load_answers(cid: str) -> List[dict]:
+    return get_store().load_answers(cid)
 
+def list_candidate_ids() -> List[str]:
+    return get_store().list_candidate_ids()
+
+def list_candidates(prefix: str = "", offset: int = 0, limit: int = 20) -> Tuple[List[dict], int]:
+    # One page of {"id", "name", "created", "status"} plus the total match count
+    return get_store().list_candidates(prefix.strip(), max(offset, 0), limit)
+
+def listing_version():
+    return get_store().listing_version()
+
+def iter_candidates() -> Iterator[Tuple[str, dict]]:
+    return get_store().iter_candidates()
+
+# ---------- Personalization by email ----------
 def save_profile(email: str, profile: dict) -> None:
     if not email:
         return
-    with open(_ppath(email), "w", encoding="utf-8") as f:
-        json.dump(profile, f, ensure_ascii=False, indent=2)
+    get_store().save_profile(email, profile or {})
 
 def load_profile(email: str) -> dict | None:
     if not email:
         return None
-    p = _ppath(email)
-    if not os.path.exists(p):
-        return None
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
\ No newline at end of file
+    return get_store().load_profile(email)
\ No newline at end of file
@@ -0,0 +1,142 @@
+# enrichment.py
+import os, re, hashlib, threading, logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import lru_cache
+from typing import Dict, Optional
+
+logger = logging.getLogger("talentscout.enrich")
+
+ENRICH_CACHE_SIZE = int(os.getenv("ENRICH_CACHE_SIZE", "4096"))
+ENRICH_SEED = int(os.getenv("ENRICH_SEED", "0"))
+# Inputs shorter than this (letters only) keep the session language instead of being detected
+ENRICH_MIN_DETECT_LETTERS = int(os.getenv("ENRICH_MIN_DETECT_LETTERS", "12"))
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "1"))
+
+NEUTRAL = {"label": "neutral", "score": 0.5}
+
+# Answers to field prompts that carry no language signal
+_STRUCTURED = re.compile(
+    r"""^\s*(?:
+        [\w.%+-]+@[\w.-]+\.[a-z]{2,}                 # email
+      | \+?[\d\s().-]{5,}                           # phone number
+      | [+-]?\d+(?:[.,]\d+)?\s*(?:years?|yrs?|y)?   # number, e.g. years of experience
+      | (?:https?://|www\.)\S+                      # URL
+    )\s*$""", re.IGNORECASE | re.VERBOSE)
+
+@lru_cache(maxsize=1)
+def _detector_factory():
+    # Profiles load once; a fixed seed makes the same text always give the same language
+    try:
+        from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+        factory = DetectorFactory()
+        factory.load_profile(PROFILES_DIRECTORY)
+        factory.set_seed(ENRICH_SEED)
+        return factory
+    except Exception:
+        logger.warning("langdetect unavailable; language detection disabled")
+        return None
+
+@lru_cache(maxsize=1)
+def _sentiment_analyzer():
+    try:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer()
+    except Exception:
+        return None
+
+def should_detect(text: str) -> bool:
+    t = (text or "").strip()
+    if not t or _STRUCTURED.match(t):
+        return False
+    return sum(ch.isalpha() for ch in t) >= ENRICH_MIN_DETECT_LETTERS
+
+def _detect(text: str) -> Optional[str]:
+    factory = _detector_factory()
+    if factory is None:
+        return None
+    try:
+        d = factory.create()
+        d.append(text)
+        return d.detect()
+    except Exception:
+        return None
+
+def _sentiment(text: str) -> Dict[str, float | str]:
+    a = _sentiment_analyzer()
+    s = (text or "").strip()
+    if not a or not s:
+        return dict(NEUTRAL)
+    comp = float(a.polarity_scores(s).get("compound", 0.0))
+    label = "positive" if comp >= 0.05 else "negative" if comp <= -0.05 else "neutral"
+    return {"label": label, "score": round((comp + 1.0) / 2.0, 3)}  # map [-1,1] -> [0,1]
+
+_UNSET = object()
+
+class Enricher:
+    """
+    Language + sentiment for one chat message, memoized by text hash in a
+    bounded LRU; each half is computed on first request, so the language can
+    be resolved inline while sentiment runs on the worker. The language is
+    None when the text is too short or purely structured to say anything;
+    callers keep their current language then.
+    """
+
+    def __init__(self, max_entries: int = ENRICH_CACHE_SIZE, workers: int = ENRICH_WORKERS):
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[bytes, list]" = OrderedDict()  # key -> [lang, sentiment]
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich")
+        self.stats = {"hits": 0, "misses": 0, "skipped_detection": 0}
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b((text or "").strip().encode("utf-8"), digest_size=16).digest()
+
+    def _get(self, text: str, slot: int, compute):
+        key = self._key(text)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru.move_to_end(key)
+                if entry[slot] is not _UNSET:
+                    self.stats["hits"] += 1
+                    return entry[slot]
+        value = compute(text)
+        with self._lock:
+            self.stats["misses"] += 1
+            entry = self._lru.setdefault(key, [_UNSET, _UNSET])
+            entry[slot] = value
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return value
+
+    def _detect_counted(self, text: str) -> Optional[str]:
+        if not should_detect(text):
+            with self._lock:
+                self.stats["skipped_detection"] += 1
+            return None
+        return _detect(text)
+
+    def language(self, text: str, default: str = "en") -> str:
+        return self._get(text, 0, self._detect_counted) or default
+
+    def sentiment(self, text: str) -> Dict[str, float | str]:
+        return dict(self._get(text, 1, _sentiment))
+
+    def enrich(self, text: str, default_lang: str = "en") -> Dict:
+        return {"lang": self.language(text, default_lang), "sentiment": self.sentiment(text)}
+
+    def submit_sentiment(self, text: str) -> "Future[Dict]":
+        # Off the request thread; the chat badge is attached once it resolves
+        return self._pool.submit(self.sentiment, text)
+
+_enricher: Enricher | None = None
+_enricher_lock = threading.Lock()
+
+def get_enricher() -> Enricher:
+    global _enricher
+    with _enricher_lock:
+        if _enricher is None:
+            _enricher = Enricher()
+        return _enricher
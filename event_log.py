@@ -0,0 +1,303 @@
+# event_log.py
+import os, re, json, time, queue, atexit, logging, threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger("talentscout.events")
+
+EVENT_LOG = os.getenv("EVENT_LOG", "true").lower() == "true"
+EVENT_LOG_DIR = os.getenv("EVENT_LOG_DIR", os.path.join(os.path.dirname(__file__), "data", "events"))
+EVENT_SEGMENT_BYTES = int(os.getenv("EVENT_SEGMENT_BYTES", str(1 << 20)))
+EVENT_COMMIT_INTERVAL = float(os.getenv("EVENT_COMMIT_INTERVAL", "0.05"))  # group-commit window (s)
+EVENT_COMMIT_MAX = int(os.getenv("EVENT_COMMIT_MAX", "256"))               # records per fsync batch
+EVENT_MAX_OPEN = int(os.getenv("EVENT_MAX_OPEN", "64"))                    # open segment handles
+EVENT_DURABLE_TIMEOUT = float(os.getenv("EVENT_DURABLE_TIMEOUT", "2"))
+
+# Event types written by InterviewSession; replay() folds them back into session state
+CONSENT, FIELD_SET, QUESTIONS_READY, QUESTION_ASKED = "consent", "field_set", "questions_ready", "question_asked"
+ANSWER, GRADE, MESSAGE, EXIT = "answer", "grade", "message", "exit"
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_SEGMENT = re.compile(r"^seg-(\d{6})\.jsonl$")
+
+def _segment_name(n: int) -> str:
+    return f"seg-{n:06d}.jsonl"
+
+def _fsync_dir(path: str) -> None:
+    # New segment names must survive a crash too; not every platform allows this
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class EventLogError(OSError):
+    """A batch could not be written; durable appends raise it, others find it on their handle."""
+
+class _Pending(threading.Event):
+    # Set once the record's batch is committed; `error` is the exception if the commit failed
+
+    def __init__(self):
+        super().__init__()
+        self.error: Exception | None = None
+
+class _Segment:
+    __slots__ = ("f", "number", "size", "seq")
+
+    def __init__(self, f, number: int, size: int, seq: int):
+        self.f, self.number, self.size, self.seq = f, number, size, seq
+
+class EventLog:
+    """
+    Append-only JSONL log per session, one directory per session split into
+    numbered segments. Appends are queued to one writer thread that writes
+    everything that arrives within EVENT_COMMIT_INTERVAL and then fsyncs each
+    touched segment once, so a turn costs a line append rather than a file
+    rewrite and concurrent sessions share the fsync. A torn last line left by a
+    crash is cut off when the session is reopened and ignored by readers.
+    """
+
+    def __init__(self, root: str = EVENT_LOG_DIR, segment_bytes: int = EVENT_SEGMENT_BYTES,
+                 commit_interval: float = EVENT_COMMIT_INTERVAL, commit_max: int = EVENT_COMMIT_MAX):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        self.commit_interval = commit_interval
+        self.commit_max = commit_max
+        self._q: "queue.Queue" = queue.Queue()
+        self._open: "OrderedDict[str, _Segment]" = OrderedDict()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self.stats = {"records": 0, "batches": 0, "fsyncs": 0, "rotations": 0}
+
+    # ---------- producer side ----------
+    def append(self, session: str, etype: str, data: dict | None = None, durable: bool = False) -> _Pending:
+        """
+        Queues one record. The returned event is set once its batch is committed,
+        with .error holding the exception if that failed; durable=True waits for
+        it and raises EventLogError on failure.
+        """
+        if not _SESSION_ID.match(session or ""):
+            raise ValueError(f"invalid session id: {session!r}")
+        done = _Pending()
+        self._ensure_thread()
+        self._q.put((session, {"ts": round(time.time(), 3), "type": etype, "data": data or {}}, done))
+        if durable:
+            if not done.wait(EVENT_DURABLE_TIMEOUT):
+                logger.warning("event log commit for %s took longer than %.1fs", session, EVENT_DURABLE_TIMEOUT)
+            elif done.error is not None:
+                raise EventLogError(f"event log commit for {session} failed: {done.error}") from done.error
+        return done
+
+    def flush(self, timeout: float = EVENT_DURABLE_TIMEOUT) -> bool:
+        done = _Pending()
+        self._ensure_thread()
+        self._q.put((None, None, done))
+        return done.wait(timeout) and done.error is None
+
+    def _ensure_thread(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+                self._thread.start()
+
+    # ---------- writer thread ----------
+    def _run(self) -> None:
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.commit_interval
+            while len(batch) < self.commit_max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            error = None
+            try:
+                self._commit(batch)
+            except Exception as e:
+                logger.exception("event log commit failed; %d records dropped", len(batch))
+                error = e
+            for _, _, done in batch:
+                done.error = error
+                done.set()
+
+    def _commit(self, batch: list) -> None:
+        touched: Dict[str, _Segment] = {}
+        for session, record, _ in batch:
+            if session is None:
+                continue  # flush marker
+            seg = self._segment(session, pinned=touched)
+            if seg.size >= self.segment_bytes:
+                seg = self._rotate(session, seg)
+            seg.seq += 1
+            line = (json.dumps({"seq": seg.seq, **record}, ensure_ascii=False) + "\n").encode("utf-8")
+            seg.f.write(line)
+            seg.size += len(line)
+            touched[session] = seg
+            self.stats["records"] += 1
+        for seg in touched.values():
+            seg.f.flush()
+            os.fsync(seg.f.fileno())
+            self.stats["fsyncs"] += 1
+        self.stats["batches"] += 1
+        self._trim()
+
+    def _trim(self, pinned: Dict[str, _Segment] | None = None, keep: str | None = None) -> None:
+        # Close least recently used handles beyond EVENT_MAX_OPEN; segments written by
+        # the batch in progress are pinned until it has fsynced them
+        for session in list(self._open):
+            if len(self._open) <= EVENT_MAX_OPEN:
+                break
+            if session == keep or (pinned and session in pinned):
+                continue
+            self._open.pop(session).f.close()  # fsynced by the batch that last wrote to it
+
+    def _segment(self, session: str, pinned: Dict[str, _Segment] | None = None) -> _Segment:
+        seg = self._open.get(session)
+        if seg is not None:
+            self._open.move_to_end(session)
+            return seg
+        folder = os.path.join(self.root, session)
+        os.makedirs(folder, exist_ok=True)
+        numbers = _segment_numbers(folder)
+        number = numbers[-1] if numbers else 1
+        path = os.path.join(folder, _segment_name(number))
+        seq = _repair_tail(path)
+        if seq == 0 and len(numbers) > 1:
+            seq = _last_seq(os.path.join(folder, _segment_name(numbers[-2])))
+        f = open(path, "ab")
+        if not numbers:
+            _fsync_dir(folder)
+        seg = _Segment(f, number, f.tell(), seq)
+        self._open[session] = seg
+        self._trim(pinned, keep=session)
+        return seg
+
+    def _rotate(self, session: str, seg: _Segment) -> _Segment:
+        seg.f.flush()
+        os.fsync(seg.f.fileno())
+        seg.f.close()
+        folder = os.path.join(self.root, session)
+        f = open(os.path.join(folder, _segment_name(seg.number + 1)), "ab")
+        _fsync_dir(folder)
+        new = _Segment(f, seg.number + 1, 0, seg.seq)
+        self._open[session] = new
+        self.stats["rotations"] += 1
+        return new
+
+    def close(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self.flush()
+        for seg in self._open.values():
+            seg.f.close()
+        self._open.clear()
+
+    # ---------- reading ----------
+    def exists(self, session: str) -> bool:
+        return bool(_SESSION_ID.match(session or "")) and bool(_segment_numbers(os.path.join(self.root, session)))
+
+    def read(self, session: str) -> Iterator[dict]:
+        if not _SESSION_ID.match(session or ""):
+            return
+        folder = os.path.join(self.root, session)
+        for n in _segment_numbers(folder):
+            yield from _read_segment(os.path.join(folder, _segment_name(n)))
+
+def _segment_numbers(folder: str) -> List[int]:
+    if not os.path.isdir(folder):
+        return []
+    return sorted(int(m.group(1)) for m in map(_SEGMENT.match, os.listdir(folder)) if m)
+
+def _read_segment(path: str) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                return  # torn tail from a crash mid-write
+            try:
+                yield json.loads(raw)
+            except ValueError:
+                continue
+
+def _last_seq(path: str) -> int:
+    seq = 0
+    if os.path.exists(path):
+        for rec in _read_segment(path):
+            seq = rec.get("seq", seq)
+    return seq
+
+def _repair_tail(path: str) -> int:
+    # Drop a partial last line so new appends start on a clean line; returns the last seq
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as f:
+        data = f.read()
+        keep = data.rfind(b"\n") + 1
+        if keep < len(data):
+            logger.warning("truncating torn record at the end of %s", path)
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+    return _last_seq(path)
+
+# ---------- replay ----------
+def replay(events: Iterator[dict]) -> Optional[dict]:
+    """
+    Rebuilds the resumable part of an InterviewSession from its events:
+    candidate, phase, questions, q_index, answers, messages and language.
+    """
+    state = {"candidate": {}, "phase": "gather", "questions": [], "q_index": 0,
+             "answers": [], "messages": [], "language": "en"}
+    seen = False
+    for ev in events:
+        seen = True
+        etype, data = ev.get("type"), ev.get("data") or {}
+        if etype == MESSAGE:
+            msg = {"role": data.get("role", "assistant"), "content": data.get("content", ""), "meta": data.get("meta") or {}}
+            state["messages"].append(msg)
+            if msg["role"] == "user" and msg["meta"].get("lang"):
+                state["language"] = msg["meta"]["lang"]
+        elif etype == CONSENT:
+            state["candidate"]["consent"] = True
+        elif etype == FIELD_SET:
+            state["candidate"][data["field"]] = data.get("value")
+        elif etype == QUESTIONS_READY:
+            state["questions"] = list(data.get("questions") or [])
+            state["q_index"], state["answers"] = 0, []
+            state["phase"] = "questions" if state["questions"] else state["phase"]
+        elif etype == QUESTION_ASKED:
+            state["q_index"] = data.get("index", state["q_index"])
+        elif etype == ANSWER:
+            state["answers"].append({"question": data.get("question"), "answer": data.get("answer", ""),
+                                     "verdict": "Pending", "feedback": ""})
+            state["q_index"] = data.get("index", len(state["answers"]) - 1) + 1
+            if state["q_index"] >= len(state["questions"]):
+                state["phase"] = "wrapup"
+        elif etype == GRADE:
+            i = data.get("index", -1)
+            if 0 <= i < len(state["answers"]):
+                state["answers"][i].update({"verdict": data.get("verdict"), "feedback": data.get("feedback", ""),
+                                            "tier": data.get("tier")})
+        elif etype == EXIT:
+            state["phase"] = "end"
+    return state if seen else None
+
+_log: EventLog | None = None
+_log_lock = threading.Lock()
+
+def get_event_log() -> EventLog:
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = EventLog()
+            atexit.register(_log.close)
+        return _log
+
+def replay_session(session: str) -> Optional[dict]:
+    return replay(get_event_log().read(session))
@@ -1,8 +1,15 @@
 # field_validators.py
 from __future__ import annotations
 from typing import List, Optional, Dict, Tuple
-from pydantic import BaseModel, EmailStr, field_validator, conint
-import phonenumbers
+from functools import lru_cache
+from pydantic import BaseModel, EmailStr, Field, field_validator, conint
+from country_index import get_country_index
+
+@lru_cache(maxsize=1)
+def _phonenumbers():
+    # Loaded on the first phone number, not at import
+    import phonenumbers
+    return phonenumbers
 
 # Controlled vocabulary for roles (extend as needed)
 ROLE_MAP = {
@@ -15,14 +22,11 @@ ROLE_MAP = {
     "mle": "ML Engineer",
 }
 
-# Minimal location catalog (extend as needed)
-CANON_COUNTRIES = {
-    "india": "India",
-    "bangladesh": "Bangladesh",
-    "united states": "United States",
-    "usa": "United States",
-    "china": "China",
-}
+@lru_cache(maxsize=1)
+def canon_countries() -> Dict[str, str]:
+    # Location catalog: every spelling known to the shared country index (codes, names, aliases),
+    # built on the first location rather than at import
+    return get_country_index().canon_table()
 
 CANON_CITIES: Dict[Tuple[str, str], str] = {
     ("surat", "india"): "Surat, India",
@@ -31,6 +35,21 @@ CANON_CITIES: Dict[Tuple[str, str], str] = {
     ("bengal", "bangladesh"): "Bengal, Bangladesh",
 }
 
+def normalize_phone(text: str, default_region: Optional[str] = None) -> str:
+    """
+    Returns the E.164 form of a valid phone number; raises ValueError otherwise.
+    Numbers without a leading '+' are parsed against default_region.
+    """
+    pn = _phonenumbers()
+    t = (text or "").strip()
+    try:
+        num = pn.parse(t, None if t.startswith("+") else default_region)
+    except pn.NumberParseException as e:
+        raise ValueError("Invalid phone number") from e
+    if not pn.is_valid_number(num):
+        raise ValueError("Invalid phone number")
+    return pn.format_number(num, pn.PhoneNumberFormat.E164)
+
 def normalize_role(text: str) -> Optional[str]:
     t = (text or "").strip().lower()
     return ROLE_MAP.get(t)
@@ -46,7 +65,7 @@ def normalize_location(raw: str) -> Tuple[Optional[str], Optional[str], Optional
     if len(parts) != 2:
         return None, None, None
     city, country = parts
-    country_norm = CANON_COUNTRIES.get(country)
+    country_norm = canon_countries().get(country)
     if not country_norm:
         return None, None, None
     # Exact table lookup
@@ -77,11 +96,12 @@ class Candidate(BaseModel):
     @field_validator("phone")
     @classmethod
     def _phone_e164(cls, v: str) -> str:
+        pn = _phonenumbers()
         try:
-            num = phonenumbers.parse(v, None)
-            if not phonenumbers.is_possible_number(num) or not phonenumbers.is_valid_number(num):
+            num = pn.parse(v, None)
+            if not pn.is_possible_number(num) or not pn.is_valid_number(num):
                 raise ValueError("invalid phone")
-            return phonenumbers.format_number(num, phonenumbers.PhoneNumberFormat.E164)
+            return pn.format_number(num, pn.PhoneNumberFormat.E164)
         except Exception as e:
             raise ValueError("Phone must be E.164 like +917022612686") from e
 
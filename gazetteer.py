@@ -0,0 +1,168 @@
+# gazetteer.py
+import os, re, mmap, struct, logging, threading
+from array import array
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("talentscout.gazetteer")
+
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join(os.path.dirname(__file__), "data", "gazetteer.idx"))
+GAZETTEER_FUZZY_CUTOFF = float(os.getenv("GAZETTEER_FUZZY_CUTOFF", "90"))
+
+# File layout: header | by-country offsets (u32 x n) | by-name offsets (u32 x n) | records
+# Each record is b"CC\tkey\tDisplay Name\n"; records are sorted by (CC, key), and the
+# by-name table orders the same records by (key, population desc) for global probes.
+_MAGIC = b"TSGAZ01\0"
+_HEADER = struct.Struct("<8sII")
+_ALT_OK = re.compile(r"^[^\W\d_][\w .'\-]{2,}$")
+
+def _key(name: str) -> str:
+    return re.sub(r"\s+", " ", (name or "").strip()).casefold()
+
+def _read_geonames(path: str) -> Iterable[Tuple[str, str, str, int]]:
+    # GeoNames "cities*.txt"/"allCountries.txt": tab-separated, 19 columns
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 15 or not cols[8]:
+                continue
+            name, ascii_name, alternates, cc = cols[1], cols[2], cols[3], cols[8].upper()
+            try:
+                pop = int(cols[14] or 0)
+            except ValueError:
+                pop = 0
+            keys = {_key(name), _key(ascii_name)}
+            keys.update(_key(a) for a in alternates.split(",") if _ALT_OK.match(a.strip()))
+            for k in keys:
+                if k and "\t" not in k:
+                    yield cc, k, name, pop
+
+def build_index(src_path: str, out_path: str = GAZETTEER_PATH) -> int:
+    best: dict[Tuple[str, str], Tuple[int, str]] = {}
+    for cc, k, display, pop in _read_geonames(src_path):
+        cur = best.get((cc, k))
+        if cur is None or pop > cur[0]:
+            best[(cc, k)] = (pop, display)
+    keys = sorted(best)
+    data, offsets = bytearray(), array("I")
+    for cc, k in keys:
+        offsets.append(len(data))
+        data += f"{cc}\t{k}\t{best[(cc, k)][1]}\n".encode("utf-8")
+    if len(data) >= 2 ** 32:
+        raise ValueError("gazetteer too large for 32-bit offsets")
+    by_name = array("I", (offsets[i] for i in sorted(range(len(keys)),
+                                                     key=lambda i: (keys[i][1], -best[keys[i]][0]))))
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(keys), 0))
+        offsets.tofile(f)
+        by_name.tofile(f)
+        f.write(data)
+    os.replace(tmp, out_path)
+    return len(keys)
+
+class Gazetteer:
+    """Read-only, memory-mapped city index; lookups are binary searches over the mapped file."""
+
+    def __init__(self, path: str = GAZETTEER_PATH):
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a gazetteer index")
+        base = _HEADER.size
+        self._view = view = memoryview(self._mm)
+        self._by_cc = view[base: base + 4 * self.n].cast("I")
+        self._by_name = view[base + 4 * self.n: base + 8 * self.n].cast("I")
+        self._data = base + 8 * self.n
+
+    def _record(self, off: int) -> Tuple[str, str, str]:
+        start = self._data + off
+        end = self._mm.find(b"\n", start)
+        cc, k, display = self._mm[start:end].decode("utf-8").split("\t", 2)
+        return cc, k, display
+
+    def _lower_bound(self, table, probe: Tuple[str, ...], by_name: bool) -> int:
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cc, k, _ = self._record(table[mid])
+            # The by-name table is ordered by key only (ties by population)
+            if (k < probe[0]) if by_name else ((cc, k) < probe):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def exact(self, city: str, cc: str) -> Optional[str]:
+        cc, k = (cc or "").upper(), _key(city)
+        i = self._lower_bound(self._by_cc, (cc, k), by_name=False)
+        if i < self.n:
+            rcc, rk, display = self._record(self._by_cc[i])
+            if (rcc, rk) == (cc, k):
+                return display
+        return None
+
+    @lru_cache(maxsize=512)
+    def country_keys(self, cc: str) -> Tuple[List[str], List[str]]:
+        cc = (cc or "").upper()
+        i = self._lower_bound(self._by_cc, (cc, ""), by_name=False)
+        keys, names = [], []
+        while i < self.n:
+            rcc, rk, display = self._record(self._by_cc[i])
+            if rcc != cc:
+                break
+            keys.append(rk)
+            names.append(display)
+            i += 1
+        return keys, names
+
+    @lru_cache(maxsize=4096)
+    def fuzzy(self, city: str, cc: str) -> Optional[str]:
+        from rapidfuzz import process, fuzz
+        keys, names = self.country_keys((cc or "").upper())
+        if not keys:
+            return None
+        # Whole-string similarity only (WRatio also scores substrings: "pur" ~ "jaipur"), and the
+        # lengths must be close so a truncated name never lands on a different, longer city
+        q = _key(city)
+        for key, _, i in process.extract(q, keys, scorer=fuzz.token_sort_ratio,
+                                         score_cutoff=GAZETTEER_FUZZY_CUTOFF, limit=5):
+            if min(len(q), len(key)) >= 0.8 * max(len(q), len(key)):
+                return names[i]
+        return None
+
+    def lookup(self, city: str, cc: str) -> Optional[str]:
+        # Exact name or alternate name first; the fuzzy pass only for misspellings
+        return self.exact(city, cc) or self.fuzzy(city, (cc or "").upper())
+
+    def suggest(self, city: str) -> Optional[Tuple[str, str]]:
+        # Most populous exact-name match in any country: (display, ISO alpha-2)
+        k = _key(city)
+        i = self._lower_bound(self._by_name, (k,), by_name=True)
+        if i < self.n:
+            rcc, rk, display = self._record(self._by_name[i])
+            if rk == k:
+                return display, rcc
+        return None
+
+    def close(self) -> None:
+        self.country_keys.cache_clear()
+        self.fuzzy.cache_clear()
+        self._by_cc.release()
+        self._by_name.release()
+        self._view.release()
+        self._mm.close()
+        self._f.close()
+
+_gazetteer: Gazetteer | None = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer() -> Gazetteer | None:
+    # None when no index has been built; hybrid mode then uses Nominatim, offline mode refuses
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None and os.path.exists(GAZETTEER_PATH):
+            _gazetteer = Gazetteer(GAZETTEER_PATH)
+        return _gazetteer
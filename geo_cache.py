@@ -0,0 +1,163 @@
+# geo_cache.py
+import os, re, json, time, sqlite3, threading, logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("talentscout.geo")
+
+GEOCODE_DB = os.getenv("GEOCODE_DB", os.path.join(os.path.dirname(__file__), "data", "cache", "geocode.sqlite3"))
+GEOCODE_TTL = float(os.getenv("GEOCODE_TTL", str(30 * 86400)))           # positive hits
+GEOCODE_NEG_TTL = float(os.getenv("GEOCODE_NEG_TTL", str(86400)))        # "not found"
+GEOCODE_MIN_INTERVAL = float(os.getenv("GEOCODE_MIN_INTERVAL", "1.0"))   # Nominatim policy: 1 req/s
+GEOCODE_MAX_WAIT = float(os.getenv("GEOCODE_MAX_WAIT", "10"))
+GEOCODER_USER_AGENT = os.getenv("GEOCODER_USER_AGENT", "talentscout_app")
+# Point at a local Nominatim-compatible stub, e.g. GEOCODER_DOMAIN=localhost:8088 GEOCODER_SCHEME=http
+GEOCODER_DOMAIN = os.getenv("GEOCODER_DOMAIN", "")
+GEOCODER_SCHEME = os.getenv("GEOCODER_SCHEME", "https")
+
+class GeocoderBusy(RuntimeError):
+    pass
+
+class RateLimiter:
+    """
+    FIFO slot reservation: every caller books the next free slot under the lock and
+    sleeps until it, so concurrent sessions in this process never exceed one request
+    per `min_interval` seconds.
+    """
+
+    def __init__(self, min_interval: float = GEOCODE_MIN_INTERVAL, max_wait: float = GEOCODE_MAX_WAIT):
+        self.min_interval = min_interval
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.waited = 0.0
+
+    def acquire(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            if slot - now > self.max_wait:
+                raise GeocoderBusy("geocoder queue is full")
+            self._next_slot = slot + self.min_interval
+            self.waited += slot - now
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+class GeocodeCache:
+    """In-memory dict in front of a SQLite table; entries carry their own expiry."""
+
+    def __init__(self, path: str = GEOCODE_DB, ttl: float = GEOCODE_TTL, neg_ttl: float = GEOCODE_NEG_TTL):
+        self.ttl, self.neg_ttl = ttl, neg_ttl
+        self._mem: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " city TEXT NOT NULL, country TEXT NOT NULL, found INTEGER NOT NULL,"
+                " payload TEXT, expires REAL NOT NULL, PRIMARY KEY (city, country))"
+            )
+            self._db.commit()
+
+    def get(self, key: tuple) -> tuple[bool, Optional[Dict[str, Any]]]:
+        # Returns (cached, payload); payload None with cached=True is a negative entry
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is None and self._db is not None:
+                row = self._db.execute("SELECT found, payload, expires FROM geocode WHERE city=? AND country=?",
+                                       key).fetchone()
+                if row:
+                    hit = (json.loads(row[1]) if row[0] else None, row[2])
+                    self._mem[key] = hit
+            if hit is None:
+                return False, None
+            payload, expires = hit
+            if expires < now:
+                self._mem.pop(key, None)
+                return False, None
+            return True, payload
+
+    def put(self, key: tuple, payload: Optional[Dict[str, Any]]) -> None:
+        expires = time.time() + (self.ttl if payload is not None else self.neg_ttl)
+        with self._lock:
+            self._mem[key] = (payload, expires)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode (city, country, found, payload, expires) VALUES (?,?,?,?,?)",
+                    (*key, 1 if payload is not None else 0, json.dumps(payload) if payload else None, expires),
+                )
+                self._db.commit()
+
+def _default_geocoder():
+    from geopy.geocoders import Nominatim
+    kwargs = {"user_agent": GEOCODER_USER_AGENT, "timeout": 10}
+    if GEOCODER_DOMAIN:
+        kwargs.update(domain=GEOCODER_DOMAIN, scheme=GEOCODER_SCHEME)
+    return Nominatim(**kwargs)
+
+def _norm_city(city: str) -> str:
+    return re.sub(r"\s+", " ", (city or "").strip()).casefold()
+
+class CachedGeocoder:
+    """
+    Resolves (city, ISO alpha-2 country or "" for a global probe) to
+    {"city": ..., "country": ...} or None, consulting the cache first and
+    rate-limiting the live calls that remain.
+    """
+
+    def __init__(self, geocoder=None, cache: GeocodeCache | None = None, limiter: RateLimiter | None = None):
+        self._geocoder = geocoder
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.limiter = limiter or RateLimiter()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "live_calls": 0}
+
+    @property
+    def geocoder(self):
+        if self._geocoder is None:
+            self._geocoder = _default_geocoder()
+        return self._geocoder
+
+    def lookup(self, city: str, country_code: str = "") -> Optional[Dict[str, str]]:
+        key = (_norm_city(city), (country_code or "").upper())
+        cached, payload = self.cache.get(key)
+        if cached:
+            self.stats["hits" if payload is not None else "negative_hits"] += 1
+            return payload
+        self.stats["misses"] += 1
+        self.limiter.acquire()
+        self.stats["live_calls"] += 1
+        kwargs = {"addressdetails": True, "exactly_one": True}
+        if key[1]:
+            kwargs["country_codes"] = key[1]
+        # Service errors propagate and are never cached
+        loc = self.geocoder.geocode(city.strip(), **kwargs)
+        payload = None
+        if loc:
+            addr = (getattr(loc, "raw", None) or {}).get("address", {})
+            if addr.get("country"):
+                payload = {"country": addr["country"],
+                           "city": addr.get("city") or addr.get("town") or addr.get("village") or city.strip()}
+        self.cache.put(key, payload)
+        return payload
+
+_instance: CachedGeocoder | None = None
+_instance_lock = threading.Lock()
+
+def get_geocoder() -> CachedGeocoder:
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = CachedGeocoder()
+        return _instance
+
+def set_geocoder(geocoder, cache: GeocodeCache | None = None, limiter: RateLimiter | None = None) -> CachedGeocoder:
+    # Swap in a stub geocoder (anything with a geopy-style .geocode) for tests and load runs
+    global _instance
+    with _instance_lock:
+        _instance = CachedGeocoder(geocoder, cache=cache, limiter=limiter)
+        return _instance
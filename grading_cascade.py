@@ -0,0 +1,159 @@
+# grading_cascade.py
+from __future__ import annotations
+import os, re, json, time, threading, logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from perf_stats import Timings
+from rubric_engine import get_rubric, tokenize
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger("talentscout.cascade")
+
+REFERENCE_ANSWERS_PATH = os.getenv("REFERENCE_ANSWERS_PATH", os.path.join(os.path.dirname(__file__), "resources", "reference_answers.json"))
+# Local scores inside [LOW, HIGH) are uncertain and go to the LLM; LOW=0, HIGH=1.01 sends every answer there
+GRADE_BAND_LOW = float(os.getenv("GRADE_BAND_LOW", "0.3"))
+GRADE_BAND_HIGH = float(os.getenv("GRADE_BAND_HIGH", "0.8"))
+# Cosine similarity to the closest reference that counts as full coverage
+GRADE_SIM_FULL = float(os.getenv("GRADE_SIM_FULL", "0.35"))
+
+TIERS = ("local", "llm", "fallback", "rubric")
+
+_NON_ANSWER = re.compile(r"^\W*(?:i\s*(?:do\s*n[o']?t|dont)\s*know|idk|no\s*idea|not\s*sure|pass|skip|n/?a|none|nothing|no)\W*$",
+                         re.IGNORECASE)
+_MIN_WORDS = 3
+
+class LocalGrader:
+    """
+    Cheap first tier of the grading cascade. Each topic has a set of reference
+    documents: the curated reference answers plus its rubric keywords repeated
+    by weight. They are TF-IDF encoded once into an L2-normalized float32
+    matrix, so scoring a batch of answers is one matrix product. The local score
+    in [0, 1] averages rubric coverage and the best cosine similarity to the
+    topic's references.
+    """
+
+    def __init__(self, references: Dict[str, List[str]]):
+        import numpy as np  # first grade only, keeps it off app startup
+        self.rubric = get_rubric()
+        docs: List[List[str]] = []
+        doc_topic: List[int] = []
+        for t, topic in enumerate(self.rubric.topics):
+            kws = self.rubric.weights
+            bag = []
+            for kid, w in enumerate(kws):
+                if t in w:
+                    bag += list(tokenize(self.rubric.keywords[kid])) * int(round(w[t]))
+            docs.append(bag)
+            doc_topic.append(t)
+            for ref in references.get(topic, []):
+                docs.append(list(tokenize(ref)))
+                doc_topic.append(t)
+        vocab: Dict[str, int] = {}
+        for d in docs:
+            for w in d:
+                vocab.setdefault(w, len(vocab))
+        self.vocab = vocab
+        self.doc_topic = np.asarray(doc_topic, dtype=np.int32)
+        df = np.zeros(len(vocab), dtype=np.float32)
+        for d in docs:
+            df[[vocab[w] for w in set(d)]] += 1
+        self.idf = np.log((1 + len(docs)) / (1 + df)).astype(np.float32) + 1.0
+        self.refs = self._encode(docs)
+
+    @classmethod
+    def from_file(cls, path: str = REFERENCE_ANSWERS_PATH) -> "LocalGrader":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                refs = json.load(f)
+        except FileNotFoundError:
+            logger.warning("No reference answers at %s; local tier uses rubric keywords only", path)
+            refs = {}
+        return cls(refs)
+
+    def _encode(self, docs: List[List[str]]) -> np.ndarray:
+        import numpy as np
+        m = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for i, d in enumerate(docs):
+            cols = [self.vocab[w] for w in d if w in self.vocab]
+            if cols:
+                np.add.at(m[i], cols, 1.0)
+        np.log1p(m, out=m)  # sublinear tf
+        m *= self.idf
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        return m / np.where(norms > 0, norms, 1.0)
+
+    def similarity(self, topics: List[Optional[int]], answers: List[str]) -> np.ndarray:
+        """Best cosine similarity of each answer to its topic's references (any topic if unknown)."""
+        import numpy as np
+        sims = self._encode([list(tokenize(a)) for a in answers]) @ self.refs.T
+        out = np.zeros(len(answers), dtype=np.float32)
+        for i, t in enumerate(topics):
+            row = sims[i] if t is None else sims[i, self.doc_topic == t]
+            out[i] = row.max() if row.size else 0.0
+        return out
+
+    def grade_batch(self, pairs: List[Tuple[Dict, str]]) -> List[Dict]:
+        """Verdict, local score and confidence per pair; 'decided' is False inside the uncertainty band."""
+        if not pairs:
+            return []
+        scored = [self.rubric.score(q.get("topic") or "", a or "") for q, a in pairs]
+        sims = self.similarity([t for _, _, t in scored], [a or "" for _, a in pairs])
+        out = []
+        for (q, a), (total, matched, t), sim in zip(pairs, scored, sims):
+            text = (a or "").strip()
+            if _NON_ANSWER.match(text) or len(tokenize(text)) < _MIN_WORDS:
+                score = 0.0
+            else:
+                coverage = min(1.0, total / max(self.rubric.pass_score_for(q.get("difficulty")), 1e-9) / 2)
+                score = 0.5 * coverage + 0.5 * min(1.0, float(sim) / GRADE_SIM_FULL)
+            verdict = "pass" if score >= 0.5 else "needs_improvement"
+            out.append({"verdict": verdict, "feedback": self.rubric.feedback(verdict, matched, t),
+                        "score": round(score, 3), "confidence": round(abs(score - 0.5) * 2, 3),
+                        "decided": not (GRADE_BAND_LOW <= score < GRADE_BAND_HIGH)})
+        return out
+
+    def grade(self, question: Dict, answer: str) -> Dict:
+        return self.grade_batch([(question, answer)])[0]
+
+class CascadeStats:
+    """Which tier decided each answer, with per-tier latency, shared by all sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {t: 0 for t in TIERS}
+        self.timings = {t: Timings(name=f"{t} grade") for t in TIERS}
+
+    def record(self, tier: str, seconds: float, n: int = 1) -> None:
+        with self._lock:
+            self.counts[tier] = self.counts.get(tier, 0) + n
+        self.timings.setdefault(tier, Timings(name=f"{tier} grade")).record(seconds / max(n, 1))
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        out = {"band": [GRADE_BAND_LOW, GRADE_BAND_HIGH], "graded": total}
+        for t, n in counts.items():
+            if n:
+                s = self.timings[t].summary()
+                out[t] = {"count": n, "share": round(n / total, 3), "p50_ms": s.get("p50_ms"), "p95_ms": s.get("p95_ms")}
+        return out
+
+_grader: LocalGrader | None = None
+_stats = CascadeStats()
+_grader_lock = threading.Lock()
+
+def get_local_grader() -> LocalGrader:
+    global _grader
+    with _grader_lock:
+        if _grader is None:
+            _grader = LocalGrader.from_file()
+        return _grader
+
+def record_tier(tier: str, started: float, n: int = 1) -> None:
+    _stats.record(tier, time.perf_counter() - started, n)
+
+def cascade_stats() -> Dict[str, Dict]:
+    return _stats.summary()
@@ -0,0 +1,51 @@
+# grading_worker.py
+import os, logging
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Dict, List, Tuple
+
+from llm_service import grade_answer, fallback_grade
+
+logger = logging.getLogger("talentscout.grading")
+
+GRADING_WORKERS = int(os.getenv("GRADING_WORKERS", "4"))
+GRADE_SETTLE_TIMEOUT = float(os.getenv("GRADE_SETTLE_TIMEOUT", "30"))
+
+PendingGrade = Tuple[int, Future, Dict, str]  # (question index, future, question, answer)
+
+# One pool per process, shared by all sessions
+_pool = ThreadPoolExecutor(max_workers=GRADING_WORKERS, thread_name_prefix="grader")
+
+def _grade_safe(question: Dict, answer: str, language: str) -> Dict:
+    try:
+        return grade_answer(question, answer, language=language)
+    except Exception as e:
+        logger.warning("Background grading failed, using heuristic: %s", e)
+        return fallback_grade(question, answer)
+
+def submit_grade(question: Dict, answer: str, language: str = "en") -> Future:
+    return _pool.submit(_grade_safe, question, answer, language)
+
+def ready_in_order(pending: List[PendingGrade]) -> List[Tuple[int, Dict]]:
+    """
+    Pops finished grades from the front of `pending` (kept in question order) and
+    stops at the first unfinished one, so verdicts are always released in order.
+    """
+    out = []
+    while pending and pending[0][1].done():
+        idx, fut, _, _ = pending.pop(0)
+        out.append((idx, fut.result()))
+    return out
+
+def settle_all(pending: List[PendingGrade],
+               timeout: float = GRADE_SETTLE_TIMEOUT) -> List[Tuple[int, Dict]]:
+    # Barrier: wait for every outstanding grade; stragglers get the heuristic verdict
+    wait([f for _, f, _, _ in pending], timeout=timeout)
+    out = []
+    for idx, fut, question, answer in pending:
+        if fut.done():
+            out.append((idx, fut.result()))
+        else:
+            fut.cancel()
+            out.append((idx, fallback_grade(question, answer)))
+    pending.clear()
+    return out
@@ -0,0 +1,650 @@
+# interview_session.py
+import os, re, json, uuid, logging
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_schemas import Candidate, TechStack, END_KEYWORDS
+from llm_service import (generate_questions, stream_questions, grade_answer, grade_answers_batch,
+                         BATCH_GRADING, STREAM_QUESTIONS)
+from data_storage import save_candidate, load_candidate, save_answers, save_profile, load_profile
+from text_utils import csv_or_list, is_affirmative
+from enrichment import get_enricher
+from grading_worker import submit_grade, ready_in_order, settle_all, PendingGrade
+from event_log import (EventLog, EventLogError, get_event_log, replay_session, EVENT_LOG, CONSENT, FIELD_SET, QUESTIONS_READY,
+                       QUESTION_ASKED, ANSWER, GRADE, MESSAGE, EXIT)
+from geo_cache import get_geocoder
+from gazetteer import get_gazetteer, GAZETTEER_PATH
+from stack_matcher import get_matcher
+from country_index import get_country_index
+from field_validators import normalize_phone
+
+logger = logging.getLogger("talentscout.session")
+
+# Grade answers on a worker pool and move to the next question without waiting
+ASYNC_GRADING = os.getenv("ASYNC_GRADING", "false").lower() == "true"
+# nominatim (live geocoding), offline (gazetteer only) or hybrid (gazetteer, then Nominatim)
+LOCATION_MODE = os.getenv("LOCATION_MODE", "nominatim").lower()
+# Score sentiment on a worker and attach the badge when it is ready
+ENRICH_ASYNC = os.getenv("ENRICH_ASYNC", "false").lower() == "true"
+
+Message = Dict  # {"role", "content", "meta"}
+SNAPSHOT_VERSION = 1
+_ISO_LANG = re.compile(r"[A-Za-z]{2,3}(-[A-Za-z]{2})?")
+
+# --------------- Minimal i18n strings (extend as needed) ---------------
+I18N = {
+    "en": {
+        "greet": "Hello! I'm TalentScout, the hiring assistant for technology roles. I'll gather a few details and then ask tailored technical questions; type 'exit' or 'bye' anytime to finish.",
+        "ask_name": "What is the full name?",
+        "ask_email": "What is the email address?",
+        "ask_phone": "What is the phone number with country code ",
+        "ask_yexp": "How many years of professional experience?",
+        "ask_roles": "What position(s) are desired? (e.g., 'Backend Engineer; MLE')",
+        "ask_loc": "What is the current location (City, Country)?",
+        "ask_stack": "Could you share the primary technologies worked with recently? For example: Python, Django, PostgreSQL, Docker.",
+        "thanks": "Thanks for the time. This conversation is now closed. Expect a follow-up email with next steps."
+    },
+    "hi": {
+        "greet": "नमस्ते! मैं TalentScout हूँ, तकनीकी भूमिकाओं के लिए भर्ती सहायक। कुछ विवरण लेकर उपयुक्त तकनीकी प्रश्न पूछूँगा; समाप्त करने के लिए 'exit' या 'bye' टाइप करें।",
+        "ask_name": "पूरा नाम क्या है?",
+        "ask_email": "ईमेल पता क्या है?",
+        "ask_phone": "फ़ोन नंबर देश कोड सहित",
+        "ask_yexp": "कुल अनुभव (वर्षों में) कितना है?",
+        "ask_roles": "वांछित पद क्या हैं? (उदा., 'Backend Engineer; MLE')",
+        "ask_loc": "वर्तमान स्थान (शहर, देश) क्या है?",
+        "ask_stack": "हाल ही में किन तकनीकों पर काम किया है? उदाहरण: Python, Django, PostgreSQL, Docker.",
+        "thanks": "समय देने के लिए धन्यवाद। यह वार्तालाप अब समाप्त है। आगे की प्रक्रिया की सूचना दी जाएगी।"
+    }
+}
+
+# ---- Guards ----
+def ensure_text(x) -> str:
+    if x is None:
+        return ""
+    if isinstance(x, (dict, list)):
+        if isinstance(x, dict) and "content" in x and isinstance(x["content"], str):
+            return x["content"]
+        try:
+            return json.dumps(x, ensure_ascii=False)
+        except Exception:
+            return str(x)
+    if isinstance(x, (bytes, bytearray)):
+        try:
+            return x.decode("utf-8", "ignore")
+        except Exception:
+            return str(x)
+    return str(x)
+
+def is_exit(text: str) -> bool:
+    lower = ensure_text(text).strip().lower()
+    tokens = re.findall(r"\w+", lower)
+    return any(k in tokens or k == lower for k in END_KEYWORDS)
+
+def is_language_code(code: str) -> bool:
+    # ISO language override guard (e.g., 'en', 'hi', 'ar' or 'en-US')
+    return bool(_ISO_LANG.fullmatch(code or ""))
+
+# ---------------- Strong field validation ----------------
+def validate_full_name(name: str) -> str:
+    s = re.sub(r"\s+", " ", ensure_text(name).strip())
+    parts = [p for p in s.split(" ") if p]
+    if len(parts) < 2:
+        raise ValueError("Please enter first and last name")
+    if any(not re.fullmatch(r"[A-Za-z][A-Za-z.'\-]{1,}", p) for p in parts):
+        raise ValueError("Name must contain only letters and common separators")
+    if len(s) < 4 or len(s) > 100:
+        raise ValueError("Name length must be 4-100 characters")
+    return " ".join(p.capitalize() for p in parts)
+
+TECH_ROLE_KEYWORDS = {
+    "engineer","developer","dev","data","ml","ai","machine","learning","backend","front",
+    "frontend","full","stack","fullstack","devops","site","reliability","sre","mobile",
+    "android","ios","qa","test","testing","automation","cloud","platform","security",
+    "analyst","scientist","architect","etl","mle","nlp","cv","vision","infra","infrastructure"
+}
+def validate_positions_strict(text: str) -> list:
+    items = [x.strip() for x in re.split(r"[;,]", ensure_text(text)) if x.strip()]
+    if not items:
+        raise ValueError("Please provide at least one role")
+    ok = []
+    for it in items:
+        if not re.fullmatch(r"[A-Za-z0-9 /&+\-_.]{2,50}", it):
+            raise ValueError(f"Role contains invalid characters: {it}")
+        tokens = re.findall(r"[A-Za-z]+", it.lower())
+        if not any(k in tokens for k in TECH_ROLE_KEYWORDS):
+            raise ValueError(f"Role seems non-technical: {it}")
+        ok.append(it)
+    return ok
+
+# ---- Geocoding + country validation with fuzzy correction ----
+# STRICT city-country validation: constrain geocode by ISO country
+def normalize_location_input(text: str) -> str:
+    s = re.sub(r"\s+", " ", ensure_text(text).strip())
+    if "," not in s:
+        raise ValueError("Please provide location as 'City, Country'")
+
+    raw_city, raw_country = [p.strip() for p in s.split(",", 1)]
+    if not raw_city or not raw_country:
+        raise ValueError("Please provide both city and country")
+
+    countries = get_country_index()
+    country_obj = countries.resolve(raw_country)
+    if not country_obj:
+        raise ValueError("Country not recognized, please correct spelling")
+    country_name = country_obj.name
+    country_code = country_obj.alpha_2
+
+    gaz = get_gazetteer() if LOCATION_MODE in ("offline", "hybrid") else None
+    if gaz is None and LOCATION_MODE == "offline":
+        # Offline means no outbound calls: without the index the location cannot be checked at all
+        logger.error("LOCATION_MODE=offline but no gazetteer index at %s; build one with tools/build_gazetteer.py",
+                     GAZETTEER_PATH)
+        raise ValueError("Couldn't verify the location: no offline city index is configured")
+    if gaz is not None:
+        city = gaz.lookup(raw_city, country_code)
+        if city:
+            return f"{city}, {country_name}"
+        if LOCATION_MODE == "offline":
+            hint = gaz.suggest(raw_city)
+            hint_country = countries.get(hint[1]) if hint else None
+            if hint_country:
+                raise ValueError(f"City not found in {country_name}. Did you mean {hint[0]}, {hint_country.name}?")
+            raise ValueError(f"City '{raw_city}' not found in {country_name}. Please re-enter.")
+
+    # Cached, rate-limited Nominatim shared by all sessions (see geo_cache), constrained to the country
+    loc = get_geocoder().lookup(raw_city, country_code)
+    if not loc:
+        # Probe globally to suggest likely country if mismatch
+        probe = get_geocoder().lookup(raw_city)
+        if probe:
+            raise ValueError(f"City not found in {country_name}. Did you mean {raw_city.title()}, {probe['country']}?")
+        raise ValueError(f"City '{raw_city}' not found in {country_name}. Please re-enter.")
+
+    geo_country = loc["country"]
+    if geo_country.lower() != country_name.lower():
+        raise ValueError(f"City not found in {country_name}. Please re-enter.")
+
+    return f"{loc['city'].title()}, {country_name}"
+
+# --------- Tech stack parsing (case-insensitive & hardened) ----------
+# Vocabulary lives in resources/tech_vocab.json (or TECH_VOCAB_PATH); the matcher is built once per process
+def _match_known(token: str) -> tuple[str, str] | None:
+    return get_matcher().match_token(token)
+
+def parse_stack(text: str):
+    s = ensure_text(text)
+    # 1) JSON
+    try:
+        data = json.loads(s)
+        buckets = {"languages": [], "frameworks": [], "databases": [], "tools": []}
+        for cat in buckets:
+            for item in data.get(cat, []) or []:
+                hit = _match_known(str(item))
+                if hit and hit[0] == cat and hit[1] not in buckets[cat]:
+                    buckets[cat].append(hit[1])
+        if any(buckets.values()):
+            return buckets
+    except Exception:
+        pass
+    # 2) Labeled lines
+    buckets = {"languages": [], "frameworks": [], "databases": [], "tools": []}
+    any_label = False
+    for line in s.splitlines():
+        if ":" not in line:
+            continue
+        key, val = line.split(":", 1)
+        k = key.strip().lower()
+        if k in buckets:
+            any_label = True
+            for token in csv_or_list(val):
+                hit = _match_known(token)
+                if hit and hit[0] == k and hit[1] not in buckets[k]:
+                    buckets[k].append(hit[1])
+    if any_label and any(buckets.values()):
+        return buckets
+    # 3) Free text: one pass over the whole input, multi-word names included
+    for cat, canon in get_matcher().scan(s):
+        if canon not in buckets[cat]:
+            buckets[cat].append(canon)
+    return buckets
+
+# ---------------- Flow helpers ----------------
+def next_missing_field(cand: Candidate) -> str:
+    order = ["consent","full_name","email","phone",
+             "years_experience","desired_positions",
+             "current_location","tech_stack"]
+    missing = cand.missing_fields()
+    for f in order:
+        if f in missing:
+            return f
+    return ""
+
+_DEFAULT = object()
+
+class InterviewSession:
+    """
+    One screening conversation as a plain object: intake fields, question
+    rounds, grading and exit, with no Streamlit dependency. handle() takes one
+    user turn and returns the messages it produced; poll() releases background
+    grades and sentiment badges. snapshot()/restore() give a compact JSON-able
+    form (questions are referenced by index, defaults are omitted), and
+    resume() rebuilds a session from its event log.
+    """
+
+    def __init__(self, sid: Optional[str] = None, events=_DEFAULT, async_grading: bool = ASYNC_GRADING,
+                 batch_grading: bool = BATCH_GRADING, enrich_async: bool = ENRICH_ASYNC):
+        self.sid = sid or str(uuid.uuid4())[:8]
+        self.candidate: Dict = Candidate().model_dump()
+        self.phase = "greet"
+        self.questions: List[Dict] = []
+        self.q_index = 0
+        self.answers: List[Dict] = []
+        self.messages: List[Message] = []
+        self.language = "en"
+        # personalization prefs (language is above); difficulty + recent topics
+        self.prefs = {"preferred_difficulty": "auto", "recent_topics": []}
+        self.pending_grades: List[PendingGrade] = []  # (index, future, question, answer), in question order
+        self.pending_enrich: List[Tuple[int, Future]] = []  # (message index, sentiment future)
+        # Append-only event log, per session; starts once consent is given. None turns it off (load tests)
+        self.events: Optional[EventLog] = (get_event_log() if EVENT_LOG else None) if events is _DEFAULT else events
+        self.async_grading = async_grading
+        self.batch_grading = batch_grading
+        self.enrich_async = enrich_async
+        self.enricher = get_enricher()
+
+    # ---- helpers ----
+    def t(self, key: str) -> str:
+        # Use base language (e.g., "en" from "en-US")
+        lang = (self.language or "en").split("-")[0]
+        return I18N.get(lang, I18N["en"]).get(key, I18N["en"].get(key, key))
+
+    def log_event(self, etype: str, durable: bool = False, **data):
+        if self.events is None:
+            return
+        if etype != CONSENT and not self.candidate.get("consent"):
+            return
+        try:
+            self.events.append(self.sid, etype, data, durable=durable)
+        except EventLogError as e:
+            # The record store (save) still has the outcome; the log just misses this event
+            logger.error("%s", e)
+
+    def say(self, role: str, text: str, meta: dict = None):
+        self.messages.append({"role": role, "content": text, "meta": meta or {}})
+        self.log_event(MESSAGE, role=role, content=text, meta=meta or {})
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.pending_grades or self.pending_enrich)
+
+    def has_ready(self) -> bool:
+        # A background grade or badge is ready to be shown
+        pending = self.pending_grades
+        return bool((pending and pending[0][1].done()) or any(f.done() for _, f in self.pending_enrich))
+
+    def may_call_llm(self, text: str) -> bool:
+        # Whether handle(text) can reach the question/grading provider; servers gate these turns
+        if is_exit(text):
+            return self.batch_grading and any(a["verdict"] == "Pending" for a in self.answers)
+        if self.phase == "questions":
+            return not self.batch_grading or self.q_index >= len(self.questions) - 1
+        return next_missing_field(Candidate(**self.candidate)) == "tech_stack"
+
+    def ask_for(self, field: str):
+        prompts = {
+            "consent": "May I collect a few basic details to begin the screening? Reply 'yes' to proceed or 'exit' to stop.",
+            "full_name": self.t("ask_name"),
+            "email": self.t("ask_email"),
+            "phone": self.t("ask_phone"),
+            "years_experience": self.t("ask_yexp"),
+            "desired_positions": self.t("ask_roles"),
+            "current_location": self.t("ask_loc"),
+            "tech_stack": self.t("ask_stack"),
+        }
+        self.say("assistant", prompts[field])
+
+    def ask_current_question(self):
+        i = self.q_index
+        if 0 <= i < len(self.questions):
+            q = self.questions[i]
+            self.log_event(QUESTION_ASKED, index=i, question=q)
+            self.say("assistant", f"Q{i+1}. [{q['topic']}, {q['difficulty']}] {q['question']}")
+        else:
+            self.say("assistant", "No more questions.")
+
+    # ---- grading ----
+    def attach_grade(self, idx: int, result: dict, label: bool = False):
+        verdict = result.get("verdict", "needs_improvement").replace("_", " ").title()
+        feedback = result.get("feedback", "").strip()
+        tier = result.get("tier")  # which cascade tier decided it, for tuning GRADE_BAND_*
+        self.answers[idx].update({"verdict": verdict, "feedback": feedback, "tier": tier})
+        self.log_event(GRADE, index=idx, verdict=verdict, feedback=feedback, tier=tier)
+        prefix = f"Evaluation for Q{idx+1}" if label else "Evaluation"
+        self.say("assistant", f"{prefix}: {verdict}. {feedback}" if feedback else f"{prefix}: {verdict}.")
+
+    def release_ready_grades(self):
+        for idx, result in ready_in_order(self.pending_grades):
+            self.attach_grade(idx, result, label=True)
+
+    def settle_grades(self):
+        # Barrier before wrap-up/exit: every answer carries its verdict afterwards
+        for idx, result in settle_all(self.pending_grades):
+            self.attach_grade(idx, result, label=True)
+        if self.batch_grading:
+            todo = [i for i, a in enumerate(self.answers) if a["verdict"] == "Pending"]
+            results = grade_answers_batch([self.answers[i]["question"] for i in todo],
+                                          [self.answers[i]["answer"] for i in todo],
+                                          language=self.language or "en")
+            for idx, result in zip(todo, results):
+                self.attach_grade(idx, result, label=True)
+
+    def release_enrichment(self, wait: bool = False):
+        # Attach finished sentiment badges to their messages
+        keep = []
+        for idx, fut in self.pending_enrich:
+            if wait or fut.done():
+                meta = self.messages[idx]["meta"]
+                meta["sentiment"] = fut.result()
+                # Enrichment version: renderers caching this message see that a badge arrived late
+                meta["ev"] = meta.get("ev", 0) + 1
+            else:
+                keep.append((idx, fut))
+        self.pending_enrich = keep
+
+    def _requeue(self):
+        # Work that was in flight when the session was saved: grades and badges are computed again
+        self.pending_grades = [
+            (i, submit_grade(a["question"], a["answer"], self.language), a["question"], a["answer"])
+            for i, a in enumerate(self.answers) if a["verdict"] == "Pending"
+        ] if not self.batch_grading else []
+        self.pending_enrich = [(i, self.enricher.submit_sentiment(m["content"])) for i, m in enumerate(self.messages)
+                               if m["role"] == "user" and "sentiment" in m["meta"] and m["meta"]["sentiment"] is None]
+
+    # ---- intake ----
+    def validate_and_set(self, field: str, text: str) -> bool:
+        c = Candidate(**self.candidate)
+        try:
+            ttxt = ensure_text(text).strip()
+
+            if field == "consent":
+                if is_affirmative(ttxt):
+                    c.consent = True
+                else:
+                    self.say("assistant", "No problem. Type 'yes' to proceed with consent or 'exit' to end.")
+                    self.candidate = c.model_dump()
+                    return False
+
+            elif field == "full_name":
+                c.full_name = validate_full_name(ttxt)
+
+            elif field == "email":
+                # Simplified email validation with basic regex
+                email_regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+                if not re.match(email_regex, ttxt):
+                    raise ValueError("Invalid email format")
+
+                # Normalize email by lowercasing
+                c.email = ttxt.lower()
+
+                # Load personalization for this email if present
+                prof = load_profile(c.email) or {}
+                if prof.get("language"):
+                    self.language = prof["language"]
+                if prof.get("preferred_difficulty"):
+                    self.prefs["preferred_difficulty"] = prof["preferred_difficulty"]
+                if prof.get("recent_topics"):
+                    self.prefs["recent_topics"] = prof["recent_topics"][:8]
+
+            elif field == "phone":
+                c.phone = normalize_phone(ttxt, os.getenv("DEFAULT_REGION", None))
+
+            elif field == "years_experience":
+                val = float(ttxt)
+                if not (0 <= val <= 60):
+                    raise ValueError("Years must be between 0 and 60")
+                c.years_experience = val
+
+            elif field == "desired_positions":
+                c.desired_positions = validate_positions_strict(ttxt)
+
+            elif field == "current_location":
+                c.current_location = normalize_location_input(ttxt)
+
+            elif field == "tech_stack":
+                parsed = parse_stack(text)
+                if not any(parsed.values()):
+                    self.say("assistant", "That input doesn't look like a technology list. Please enter items like 'Python, Django, PostgreSQL, Docker'.")
+                    self.candidate = c.model_dump()
+                    return False
+                c.tech_stack = TechStack(**parsed)
+                # Update recent topics for personalization
+                topics = []
+                for k in ("languages","frameworks","databases","tools"):
+                    topics.extend(parsed.get(k, []))
+                if topics:
+                    self.prefs["recent_topics"] = list(dict.fromkeys(topics))[:8]
+
+            self.candidate = c.model_dump()
+            if field == "consent":
+                self.log_event(CONSENT)
+                # Backfill the transcript so far; later messages are logged as they are said
+                for m in self.messages:
+                    self.log_event(MESSAGE, **m)
+            else:
+                self.log_event(FIELD_SET, field=field, value=self.candidate.get(field))
+            return True
+
+        except Exception:
+            self.say("assistant", f"That doesn't look valid for {field}. Please re-check and try again, or type 'exit' to finish.")
+            return False
+
+    def _prepare_questions(self, cand: Candidate, on_progress: Optional[Callable[[], None]]):
+        stack_dict = cand.tech_stack.model_dump() if cand.tech_stack else {}
+        # Make preferred difficulty available for downstream logic if used
+        os.environ["PREFERRED_DIFFICULTY"] = self.prefs.get("preferred_difficulty", "auto")
+        lang = cand.language or self.language
+        self.questions = []
+        self.q_index = 0
+        self.answers = []
+        if STREAM_QUESTIONS:
+            # Ask Q1 as soon as it is parsed; the rest keep arriving while it is on screen
+            for q in stream_questions(stack_dict, language=lang):
+                self.questions.append(q)
+                if len(self.questions) == 1:
+                    self.phase = "questions"
+                    self.ask_current_question()
+                    if on_progress:
+                        on_progress()
+        else:
+            qs, err = generate_questions(stack_dict, language=lang)
+            self.questions = qs or []
+        if self.questions:
+            self.log_event(QUESTIONS_READY, questions=self.questions)
+            if self.phase != "questions":
+                self.phase = "questions"
+                self.ask_current_question()
+        else:
+            self.say("assistant", "Unable to prepare questions right now. Please try again or type 'exit' to finish.")
+
+    # ---- turns ----
+    def start(self) -> List[Message]:
+        # Greeting; a no-op once the conversation is under way
+        start = len(self.messages)
+        if self.phase == "greet":
+            self.say("assistant", self.t("greet"))
+            self.phase = "gather"
+        return self.messages[start:]
+
+    def handle(self, text: str, on_progress: Optional[Callable[[], None]] = None) -> List[Message]:
+        """
+        One user turn. Returns the messages it added (the user's own included).
+        on_progress is called once the first streamed question has been asked.
+        """
+        self.start()
+        start = len(self.messages)
+        # Auto language detection unless user explicitly overrode with valid ISO
+        if not is_language_code(self.language):
+            self.language = self.enricher.language(text, default=self.language or "en")
+
+        if self.enrich_async:
+            self.say("user", ensure_text(text), meta={"lang": self.language, "sentiment": None})
+            self.pending_enrich.append((len(self.messages) - 1, self.enricher.submit_sentiment(text)))
+        else:
+            sent = self.enricher.sentiment(text)
+            self.say("user", ensure_text(text), meta={"lang": self.language, "sentiment": sent})
+
+        if is_exit(text):
+            self.release_enrichment(wait=True)
+            self.settle_grades()
+            self.say("assistant", self.t("thanks"))
+            self.phase = "end"
+            self.log_event(EXIT, durable=True)
+            return self.messages[start:]
+
+        if self.phase == "questions":
+            self._answer(ensure_text(text))
+        else:
+            cand = Candidate(**self.candidate)
+            if not cand.language:
+                cand.language = self.language
+                self.candidate = cand.model_dump()
+                self.log_event(FIELD_SET, field="language", value=cand.language)
+
+            missing = next_missing_field(cand)
+            if missing:
+                if self.validate_and_set(missing, text):
+                    cand = Candidate(**self.candidate)
+                    next_field = next_missing_field(cand)
+                    if next_field:
+                        self.ask_for(next_field)
+                    else:
+                        self._prepare_questions(cand, on_progress)
+                else:
+                    self.ask_for(missing)
+            else:
+                self.say("assistant", "Noted. Type 'exit' to conclude, or add more details.")
+        return self.messages[start:]
+
+    def _answer(self, answer: str):
+        i = self.q_index
+        if not 0 <= i < len(self.questions):
+            self.say("assistant", "No more questions. Type 'exit' to finish or share more details.")
+            return
+        q = self.questions[i]
+        lang = self.language or "en"
+        self.answers.append({"question": q, "answer": answer, "verdict": "Pending", "feedback": ""})
+        self.log_event(ANSWER, index=i, question=q, answer=answer)
+        if self.batch_grading:
+            pass  # graded together by settle_grades() at wrap-up
+        elif self.async_grading:
+            self.pending_grades.append((i, submit_grade(q, answer, lang), q, answer))
+            self.release_ready_grades()
+        else:
+            self.attach_grade(i, grade_answer(q, answer, language=lang))
+        self.q_index += 1
+        if self.q_index < len(self.questions):
+            self.ask_current_question()
+        else:
+            self.settle_grades()
+            self.say("assistant", "Thanks for answering the questions. Type 'exit' to finish or share more details.")
+            self.phase = "wrapup"
+
+    def poll(self, wait: bool = False) -> List[Message]:
+        # Releases finished background grades (in question order) and sentiment badges
+        start = len(self.messages)
+        if wait:
+            self.settle_grades()
+        else:
+            self.release_ready_grades()
+        self.release_enrichment(wait=wait)
+        return self.messages[start:]
+
+    # ---- records ----
+    def save(self) -> bool:
+        if not self.candidate.get("consent"):
+            return False
+        save_candidate(self.sid, self.candidate)
+        if self.answers:
+            save_answers(self.sid, self.answers)
+        # Persist personalization by email if available
+        if self.candidate.get("email"):
+            save_profile(self.candidate["email"], {
+                "language": self.language,
+                "preferred_difficulty": self.prefs.get("preferred_difficulty", "auto"),
+                "recent_topics": self.prefs.get("recent_topics", [])
+            })
+        return True
+
+    def load_record(self, cid: str) -> bool:
+        rec = load_candidate(cid)
+        if not rec:
+            return False
+        self.candidate = rec
+        self.messages.append({"role": "assistant", "content": f"Record {cid} loaded into session.", "meta": {}})
+        return True
+
+    def state(self) -> Dict:
+        return {"candidate": self.candidate, "candidate_id": self.sid, "phase": self.phase,
+                "questions": self.questions, "q_index": self.q_index, "answers": self.answers,
+                "prefs": self.prefs, "language": self.language}
+
+    # ---- serialization ----
+    def snapshot(self) -> Dict:
+        """Compact JSON-able state; in-flight grades/badges are recomputed on restore."""
+        answers = []
+        for i, a in enumerate(self.answers):
+            q = a["question"]
+            ref = i if i < len(self.questions) and self.questions[i] == q else q
+            row = [ref, a["answer"], a["verdict"]]
+            if a.get("feedback") or a.get("tier"):
+                row += [a.get("feedback", ""), a.get("tier")]
+            answers.append(row)
+        snap = {"v": SNAPSHOT_VERSION, "sid": self.sid, "phase": self.phase, "lang": self.language,
+                "cand": {k: v for k, v in self.candidate.items() if v is not None and v != []},
+                "msgs": [[m["role"], m["content"], m["meta"]] if m.get("meta") else [m["role"], m["content"]]
+                         for m in self.messages]}
+        if self.questions:
+            snap["qs"], snap["qi"] = self.questions, self.q_index
+        if answers:
+            snap["ans"] = answers
+        if self.prefs != {"preferred_difficulty": "auto", "recent_topics": []}:
+            snap["prefs"] = self.prefs
+        return snap
+
+    def dumps(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def restore(cls, snap: Dict, **kwargs) -> "InterviewSession":
+        if snap.get("v") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported session snapshot version: {snap.get('v')}")
+        s = cls(sid=snap["sid"], **kwargs)
+        s.phase, s.language = snap.get("phase", "gather"), snap.get("lang", "en")
+        s.candidate = Candidate(**snap.get("cand", {})).model_dump()
+        s.questions, s.q_index = snap.get("qs", []), snap.get("qi", 0)
+        s.answers = [{"question": s.questions[row[0]] if isinstance(row[0], int) else row[0], "answer": row[1],
+                      "verdict": row[2], "feedback": row[3] if len(row) > 3 else "",
+                      **({"tier": row[4]} if len(row) > 4 else {})} for row in snap.get("ans", [])]
+        s.messages = [{"role": m[0], "content": m[1], "meta": m[2] if len(m) > 2 else {}} for m in snap.get("msgs", [])]
+        if "prefs" in snap:
+            s.prefs = snap["prefs"]
+        s._requeue()
+        return s
+
+    @classmethod
+    def loads(cls, data: str, **kwargs) -> "InterviewSession":
+        return cls.restore(json.loads(data), **kwargs)
+
+    @classmethod
+    def resume(cls, sid: str, **kwargs) -> Optional["InterviewSession"]:
+        # Rebuilds a session from its event log, or None when there is none
+        state = replay_session(sid)
+        if not state:
+            return None
+        s = cls(sid=sid, **kwargs)
+        s.phase, s.language = state["phase"], state["language"]
+        s.candidate = Candidate(**state["candidate"]).model_dump()
+        s.questions, s.q_index = state["questions"], state["q_index"]
+        s.answers, s.messages = state["answers"], state["messages"]
+        s._requeue()
+        return s
@@ -1,23 +1,42 @@
 # llm_service.py
-import os, json, logging
-from typing import Dict, List, Tuple, Any
+import os, json, time, hashlib, logging
+from typing import Dict, List, Tuple, Any, Iterator
 from dotenv import load_dotenv
 from data_schemas import Question
 from prompt_templates import SYSTEM_PROMPT, GEN_QUESTIONS_INSTRUCTION, FEWSHOTS
-from text_utils import extract_first_json_object
-from api_client import chat as openai_chat
+from text_utils import extract_first_json_object, QuestionStreamParser
+from api_client import chat as openai_chat, chat_stream as openai_chat_stream
+from question_cache import get_cache, make_key
+from circuit_breaker import get_breaker, breaker_stats
+from rubric_engine import get_rubric
+from grading_cascade import get_local_grader, record_tier
+from rate_limiter import INTERACTIVE
 
 load_dotenv()
 logger = logging.getLogger("talentscout.llm")
 logger.setLevel(os.getenv("LOG_LEVEL", "INFO"))
 
 PROVIDER = os.getenv("PROVIDER", "openai").lower()
+# "cassette" speaks the OpenAI chat contract from a recording (see cassette.py)
+OPENAI_COMPATIBLE = ("openai", "cassette")
+if PROVIDER == "cassette":
+    from cassette import chat as openai_chat, chat_stream as openai_chat_stream
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
 QUESTIONS_PER_TOPIC = int(os.getenv("QUESTIONS_PER_TOPIC", "3"))
 MAX_TOPICS = int(os.getenv("MAX_TOPICS", "2"))
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.2"))
 EVAL_ANSWERS = os.getenv("EVAL_ANSWERS", "true").lower() == "true"
+# Grade a whole interview with one request instead of one request per answer
+BATCH_GRADING = os.getenv("BATCH_GRADING", "false").lower() == "true"
+QUESTION_CACHE = os.getenv("QUESTION_CACHE", "true").lower() == "true"
+# Yield questions one by one while the provider is still generating
+STREAM_QUESTIONS = os.getenv("STREAM_QUESTIONS", "false").lower() == "true"
+
+# Changes whenever the generation prompts change, so stale cached sets are never served
+PROMPT_VERSION = hashlib.sha256(
+    json.dumps([SYSTEM_PROMPT, GEN_QUESTIONS_INSTRUCTION, FEWSHOTS], sort_keys=True).encode("utf-8")
+).hexdigest()[:12]
 
 def _as_dict(stack: Any) -> Dict[str, List[str]]:
     if hasattr(stack, "model_dump"):
@@ -82,8 +101,26 @@ def _fallback(stack: Any) -> List[Dict]:
         ])
     return _cap_per_topic(_validate_questions(base))
 
+def _question_cache_key(stack_dict: Dict[str, List[str]], language: str) -> str:
+    return make_key(
+        stack_dict,
+        language=(language or "").lower(),
+        provider=PROVIDER,
+        model=OPENAI_MODEL if PROVIDER in OPENAI_COMPATIBLE else OLLAMA_MODEL,
+        temperature=TEMPERATURE,
+        per_topic=QUESTIONS_PER_TOPIC,
+        max_topics=MAX_TOPICS,
+        prompt_version=PROMPT_VERSION,
+    )
+
 def generate_questions(stack: Any, language: str = "en") -> Tuple[List[Dict], str]:
     stack_dict = _as_dict(stack)
+    if not QUESTION_CACHE:
+        return _generate_questions(stack_dict, language)
+    key = _question_cache_key(stack_dict, language)
+    return get_cache().get_or_generate(key, lambda: _generate_questions(stack_dict, language))
+
+def _question_messages(stack_dict: Dict[str, List[str]], language: str) -> List[Dict[str, str]]:
     user_prompt = (
         GEN_QUESTIONS_INSTRUCTION
         + f"\n\nDeclared tech stack:\n{_format_stack(stack_dict)}\n\n"
@@ -91,13 +128,16 @@ def generate_questions(stack: Any, language: str = "en") -> Tuple[List[Dict], st
         + "Return JSON only."
     )
     examples = _fewshot_snippets(stack_dict)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps({"examples": examples}) if examples else "No examples."},
+        {"role": "user", "content": user_prompt},
+    ]
+
+def _generate_questions(stack_dict: Dict[str, List[str]], language: str) -> Tuple[List[Dict], str]:
+    messages = _question_messages(stack_dict, language)
     try:
-        if PROVIDER == "openai":
-            messages = [
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": json.dumps({"examples": examples}) if examples else "No examples."},
-                {"role": "user", "content": user_prompt},
-            ]
+        if PROVIDER in OPENAI_COMPATIBLE:
             res = openai_chat(messages, model=OPENAI_MODEL, temperature=TEMPERATURE)
             if not res["ok"]:
                 logger.warning("OpenAI chat failed: %s", res["error"])
@@ -105,15 +145,19 @@ def generate_questions(stack: Any, language: str = "en") -> Tuple[List[Dict], st
             content = res["content"]
         elif PROVIDER == "ollama":
             import ollama
-            resp = ollama.chat(
-                model=OLLAMA_MODEL,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": json.dumps({"examples": examples}) if examples else "No examples."},
-                    {"role": "user", "content": user_prompt},
-                ],
-                options={"temperature": TEMPERATURE},
-            )
+            breaker = get_breaker("ollama")
+            if not breaker.allow():
+                return _fallback(stack_dict), "fallback:circuit_open"
+            try:
+                resp = ollama.chat(
+                    model=OLLAMA_MODEL,
+                    messages=messages,
+                    options={"temperature": TEMPERATURE},
+                )
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
             content = resp["message"]["content"]
         else:
             raise RuntimeError(f"Unknown PROVIDER: {PROVIDER}")
@@ -127,28 +171,122 @@ def generate_questions(stack: Any, language: str = "en") -> Tuple[List[Dict], st
         logger.warning("LLM error, using fallback: %s", e)
         return _fallback(stack_dict), f"fallback:{e}"
 
+def _stream_chunks(messages: List[Dict[str, str]]) -> Iterator[str]:
+    if PROVIDER in OPENAI_COMPATIBLE:
+        yield from openai_chat_stream(messages, model=OPENAI_MODEL, temperature=TEMPERATURE)
+    elif PROVIDER == "ollama":
+        import ollama
+        breaker = get_breaker("ollama")
+        if not breaker.allow():
+            raise RuntimeError("circuit_open")
+        outcome = None
+        try:
+            for chunk in ollama.chat(model=OLLAMA_MODEL, messages=messages,
+                                     options={"temperature": TEMPERATURE}, stream=True):
+                yield chunk["message"]["content"]
+            outcome = breaker.record_success
+        except GeneratorExit:
+            # Consumer stopped early: says nothing about the provider either way
+            raise
+        except Exception:
+            outcome = breaker.record_failure
+            raise
+        finally:
+            # Always settle the slot allow() took, so a HALF_OPEN probe is never leaked
+            (outcome or breaker.release)()
+    else:
+        raise RuntimeError(f"Unknown PROVIDER: {PROVIDER}")
+
+def stream_questions(stack: Any, language: str = "en") -> Iterator[Dict]:
+    """
+    Streaming counterpart of generate_questions: yields each validated question as
+    soon as its JSON object closes in the provider stream. Cached sets are replayed
+    directly; if the stream fails before any question arrives, the fallback set is used.
+    """
+    stack_dict = _as_dict(stack)
+    key = _question_cache_key(stack_dict, language) if QUESTION_CACHE else None
+    cached = get_cache().peek(key) if key else None
+    if cached:
+        yield from cached
+        return
+
+    parser, per, out = QuestionStreamParser(), {}, []
+    try:
+        for delta in _stream_chunks(_question_messages(stack_dict, language)):
+            for q in _validate_questions(parser.feed(delta)):
+                per[q["topic"]] = per.get(q["topic"], 0) + 1
+                if per[q["topic"]] <= QUESTIONS_PER_TOPIC:
+                    out.append(q)
+                    yield q
+    except Exception as e:
+        logger.warning("Question stream failed after %d items: %s", len(out), e)
+        if not out:
+            yield from _fallback(stack_dict)
+        return
+    if not out:
+        logger.warning("Question stream produced no valid items, using fallback")
+        yield from _fallback(stack_dict)
+    elif key:
+        get_cache().store(key, out)
+
+def provider_health() -> Dict[str, Dict[str, Any]]:
+    return breaker_stats()
+
 def _heuristic_grade(question: Dict, answer: str) -> Dict:
-    topic = (question.get("topic") or "").lower()
-    text = " " + (answer or "").lower() + " "
-    KEYWORDS = {
-        "python": ["function", "class", "list", "dict", "loop", "with", "context", "generator", "example"],
-        "django": ["model", "view", "template", "orm", "queryset", "middleware", "settings", "migration"],
-        "react": ["state", "props", "hook", "component", "useeffect", "memo", "render", "jsx"],
-        "sql": ["select", "join", "index", "transaction", "foreign key", "where", "group by", "explain"],
-        "docker": ["image", "container", "dockerfile", "build", "compose", "registry", "volume", "network"],
-        "kubernetes": ["pod", "deployment", "service", "ingress", "namespace", "cluster", "helm", "scaling"],
-        "pytorch": ["tensor", "autograd", "module", "optimizer", "dataset", "dataloader", "backward"],
-    }
-    kws = KEYWORDS.get(topic, [])
-    hits = sum(1 for k in kws if k in text)
-    verdict = "pass" if hits >= 2 or len(answer.strip()) >= 80 else "needs_improvement"
-    feedback = "Covers several key concepts." if verdict == "pass" else "Add key concepts and a small code/example to strengthen the answer."
-    return {"verdict": verdict, "feedback": feedback}
-
-def grade_answer(question: Dict, answer: str, language: str = "en") -> Dict:
-    if not EVAL_ANSWERS or PROVIDER != "openai":
-        return _heuristic_grade(question, answer)
+    # Offline fallback: weighted keyword rubric per topic (resources/rubric_keywords.json)
     try:
+        return get_rubric().grade(question, answer)
+    except Exception as e:
+        # Missing or broken rubric file: last resort is the old length rule, never an exception
+        logger.warning("Rubric unavailable, grading by length: %s", e)
+        verdict = "pass" if len((answer or "").strip()) >= 80 else "needs_improvement"
+        return {"verdict": verdict, "feedback": "Covers several key concepts." if verdict == "pass"
+                else "Add key concepts and a small code/example to strengthen the answer."}
+
+def _heuristic_batch(pairs: List[Tuple[Dict, str]]) -> List[Dict]:
+    try:
+        return get_rubric().grade_batch(pairs)
+    except Exception:
+        return [_heuristic_grade(q, a) for q, a in pairs]
+
+def _local_first(pairs: List[Tuple[Dict, str]]) -> Tuple[Dict[int, Dict], List[int]]:
+    # Cascade tier 1: clear passes/fails are decided locally; the rest are returned for the LLM
+    grader = get_local_grader()
+    t0 = time.perf_counter()
+    decided, escalate = {}, []
+    for i, g in enumerate(grader.grade_batch(pairs)):
+        if g.pop("decided"):
+            decided[i] = {**g, "tier": "local"}
+        else:
+            escalate.append(i)
+    if decided:
+        record_tier("local", t0, len(decided))
+    return decided, escalate
+
+def fallback_grade(question: Dict, answer: str) -> Dict:
+    # Heuristic verdict tagged tier "fallback", for callers whose grading could not finish
+    return {**_heuristic_grade(question, answer), "tier": "fallback"}
+
+def _fallback_grade(question: Dict, answer: str, t0: float) -> Dict:
+    record_tier("fallback", t0)
+    return fallback_grade(question, answer)
+
+def grade_answer(question: Dict, answer: str, language: str = "en", priority: int = INTERACTIVE) -> Dict:
+    """
+    Grades one answer; the result's "tier" says what decided it: "local" (TF-IDF +
+    rubric, outside the uncertainty band), "llm", "fallback" (LLM failed) or "rubric"
+    (LLM grading disabled). Regrading jobs pass priority=rate_limiter.BACKGROUND so
+    live interviews keep their place in the provider queue.
+    """
+    t0 = time.perf_counter()
+    if not EVAL_ANSWERS or PROVIDER not in OPENAI_COMPATIBLE:
+        record_tier("rubric", t0)
+        return {**_heuristic_grade(question, answer), "tier": "rubric"}
+    try:
+        decided, _ = _local_first([(question, answer)])
+        if decided:
+            return decided[0]
+        t0 = time.perf_counter()
         rubric = (
             f"Topic: {question.get('topic')}. Difficulty: {question.get('difficulty')}."
             " Judge correctness, clarity, key concepts, and presence of a brief example when appropriate. Reply JSON only."
@@ -160,14 +298,89 @@ def grade_answer(question: Dict, answer: str, language: str = "en") -> Dict:
                 "answer": answer, "language": language
             })},
         ]
-        res = openai_chat(messages, model=OPENAI_MODEL, temperature=0.1)
+        res = openai_chat(messages, model=OPENAI_MODEL, temperature=0.1, priority=priority)
         if not res["ok"]:
-            return _heuristic_grade(question, answer)
+            return _fallback_grade(question, answer, t0)
         data = extract_first_json_object(res["content"])
         verdict = (data.get("verdict") or "needs_improvement").lower().replace(" ", "_")
         feedback = data.get("feedback") or ""
         if verdict not in ("pass", "needs_improvement"):
-            return _heuristic_grade(question, answer)
-        return {"verdict": verdict, "feedback": feedback}
-    except Exception:
-        return _heuristic_grade(question, answer)
\ No newline at end of file
+            return _fallback_grade(question, answer, t0)
+        record_tier("llm", t0)
+        return {"verdict": verdict, "feedback": feedback, "tier": "llm"}
+    except Exception as e:
+        logger.warning("Grading failed, using heuristic: %s", e)
+        return _fallback_grade(question, answer, t0)
+
+def _batch_items(data: Dict) -> List[Dict]:
+    for key in ("results", "grades", "items"):
+        if isinstance(data.get(key), list):
+            return data[key]
+    return []
+
+def grade_answers_batch(questions: List[Dict], answers: List[str], language: str = "en",
+                        priority: int = INTERACTIVE) -> List[Dict]:
+    """
+    Grades every (question, answer) pair of a session: clear cases locally, the
+    uncertain rest with a single request. Items missing or malformed in the reply
+    are re-graded one by one with grade_answer; if the request itself fails, those
+    items get the heuristic verdict.
+    """
+    pairs = list(zip(questions, answers))
+    if not pairs:
+        return []
+    t0 = time.perf_counter()
+    if not EVAL_ANSWERS or PROVIDER not in OPENAI_COMPATIBLE:
+        record_tier("rubric", t0, len(pairs))
+        return [{**g, "tier": "rubric"} for g in _heuristic_batch(pairs)]
+    try:
+        graded, escalate = _local_first(pairs)
+    except Exception as e:
+        logger.warning("Local grading tier failed, using heuristic: %s", e)
+        record_tier("fallback", t0, len(pairs))
+        return [{**g, "tier": "fallback"} for g in _heuristic_batch(pairs)]
+    if not escalate:
+        return [graded[i] for i in range(len(pairs))]
+    rubric = (
+        "For each item judge correctness, clarity, key concepts, and presence of a brief example when appropriate "
+        "at the stated topic and difficulty. Reply JSON only: "
+        '{"results": [{"id": <item id>, "verdict": "pass" | "needs_improvement", "feedback": "<one or two sentences>"}]}'
+    )
+    messages = [
+        {"role": "system", "content": "You are a strict but fair technical interviewer. Reply with JSON only."},
+        {"role": "user", "content": json.dumps({
+            "rubric": rubric, "language": language,
+            "items": [{"id": i, "topic": pairs[i][0].get("topic"), "difficulty": pairs[i][0].get("difficulty"),
+                       "question": pairs[i][0].get("question"), "answer": pairs[i][1]} for i in escalate],
+        })},
+    ]
+    t0 = time.perf_counter()
+    res = openai_chat(messages, model=OPENAI_MODEL, temperature=0.1, priority=priority)
+    if not res["ok"]:
+        for i, g in zip(escalate, _heuristic_batch([pairs[i] for i in escalate])):
+            graded[i] = {**g, "tier": "fallback"}
+        record_tier("fallback", t0, len(escalate))
+        return [graded[i] for i in range(len(pairs))]
+
+    from_llm = 0
+    try:
+        for item in _batch_items(extract_first_json_object(res["content"])):
+            if not isinstance(item, dict):
+                continue
+            verdict = str(item.get("verdict") or "").lower().replace(" ", "_")
+            try:
+                idx = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if idx in escalate and idx not in graded and verdict in ("pass", "needs_improvement"):
+                graded[idx] = {"verdict": verdict, "feedback": item.get("feedback") or "", "tier": "llm"}
+                from_llm += 1
+    except Exception as e:
+        logger.warning("Malformed batch grading reply: %s", e)
+    if from_llm:
+        record_tier("llm", t0, from_llm)
+
+    if len(graded) < len(pairs):
+        logger.warning("Batch grading returned %d/%d usable items; grading the rest individually",
+                       from_llm, len(escalate))
+    return [graded.get(i) or grade_answer(q, a, language=language, priority=priority) for i, (q, a) in enumerate(pairs)]
\ No newline at end of file
@@ -0,0 +1,44 @@
+# perf_stats.py
+import os, threading, logging
+from collections import deque
+from typing import Dict
+
+logger = logging.getLogger("talentscout.perf")
+
+RERUN_TIMING_WINDOW = int(os.getenv("RERUN_TIMING_WINDOW", "200"))
+
+class Timings:
+    """Rolling window of durations (seconds) with percentile summaries; shared by all sessions."""
+
+    def __init__(self, window: int = RERUN_TIMING_WINDOW, name: str = "rerun"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._samples: deque = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+        logger.debug("%s took %.1f ms", self.name, seconds * 1e3)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            xs = sorted(self._samples)
+            last = self._samples[-1] if self._samples else 0.0
+            count = self.count
+        if not xs:
+            return {"count": 0}
+        pick = lambda q: xs[min(len(xs) - 1, int(q * len(xs)))] * 1e3
+        return {"count": count, "last_ms": round(last * 1e3, 1),
+                "p50_ms": round(pick(0.50), 1), "p95_ms": round(pick(0.95), 1), "max_ms": round(xs[-1] * 1e3, 1)}
+
+_reruns: Timings | None = None
+_reruns_lock = threading.Lock()
+
+def get_rerun_timings() -> Timings:
+    global _reruns
+    with _reruns_lock:
+        if _reruns is None:
+            _reruns = Timings()
+        return _reruns
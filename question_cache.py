@@ -0,0 +1,194 @@
+# question_cache.py
+import os, json, time, random, hashlib, threading, copy, logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger("talentscout.qcache")
+
+CACHE_DIR = os.getenv("QUESTION_CACHE_DIR",
+                      os.path.join(os.path.dirname(__file__), "data", "cache", "questions"))
+MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "256"))
+TTL_SECONDS = float(os.getenv("QUESTION_CACHE_TTL", "86400"))
+VARIANTS = max(1, int(os.getenv("QUESTION_CACHE_VARIANTS", "3")))
+
+STACK_KEYS = ("languages", "frameworks", "databases", "tools")
+
+def canonical_stack(stack: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    out = {}
+    for k in STACK_KEYS:
+        items = {str(x).strip().casefold() for x in (stack.get(k) or []) if str(x).strip()}
+        out[k] = sorted(items)
+    return out
+
+def make_key(stack: Dict[str, List[str]], **params: Any) -> str:
+    payload = {"stack": canonical_stack(stack), **params}
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Tuple[List[Dict], str] | None = None
+
+class QuestionCache:
+    """
+    Two-tier (memory LRU + on-disk JSON) cache of generated question sets.
+    Each key holds up to `variants` independent generations; a hit picks one at random.
+    Concurrent misses on the same key are coalesced into a single generation.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_entries: int = MAX_ENTRIES,
+                 ttl: float = TTL_SECONDS, variants: int = VARIANTS):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.variants = variants
+        self._mem: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "coalesced": 0,
+                      "stores": 0, "evictions": 0, "expired": 0}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # ---------- tiers ----------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _fresh(self, variants: List[Dict]) -> List[Dict]:
+        now = time.time()
+        keep = [v for v in variants if now - v.get("ts", 0) < self.ttl]
+        self.stats["expired"] += len(variants) - len(keep)
+        return keep
+
+    def _read_disk(self, key: str) -> List[Dict]:
+        if not self.cache_dir:
+            return []
+        p = self._path(key)
+        if not os.path.exists(p):
+            return []
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                return json.load(f).get("variants", [])
+        except Exception as e:
+            logger.warning("Unreadable question cache file %s: %s", p, e)
+            return []
+
+    def _write_disk(self, key: str, variants: List[Dict]) -> None:
+        if not self.cache_dir:
+            return
+        p = self._path(key)
+        tmp = f"{p}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"variants": variants}, f, ensure_ascii=False)
+            os.replace(tmp, p)
+        except Exception as e:
+            logger.warning("Could not persist question cache entry %s: %s", key, e)
+
+    def _lookup(self, key: str) -> List[Dict]:
+        # Caller holds the lock
+        if key in self._mem:
+            self._mem.move_to_end(key)
+            variants = self._fresh(self._mem[key])
+        else:
+            variants = self._fresh(self._read_disk(key))
+            if variants:
+                self.stats["disk_hits"] += 1
+        if variants:
+            self._remember(key, variants)
+        else:
+            self._mem.pop(key, None)
+        return variants
+
+    def _remember(self, key: str, variants: List[Dict]) -> None:
+        self._mem[key] = variants
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _store(self, key: str, questions: List[Dict]) -> None:
+        with self._lock:
+            variants = self._lookup(key)
+            variants = (variants + [{"ts": time.time(), "questions": questions}])[-self.variants:]
+            self._remember(key, variants)
+            self.stats["stores"] += 1
+            # Under the lock: two stores for one key must not write their variant lists out of order
+            self._write_disk(key, variants)
+
+    # ---------- public API ----------
+    def get_or_generate(self, key: str,
+                        generate: Callable[[], Tuple[List[Dict], str]]) -> Tuple[List[Dict], str]:
+        leader = False
+        with self._lock:
+            variants = self._lookup(key)
+            pending = self._inflight.get(key)
+            # Full pool, or a refill already running: serve a cached variant
+            if variants and (len(variants) >= self.variants or pending):
+                self.stats["hits"] += 1
+                return copy.deepcopy(random.choice(variants)["questions"]), ""
+            if pending:
+                self.stats["coalesced"] += 1
+            else:
+                pending = self._inflight[key] = _InFlight()
+                self.stats["misses"] += 1
+                leader = True
+        if not leader:
+            pending.done.wait()
+            qs, err = pending.result or ([], "fallback:coalesced")
+            return copy.deepcopy(qs), err
+
+        try:
+            qs, err = generate()
+            pending.result = (qs, err)
+            # Fallback sets are cheap to rebuild and should not crowd out real generations
+            if qs and not err:
+                self._store(key, copy.deepcopy(qs))
+            return qs, err
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def peek(self, key: str) -> List[Dict] | None:
+        # A cached set only once the variant pool is full; callers generate otherwise
+        with self._lock:
+            variants = self._lookup(key)
+            if len(variants) >= self.variants:
+                self.stats["hits"] += 1
+                return copy.deepcopy(random.choice(variants)["questions"])
+            self.stats["misses"] += 1
+            return None
+
+    def store(self, key: str, questions: List[Dict]) -> None:
+        if questions:
+            self._store(key, copy.deepcopy(questions))
+
+    def snapshot_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._mem), "inflight": len(self._inflight)}
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._mem.clear()
+        if disk and self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+
+_cache: QuestionCache | None = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> QuestionCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QuestionCache()
+        return _cache
+
+def cache_stats() -> Dict[str, int]:
+    return get_cache().snapshot_stats()
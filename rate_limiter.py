@@ -0,0 +1,284 @@
+# rate_limiter.py
+import os, time, heapq, asyncio, sqlite3, itertools, threading, logging
+from typing import Any, Dict, List, Optional
+
+from perf_stats import Timings
+
+logger = logging.getLogger("talentscout.ratelimit")
+
+# Provider limits per minute; 0 disables that dimension
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))
+LLM_TPM = float(os.getenv("LLM_TPM", "200000"))
+# Completion tokens assumed per request until the provider reports real usage
+LLM_EST_COMPLETION = int(os.getenv("LLM_EST_COMPLETION", "400"))
+# Longest a call may queue for a slot when the caller gives no deadline
+LLM_RATE_MAX_WAIT = float(os.getenv("LLM_RATE_MAX_WAIT", "30"))
+# Shared SQLite file for several processes on one host; empty keeps the buckets in memory
+LLM_RATE_DB = os.getenv("LLM_RATE_DB", "")
+
+INTERACTIVE, BACKGROUND = 0, 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+def estimate_tokens(messages: List[Dict[str, Any]], completion: int = LLM_EST_COMPLETION) -> int:
+    # ~4 characters per token plus per-message framing; corrected later from resp.usage
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    return chars // 4 + 4 * len(messages) + completion
+
+def parse_priority(value: Any) -> int:
+    if isinstance(value, int) and value in PRIORITY_NAMES:
+        return value
+    return BACKGROUND if str(value or "").strip().lower() == "background" else INTERACTIVE
+
+class _MemoryBuckets:
+    """Request and token buckets refilled continuously at limit/60 per second."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.caps = {"requests": rpm, "tokens": tpm}
+        self.levels = {"requests": rpm, "tokens": tpm}
+        self.updated = self._now()
+        self.hold_until = 0.0
+
+    @staticmethod
+    def _now() -> float:
+        return time.monotonic()
+
+    def _run(self, fn, *args):
+        return fn(self._now(), *args)
+
+    def _refill(self, now: float) -> None:
+        dt = max(0.0, now - self.updated)
+        self.updated = now
+        for k, cap in self.caps.items():
+            if cap > 0:
+                self.levels[k] = min(cap, self.levels[k] + cap / 60.0 * dt)
+
+    def _take(self, now: float, tokens: int) -> float:
+        self._refill(now)
+        # A call larger than the whole TPM bucket waits for a full bucket rather than forever
+        need = {"requests": 1.0, "tokens": min(float(tokens), self.caps["tokens"])}
+        wait = max(0.0, self.hold_until - now)
+        for k, cap in self.caps.items():
+            if cap > 0 and need[k] > self.levels[k]:
+                wait = max(wait, (need[k] - self.levels[k]) / (cap / 60.0))
+        if wait <= 0:
+            for k, cap in self.caps.items():
+                if cap > 0:
+                    self.levels[k] -= need[k]
+        return wait
+
+    def _adjust(self, now: float, tokens: int) -> None:
+        self._refill(now)
+        if self.caps["tokens"] > 0:
+            self.levels["tokens"] = min(self.caps["tokens"], self.levels["tokens"] - tokens)
+
+    def _hold(self, now: float, seconds: float) -> None:
+        self._refill(now)
+        self.hold_until = max(self.hold_until, now + seconds)
+
+    def _read(self, now: float) -> Dict[str, float]:
+        self._refill(now)
+        return {k: round(v, 1) for k, v in self.levels.items() if self.caps[k] > 0}
+
+    def try_take(self, tokens: int) -> float:
+        # 0 when both buckets had room (and were charged), otherwise seconds until they will
+        return self._run(self._take, tokens)
+
+    def adjust(self, tokens: int) -> None:
+        # Positive charges, negative refunds; the level may go below zero until it refills
+        self._run(self._adjust, tokens)
+
+    def hold(self, seconds: float) -> None:
+        self._run(self._hold, seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        return self._run(self._read)
+
+class _SqliteBuckets(_MemoryBuckets):
+    """
+    Same buckets kept in one SQLite row so every process on the host draws from
+    them; BEGIN IMMEDIATE serializes the read-refill-charge step across processes.
+    Wall-clock time is used since monotonic clocks are not comparable between processes.
+    """
+
+    def __init__(self, rpm: float, tpm: float, path: str):
+        super().__init__(rpm, tpm)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS llm_buckets ("
+                         " id INTEGER PRIMARY KEY CHECK (id = 1), requests REAL, tokens REAL,"
+                         " updated REAL, hold_until REAL)")
+        self._db.execute("INSERT OR IGNORE INTO llm_buckets VALUES (1, ?, ?, ?, 0)", (rpm, tpm, self.updated))
+
+    @staticmethod
+    def _now() -> float:
+        return time.time()
+
+    def _run(self, fn, *args):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute("SELECT requests, tokens, updated, hold_until FROM llm_buckets WHERE id = 1").fetchone()
+            self.levels = {"requests": row[0], "tokens": row[1]}
+            self.updated, self.hold_until = row[2], row[3]
+            out = fn(self._now(), *args)
+            self._db.execute("UPDATE llm_buckets SET requests=?, tokens=?, updated=?, hold_until=? WHERE id = 1",
+                             (self.levels["requests"], self.levels["tokens"], self.updated, self.hold_until))
+            self._db.execute("COMMIT")
+            return out
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+class RateLimiter:
+    """
+    Process-wide admission for provider calls: one request plus its estimated
+    tokens must fit the RPM/TPM buckets. Waiting callers form a priority queue
+    (interactive before background, FIFO within a priority) and only the head
+    draws from the buckets, so a burst is spread out instead of every caller
+    hitting 429 and backing off on its own. A 429 that still gets through pauses
+    the whole queue via hold(). Coroutines queue through aacquire(), which waits
+    on their event loop instead of parking an executor thread.
+    """
+
+    def __init__(self, rpm: float = LLM_RPM, tpm: float = LLM_TPM, db_path: str = LLM_RATE_DB,
+                 max_wait: float = LLM_RATE_MAX_WAIT):
+        self.max_wait = max_wait
+        self.buckets = _SqliteBuckets(rpm, tpm, db_path) if db_path else _MemoryBuckets(rpm, tpm)
+        self.shared = isinstance(self.buckets, _SqliteBuckets)
+        self._cond = threading.Condition()
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._async_waiters: Dict[tuple, tuple] = {}  # ticket -> (loop, asyncio.Event)
+        self.waits = {p: Timings(name=f"{n} llm queue wait") for p, n in PRIORITY_NAMES.items()}
+        self._stats = {"admitted": 0, "rejected": 0, "holds": 0}
+
+    def acquire(self, tokens: int, priority: int = INTERACTIVE, deadline: Optional[float] = None) -> bool:
+        """
+        Blocks until the call may go out. `deadline` is a time.monotonic() value;
+        returns False (and charges nothing) if no slot frees up before it.
+        """
+        t0 = time.monotonic()
+        end = min(t0 + self.max_wait, deadline if deadline is not None else float("inf"))
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    admitted, pause = self._step(ticket, tokens, t0, end)
+                    if admitted is not None:
+                        return admitted
+                    self._cond.wait(pause)
+            finally:
+                self._leave(ticket)
+
+    async def aacquire(self, tokens: int, priority: int = INTERACTIVE, deadline: Optional[float] = None) -> bool:
+        """
+        acquire() for coroutines: same queue and result, but the wait happens on the
+        event loop. With the shared SQLite buckets each locked step (file I/O, and a
+        lock other processes' threads may hold) runs on a worker thread; the waiting
+        between steps never does.
+        """
+        t0 = time.monotonic()
+        end = min(t0 + self.max_wait, deadline if deadline is not None else float("inf"))
+        ticket = (priority, next(self._seq))
+        wake = asyncio.Event()
+        await self._locked(self._enter, ticket, asyncio.get_running_loop(), wake)
+        try:
+            while True:
+                # Cleared before the step, so a wake-up sent after it is never lost (an early one only spins once)
+                wake.clear()
+                admitted, pause = await self._locked(self._step, ticket, tokens, t0, end)
+                if admitted is not None:
+                    return admitted
+                try:
+                    await asyncio.wait_for(wake.wait(), pause)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._locked(self._leave, ticket)
+
+    async def _locked(self, fn, *args):
+        if self.shared:
+            return await asyncio.to_thread(self._with_lock, fn, *args)
+        return self._with_lock(fn, *args)
+
+    def _with_lock(self, fn, *args):
+        with self._cond:
+            return fn(*args)
+
+    def _enter(self, ticket: tuple, loop: asyncio.AbstractEventLoop, wake: asyncio.Event) -> None:
+        heapq.heappush(self._queue, ticket)
+        self._async_waiters[ticket] = (loop, wake)
+
+    def _step(self, ticket: tuple, tokens: int, t0: float, end: float) -> tuple:
+        # Under self._cond: (True/False, 0) once admitted or out of time, else (None, seconds to wait).
+        # The head waits until its buckets refill; the rest until the head changes.
+        wait = None
+        if self._queue[0] == ticket:
+            wait = self.buckets.try_take(tokens)
+            if wait <= 0:
+                self._stats["admitted"] += 1
+                self.waits[ticket[0]].record(time.monotonic() - t0)
+                return True, 0.0
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            self._stats["rejected"] += 1
+            return False, 0.0
+        return None, remaining if wait is None else min(wait, remaining)
+
+    def _leave(self, ticket: tuple) -> None:
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._async_waiters.pop(ticket, None)
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wakes thread waiters and coroutine waiters alike; called with self._cond held
+        self._cond.notify_all()
+        for loop, wake in self._async_waiters.values():
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:  # that loop has closed
+                pass
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        # Trues the token bucket up to the provider's usage report
+        if actual is not None and actual != estimated:
+            self._with_lock(self.buckets.adjust, actual - estimated)
+
+    async def asettle(self, estimated: int, actual: Optional[int]) -> None:
+        if actual is not None and actual != estimated:
+            await self._locked(self.buckets.adjust, actual - estimated)
+
+    def hold(self, seconds: float) -> None:
+        self._with_lock(self._hold, seconds)
+
+    async def ahold(self, seconds: float) -> None:
+        await self._locked(self._hold, seconds)
+
+    def _hold(self, seconds: float) -> None:
+        self._stats["holds"] += 1
+        self.buckets.hold(seconds)
+        self._notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out = {**self._stats, "queued": len(self._queue), "levels": self.buckets.snapshot(),
+                   "shared": self.shared}
+        for p, name in PRIORITY_NAMES.items():
+            s = self.waits[p].summary()
+            out[f"{name}_wait"] = {"count": s.get("count", 0), "p50_ms": s.get("p50_ms"), "p95_ms": s.get("p95_ms")}
+        return out
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return get_rate_limiter().stats()
@@ -0,0 +1,184 @@
+# rubric_engine.py
+import os, re, json, threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RUBRIC_PATH = os.getenv("RUBRIC_PATH", os.path.join(os.path.dirname(__file__), "resources", "rubric_keywords.json"))
+
+_WORD = re.compile(r"[\w+#]+")
+_SEP = "\x00"  # stands for the separator between words of a phrase
+GENERAL = -1  # topic index for the cross-topic keywords
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(_WORD.findall((text or "").casefold()))
+
+def _variants(words: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+    # The phrase as written plus plural forms of its last word
+    last = words[-1]
+    tails = {last, last + "s", last + "es"}
+    if last.endswith("y"):
+        tails.add(last[:-1] + "ies")
+    return [words[:-1] + (t,) for t in sorted(tails)]
+
+def _trie_regex(strings: List[str]) -> str:
+    # Character trie -> nested alternation: keywords sharing a prefix share one branch
+    trie: Dict = {}
+    for s in strings:
+        node = trie
+        for ch in s:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict) -> str:
+        alts = [(r"[\s\-/.]+" if ch == _SEP else re.escape(ch)) + emit(child)
+                for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+    return emit(trie)
+
+class RubricEngine:
+    """
+    Keyword rubric for every topic compiled once into a single regex (a
+    character trie of each keyword and its plural forms). An answer is scanned
+    in one pass taking the longest keyword at each position; keywords only
+    count on word boundaries ("index" does not match "reindexing") and the
+    cost does not grow with the number of topics.
+    Each distinct keyword adds its weight for the question's topic; the
+    cross-topic terms (example, trade-off, benchmark...) add general_weight.
+    A substantial answer (min_pass chars) that hits at least min_pass keywords
+    of its topic passes below the score, as the old length rule let it.
+    """
+
+    def __init__(self, rubric: Dict):
+        self.topics: List[str] = list(rubric.get("topics", {}))
+        self.pass_score: Dict[str, float] = rubric.get("pass_score") or {"default": 4}
+        self.general_weight = float(rubric.get("general_weight", 0.5))
+        bonus = rubric.get("length_bonus") or {}
+        self.bonus_chars, self.bonus_points = int(bonus.get("chars", 200)), float(bonus.get("points", 1))
+        floor = rubric.get("min_pass") or {}
+        self.floor_chars, self.floor_keywords = int(floor.get("chars", 80)), int(floor.get("keywords", 1))
+        self._topic_idx = {t.casefold(): i for i, t in enumerate(self.topics)}
+        self._resolved: Dict[str, Optional[int]] = {}
+
+        self.keywords: List[str] = []
+        self.weights: List[Dict[int, float]] = []  # keyword id -> {topic index: weight}
+        self.core: Dict[int, List[str]] = {}       # topic index -> heaviest keywords, for feedback
+        self._lookup: Dict[Tuple[str, ...], int] = {}  # matched words -> keyword id
+        ids: Dict[Tuple[str, ...], int] = {}
+        sources = [(i, kws) for i, kws in enumerate(rubric.get("topics", {}).values())]
+        sources.append((GENERAL, rubric.get("general") or {}))
+        for topic, kws in sources:
+            for kw, weight in kws.items():
+                words = tokenize(kw)
+                if not words:
+                    continue
+                kid = ids.get(words)
+                if kid is None:
+                    kid = ids[words] = len(self.keywords)
+                    self.keywords.append(kw)
+                    self.weights.append({})
+                    for v in _variants(words):
+                        self._lookup.setdefault(v, kid)
+                self.weights[kid][topic] = float(weight)
+            if topic != GENERAL:
+                top = max(kws.values(), default=0)
+                self.core[topic] = [k for k, w in kws.items() if w == top]
+        self._pattern = re.compile(r"(?<![\w+#])" + _trie_regex([_SEP.join(v) for v in self._lookup]) + r"(?![\w+#])")
+
+    @classmethod
+    def from_file(cls, path: str = RUBRIC_PATH) -> "RubricEngine":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str) -> List[int]:
+        """Distinct keyword ids in reading order."""
+        found, seen = [], set()
+        for m in self._pattern.finditer((text or "").casefold()):
+            kid = self._lookup.get(tokenize(m.group()))
+            if kid is not None and kid not in seen:
+                seen.add(kid)
+                found.append(kid)
+        return found
+
+    def topic_index(self, topic: str) -> Optional[int]:
+        low = (topic or "").strip().casefold()
+        if low in self._topic_idx:
+            return self._topic_idx[low]
+        if low in self._resolved:
+            return self._resolved[low]
+        try:  # aliases from the tech vocabulary (postgres, k8s, nodejs...)
+            from stack_matcher import get_matcher
+            m = get_matcher()
+            hit = m.index.get(low) or m.aliases.get(low)
+        except Exception:
+            hit = None
+        self._resolved[low] = self._topic_idx.get(hit[1].casefold()) if hit else None
+        return self._resolved[low]
+
+    def score(self, topic: str, answer: str) -> Tuple[float, List[str], Optional[int]]:
+        t = self.topic_index(topic)
+        ids = self.scan(answer)
+        per_topic: Dict[int, float] = {}
+        general, matched = 0.0, []
+        for kid in ids:
+            w = self.weights[kid]
+            if t is not None and t in w:
+                per_topic[t] = per_topic.get(t, 0.0) + w[t]
+                matched.append(self.keywords[kid])
+            elif t is None:
+                # Unknown topic ("General"): judge against whichever topic the answer covers best
+                for ti, wt in w.items():
+                    if ti != GENERAL:
+                        per_topic[ti] = per_topic.get(ti, 0.0) + wt
+            if GENERAL in w and (t is None or t not in w):
+                general += w[GENERAL]
+        if t is None and per_topic:
+            t = max(per_topic, key=per_topic.get)
+            matched = [self.keywords[k] for k in ids if t in self.weights[k]]
+        total = per_topic.get(t, 0.0) + self.general_weight * general
+        if len((answer or "").strip()) >= self.bonus_chars:
+            total += self.bonus_points
+        return total, matched, t
+
+    def pass_score_for(self, difficulty: str) -> float:
+        return self.pass_score.get((difficulty or "").lower(), self.pass_score.get("default", 4))
+
+    def feedback(self, verdict: str, matched: List[str], t: Optional[int]) -> str:
+        if verdict == "pass":
+            covered = ", ".join(matched[:3])
+            return f"Covers several key concepts ({covered})." if covered else "Covers several key concepts."
+        missing = [k for k in self.core.get(t, []) if k not in matched][:3]
+        hint = f" such as {', '.join(missing)}" if missing else ""
+        return f"Add key concepts{hint} and a small code/example to strengthen the answer."
+
+    def grade(self, question: Dict, answer: str) -> Dict:
+        total, matched, t = self.score(question.get("topic") or "", answer)
+        substantial = len((answer or "").strip()) >= self.floor_chars and len(matched) >= self.floor_keywords
+        verdict = ("pass" if total >= self.pass_score_for(question.get("difficulty")) or substantial
+                   else "needs_improvement")
+        return {"verdict": verdict, "feedback": self.feedback(verdict, matched, t)}
+
+    def grade_batch(self, pairs: Iterable[Tuple[Dict, str]]) -> List[Dict]:
+        # Repeated (topic, difficulty, answer) triples are graded once
+        memo: Dict[Tuple[str, str, str], Dict] = {}
+        out = []
+        for q, a in pairs:
+            key = (q.get("topic") or "", q.get("difficulty") or "", a or "")
+            if key not in memo:
+                memo[key] = self.grade(q, a or "")
+            out.append(dict(memo[key]))
+        return out
+
+_engine: RubricEngine | None = None
+_engine_lock = threading.Lock()
+
+def get_rubric() -> RubricEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RubricEngine.from_file()
+        return _engine
+
+def grade_batch(pairs: Iterable[Tuple[Dict, str]]) -> List[Dict]:
+    return get_rubric().grade_batch(pairs)
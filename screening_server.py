@@ -0,0 +1,438 @@
+# screening_server.py
+"""
+Asyncio screening service: the same interview flow as main_app over plain
+HTTP/JSON and WebSocket, standard library only.
+
+    python screening_server.py [--host 127.0.0.1] [--port 8080]
+
+HTTP
+    POST /sessions                      -> {"sid", "phase", "messages"}  (greeting)
+    POST /sessions/<sid>/messages       {"text"} -> {"sid", "phase", "messages"}  (messages added by the turn)
+    GET  /sessions/<sid>                -> session state
+    POST /questions                     {"stack", "language"} -> {"questions", "error"}
+    POST /grade                         {"question", "answer", "language", "priority"} -> grade
+                                        (priority "background" queues behind live interviews)
+    GET  /health                        -> sessions, LLM gate, rate limiter, grading tiers, breakers
+WebSocket
+    GET  /ws[?sid=<sid>]                text messages in ("hello" or {"text": "hello"}; fragments are reassembled),
+                                        {"type": "messages", ...} / {"type": "busy", ...} out
+
+Sessions live in memory, one InterviewSession each, and are checkpointed to
+data_storage (after consent) at most every CHECKPOINT_INTERVAL seconds, on
+phase changes and on eviction. A sid that is not in memory is resumed from its
+event log. Turns run on a thread pool; the ones that can reach the LLM also take
+one of LLM_CONCURRENCY slots, and when LLM_QUEUE_MAX turns are already waiting
+for a slot new ones are refused (HTTP 503 + Retry-After, or a "busy" frame).
+At most MAX_SESSIONS sessions are held in memory; past that, and once the idle
+ones are evicted, new or resumed sessions get 503 + Retry-After as well.
+"""
+import os, re, sys, json, time, base64, asyncio, hashlib, argparse, logging, signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from interview_session import InterviewSession
+from llm_service import generate_questions, grade_answer, provider_health
+from grading_cascade import cascade_stats
+from rate_limiter import rate_limit_stats, parse_priority, INTERACTIVE
+from event_log import EVENT_LOG, get_event_log
+from perf_stats import Timings
+
+logger = logging.getLogger("talentscout.server")
+
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "32"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "64"))
+CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", "5"))
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "2000"))
+MAX_BODY = 64 * 1024
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_SESSION_PATH = re.compile(r"^/sessions/([A-Za-z0-9_-]{1,64})(/messages)?$")
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 501: "Not Implemented", 503: "Service Unavailable"}
+
+class Busy(Exception):
+    """The LLM gate's waiting room is full."""
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None, close: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+        self.close = close  # the request framing is lost, so the connection can't be reused
+
+class LlmGate:
+    """
+    Bounds concurrent LLM-bound work to `limit` and the number of callers waiting
+    for a slot to `queue_max`; past that, acquire() fails fast with Busy so the
+    client backs off instead of piling more work onto a slow provider.
+    """
+
+    def __init__(self, limit: int = LLM_CONCURRENCY, queue_max: int = LLM_QUEUE_MAX):
+        self.limit, self.queue_max = max(1, limit), max(0, queue_max)
+        self._sem = asyncio.Semaphore(self.limit)
+        self.waiting = 0
+        self.in_flight = 0
+        self.stats = {"admitted": 0, "rejected": 0}
+        self.wait_times = Timings(name="llm gate wait")
+
+    async def run(self, loop: asyncio.AbstractEventLoop, pool: ThreadPoolExecutor, fn, *args):
+        if self._sem.locked() and self.waiting >= self.queue_max:
+            self.stats["rejected"] += 1
+            raise Busy()
+        t0 = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_times.record(time.perf_counter() - t0)
+        self.stats["admitted"] += 1
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self._sem.release()
+
+    def snapshot(self) -> Dict:
+        w = self.wait_times.summary()
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting,
+                "queue_max": self.queue_max, **self.stats, "wait_p50_ms": w.get("p50_ms"), "wait_p95_ms": w.get("p95_ms")}
+
+class _Live:
+    __slots__ = ("session", "lock", "last_seen", "checkpointed_at", "checkpointed_phase")
+
+    def __init__(self, session: InterviewSession):
+        self.session = session
+        self.lock = asyncio.Lock()  # one turn at a time per session
+        self.last_seen = time.monotonic()
+        self.checkpointed_at = 0.0
+        self.checkpointed_phase = session.phase
+
+class ScreeningService:
+    """Session registry plus the non-blocking wrappers around the synchronous core."""
+
+    def __init__(self, workers: int = SERVER_WORKERS):
+        self.loop = asyncio.get_running_loop()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screen")
+        self.gate = LlmGate()
+        self.sessions: Dict[str, _Live] = {}
+        self.turns = Timings(name="turn")
+
+    async def _blocking(self, fn, *args, llm: bool = False):
+        if llm:
+            return await self.gate.run(self.loop, self.pool, fn, *args)
+        return await self.loop.run_in_executor(self.pool, fn, *args)
+
+    # ---- non-blocking wrappers ----
+    async def agenerate_questions(self, stack: Dict, language: str = "en"):
+        return await self._blocking(generate_questions, stack, language, llm=True)
+
+    async def agrade_answer(self, question: Dict, answer: str, language: str = "en", priority: int = INTERACTIVE) -> Dict:
+        return await self._blocking(grade_answer, question, answer, language, priority, llm=True)
+
+    # ---- sessions ----
+    async def _make_room(self):
+        if len(self.sessions) >= MAX_SESSIONS:
+            await self._evict(time.monotonic() - SESSION_IDLE_TTL)
+        if len(self.sessions) >= MAX_SESSIONS:
+            raise HttpError(503, "too many active sessions, retry shortly", {"Retry-After": "30"})
+
+    async def create(self) -> _Live:
+        await self._make_room()
+        # Grading runs inline in the (gated) turn, so no per-session worker futures are left behind
+        live = _Live(InterviewSession(async_grading=False, enrich_async=False))
+        self.sessions[live.session.sid] = live
+        live.session.start()
+        return live
+
+    async def get(self, sid: str) -> Optional[_Live]:
+        live = self.sessions.get(sid)
+        if live is None and EVENT_LOG:
+            await self._make_room()
+            session = await self._blocking(InterviewSession.resume, sid)
+            if session:
+                session.async_grading = session.enrich_async = False
+                live = self.sessions.setdefault(sid, _Live(session))
+        if live:
+            live.last_seen = time.monotonic()
+        return live
+
+    async def turn(self, live: _Live, text: str) -> list:
+        async with live.lock:
+            s = live.session
+            t0 = time.perf_counter()
+            out = await self._blocking(s.handle, text, llm=s.may_call_llm(text))
+            self.turns.record(time.perf_counter() - t0)
+            await self._maybe_checkpoint(live)
+            return out
+
+    async def _maybe_checkpoint(self, live: _Live, force: bool = False):
+        s = live.session
+        now = time.monotonic()
+        due = force or s.phase != live.checkpointed_phase or now - live.checkpointed_at >= CHECKPOINT_INTERVAL
+        if due and s.candidate.get("consent"):
+            await self._blocking(s.save)
+            live.checkpointed_at, live.checkpointed_phase = now, s.phase
+
+    async def _evict(self, cutoff: float):
+        for sid, live in list(self.sessions.items()):
+            if live.last_seen < cutoff and not live.lock.locked():
+                await self._maybe_checkpoint(live, force=True)
+                self.sessions.pop(sid, None)
+
+    async def evict_idle(self):
+        while True:
+            await asyncio.sleep(min(60.0, SESSION_IDLE_TTL))
+            await self._evict(time.monotonic() - SESSION_IDLE_TTL)
+
+    async def close(self):
+        for live in list(self.sessions.values()):
+            await self._maybe_checkpoint(live, force=True)
+        if EVENT_LOG:
+            get_event_log().flush()
+        self.pool.shutdown(wait=False)
+
+    def health(self) -> Dict:
+        t = self.turns.summary()
+        return {"sessions": len(self.sessions), "llm_gate": self.gate.snapshot(), "rate_limit": rate_limit_stats(),
+                "turns": {"count": t.get("count", 0), "p50_ms": t.get("p50_ms"), "p95_ms": t.get("p95_ms")},
+                "grading": cascade_stats(), "providers": provider_health()}
+
+def _reply(live: _Live, messages: list) -> Dict:
+    return {"sid": live.session.sid, "phase": live.session.phase, "messages": messages}
+
+# ---------- HTTP ----------
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, "headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    if headers.get("transfer-encoding"):
+        # Bodies are framed by Content-Length only; reading a chunked one as empty would lose it
+        raise HttpError(501, "Transfer-Encoding is not supported, send Content-Length", close=True)
+    raw = headers.get("content-length") or "0"
+    if not re.fullmatch(r"[0-9]{1,10}", raw):
+        raise HttpError(400, "invalid Content-Length", close=True)
+    length = int(raw)
+    if length > MAX_BODY:
+        raise HttpError(400, f"Content-Length exceeds {MAX_BODY} bytes", close=True)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+async def _respond(writer: asyncio.StreamWriter, status: int, payload, extra: Dict[str, str] = None, keep_alive: bool = True):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+def _json_body(body: bytes) -> Dict:
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HttpError(400, "body must be JSON")
+    if not isinstance(data, dict):
+        raise HttpError(400, "body must be a JSON object")
+    return data
+
+async def _route(svc: ScreeningService, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+    if path == "/health" and method == "GET":
+        return 200, svc.health()
+    if path == "/sessions" and method == "POST":
+        live = await svc.create()
+        return 201, _reply(live, live.session.messages)
+    if path == "/questions" and method == "POST":
+        data = _json_body(body)
+        qs, err = await svc.agenerate_questions(data.get("stack") or {}, data.get("language") or "en")
+        return 200, {"questions": qs, "error": err}
+    if path == "/grade" and method == "POST":
+        data = _json_body(body)
+        if not isinstance(data.get("question"), dict) or not isinstance(data.get("answer"), str):
+            raise HttpError(400, "question (object) and answer (string) are required")
+        return 200, await svc.agrade_answer(data["question"], data["answer"], data.get("language") or "en",
+                                            parse_priority(data.get("priority")))
+    m = _SESSION_PATH.match(path)
+    if m:
+        live = await svc.get(m.group(1))
+        if live is None:
+            raise HttpError(404, "unknown session")
+        if m.group(2) and method == "POST":
+            text = _json_body(body).get("text")
+            if not isinstance(text, str) or not text.strip():
+                raise HttpError(400, "text is required")
+            return 200, _reply(live, await svc.turn(live, text))
+        if not m.group(2) and method == "GET":
+            return 200, live.session.state()
+        raise HttpError(405, "method not allowed")
+    raise HttpError(404, "not found")
+
+# ---------- WebSocket (RFC 6455, text frames only) ----------
+async def _ws_read(reader: asyncio.StreamReader) -> Tuple[bool, int, bytes]:
+    # One frame: (FIN, opcode, unmasked payload)
+    b1, b2 = await reader.readexactly(2)
+    fin, opcode, masked, n = bool(b1 & 0x80), b1 & 0x0F, b2 & 0x80, b2 & 0x7F
+    if n == 126:
+        n = int.from_bytes(await reader.readexactly(2), "big")
+    elif n == 127:
+        n = int.from_bytes(await reader.readexactly(8), "big")
+    if n > MAX_BODY:
+        raise HttpError(413, "frame too large")
+    mask = await reader.readexactly(4) if masked else b""
+    data = await reader.readexactly(n)
+    if mask:
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return fin, opcode, data
+
+async def _ws_message(reader: asyncio.StreamReader, parts: list) -> Tuple[int, bytes]:
+    """
+    Next control frame or complete data message, reassembling fragments (opcode 0x0
+    continuations, which control frames may interleave). `parts` holds the fragments
+    of the message in progress between calls.
+    """
+    while True:
+        fin, opcode, data = await _ws_read(reader)
+        if opcode >= 0x8:
+            return opcode, data
+        if (opcode == 0x0) != bool(parts):
+            raise HttpError(400, "unexpected continuation frame" if opcode == 0x0 else "expected a continuation frame")
+        parts.append((opcode, data) if opcode else (parts[0][0], data))
+        if sum(len(d) for _, d in parts) > MAX_BODY:
+            raise HttpError(413, "message too large")
+        if fin:
+            opcode, data = parts[0][0], b"".join(d for _, d in parts)
+            parts.clear()
+            return opcode, data
+
+async def _ws_send(writer: asyncio.StreamWriter, payload, opcode: int = 0x1):
+    data = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    n = len(data)
+    head = bytes([0x80 | opcode]) + (bytes([n]) if n < 126 else
+                                     bytes([126]) + n.to_bytes(2, "big") if n < 65536 else
+                                     bytes([127]) + n.to_bytes(8, "big"))
+    writer.write(head + data)
+    await writer.drain()  # a slow reader holds up its own session only
+
+async def _websocket(svc: ScreeningService, reader, writer, headers: Dict[str, str], query: Dict):
+    # The session is resolved before the upgrade so a full server still answers with plain HTTP 503
+    sid = (query.get("sid") or [""])[0]
+    live = await svc.get(sid) if sid else None
+    if live is None:
+        live = await svc.create()
+
+    key = headers.get("sec-websocket-key", "")
+    accept = base64.b64encode(hashlib.sha1(key.encode("latin-1") + _WS_GUID).digest()).decode()
+    writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+
+    await _ws_send(writer, {"type": "messages", **_reply(live, live.session.messages)})
+    parts = []
+    while True:
+        try:
+            opcode, data = await _ws_message(reader, parts)
+        except HttpError as e:
+            # Past the upgrade errors are close codes, not HTTP: 1009 message too big, 1002 protocol error
+            await _ws_send(writer, (1009 if e.status == 413 else 1002).to_bytes(2, "big") + str(e).encode(), opcode=0x8)
+            return
+        if opcode == 0x8:  # close
+            await _ws_send(writer, data[:2], opcode=0x8)
+            return
+        if opcode == 0x9:  # ping
+            await _ws_send(writer, data, opcode=0xA)
+            continue
+        if opcode == 0x2:  # binary: unsupported data
+            await _ws_send(writer, (1003).to_bytes(2, "big") + b"text frames only", opcode=0x8)
+            return
+        if opcode != 0x1:
+            continue
+        raw = data.decode("utf-8", "replace")
+        try:
+            msg = json.loads(raw)
+            text = msg.get("text") if isinstance(msg, dict) else str(msg)
+        except ValueError:
+            text = raw
+        if not text or not str(text).strip():
+            continue
+        try:
+            out = await svc.turn(live, str(text))
+        except Busy:
+            await _ws_send(writer, {"type": "busy", "retry_after": 1, "text": text})
+            continue
+        await _ws_send(writer, {"type": "messages", **_reply(live, out)})
+
+async def _connection(svc: ScreeningService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            req, headers, close = None, {}, False
+            try:
+                req = await _read_request(reader)
+                if req is None:
+                    return
+                method, target, headers, body = req
+                url = urlsplit(target)
+                if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await _websocket(svc, reader, writer, headers, parse_qs(url.query))
+                    return
+                status, payload = await _route(svc, method, url.path, body)
+                extra = None
+            except Busy:
+                status, payload, extra = 503, {"error": "LLM queue full, retry shortly"}, {"Retry-After": "1"}
+            except HttpError as e:
+                status, payload, extra, close = e.status, {"error": str(e)}, e.headers, e.close
+            keep = req is not None and not close and headers.get("connection", "").lower() != "close"
+            await _respond(writer, status, payload, extra, keep_alive=keep and status != 413)
+            if not keep or status == 413:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    except Exception:
+        logger.exception("connection handler failed")
+    finally:
+        writer.close()
+
+async def serve(host: str = SERVER_HOST, port: int = SERVER_PORT):
+    svc = ScreeningService()
+    server = await asyncio.start_server(lambda r, w: _connection(svc, r, w), host, port, limit=MAX_BODY)
+    evictor = asyncio.create_task(svc.evict_idle())
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            svc.loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    logger.info("Screening service on http://%s:%d (LLM slots %d, queue %d)", host, port, LLM_CONCURRENCY, LLM_QUEUE_MAX)
+    async with server:
+        await stop.wait()
+    evictor.cancel()
+    await svc.close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default=SERVER_HOST)
+    ap.add_argument("--port", type=int, default=SERVER_PORT)
+    args = ap.parse_args()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    asyncio.run(serve(args.host, args.port))
+
+if __name__ == "__main__":
+    main()
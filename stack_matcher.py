@@ -0,0 +1,166 @@
+# stack_matcher.py
+import os, re, json, threading
+from typing import Dict, List, Optional, Tuple
+
+TECH_VOCAB_PATH = os.getenv("TECH_VOCAB_PATH", os.path.join(os.path.dirname(__file__), "resources", "tech_vocab.json"))
+FUZZY_CUTOFF = float(os.getenv("STACK_FUZZY_CUTOFF", "92"))
+
+CATEGORIES = ("languages", "frameworks", "databases", "tools")
+Match = Tuple[str, str]  # (category, canonical name)
+
+# Words keep the symbols that appear inside technology names (C++, C#, .NET, Next.js, scikit-learn)
+_WORD = re.compile(r"[^\s,;/|()\[\]{}\"'!?:]+")
+_END = object()  # trie terminal key
+# Between two words: a list separator, or the end of a sentence
+_LIST_GAP = re.compile(r"[,;|/\n\u2022]")
+_SENTENCE_GAP = re.compile(r"[.!?\n]")
+_CONJUNCTIONS = {"and", "or", "&"}
+
+def _spans(text: str) -> List[Tuple[str, str, int, int]]:
+    # (casefolded word, word as written, start, end) for every word of the text
+    out = []
+    for m in _WORD.finditer(text or ""):
+        w = m.group()
+        # Drop sentence punctuation but keep leading dots (.net) and inner ones (node.js)
+        w = w.rstrip(".") if len(w) > 1 and not w.startswith(".") else w
+        if w:
+            out.append((w.casefold(), w, m.start(), m.start() + len(w)))
+    return out
+
+def _tokens(text: str) -> List[str]:
+    return [w for w, _, _, _ in _spans(text)]
+
+class StackMatcher:
+    """
+    Word-level trie over every canonical name and alias, compiled once. scan() walks
+    the text in a single left-to-right pass taking the longest phrase at each word,
+    so cost grows with the text, not with the vocabulary. Words left unmatched are
+    fuzzy-scored together in one rapidfuzz.process.cdist call.
+    Names that are also everyday words ("go", "express", "spring"; the vocabulary's
+    "ambiguous" list) only count in free text as a list item of their own or when
+    capitalized mid-sentence, so "I want to express..." finds nothing.
+    """
+
+    def __init__(self, vocab: Dict):
+        self.known: Dict[str, set] = {c: set(vocab.get("categories", {}).get(c, [])) for c in CATEGORIES}
+        self.non_tech = {w.casefold() for w in vocab.get("non_tech", [])}
+        self.ambiguous = {w.casefold() for w in vocab.get("ambiguous", [])}
+        self.index: Dict[str, Match] = {}
+        for cat in CATEGORIES:
+            for item in self.known[cat]:
+                self.index[item.casefold()] = (cat, item)
+        self.aliases: Dict[str, Match] = {}
+        for alias, canon in (vocab.get("aliases") or {}).items():
+            hit = self.index.get(canon.casefold())
+            if hit:
+                self.aliases[alias.casefold()] = hit
+        self.canon_keys: List[str] = list(self.index)
+        self._trie: Dict = {}
+        self.max_words = 1
+        for phrase, hit in list(self.index.items()) + list(self.aliases.items()):
+            words = _tokens(phrase)
+            if not words:
+                continue
+            node = self._trie
+            for w in words:
+                node = node.setdefault(w, {})
+            node[_END] = hit
+            self.max_words = max(self.max_words, len(words))
+
+    @classmethod
+    def from_file(cls, path: str = TECH_VOCAB_PATH) -> "StackMatcher":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _longest(self, words: List[str], i: int) -> Tuple[Optional[Match], int]:
+        node, best, best_len = self._trie, None, 0
+        for j in range(i, min(len(words), i + self.max_words)):
+            node = node.get(words[j])
+            if node is None:
+                break
+            if _END in node:
+                best, best_len = node[_END], j - i + 1
+        return best, best_len
+
+    def _fuzzy(self, phrases: List[str], scorer: str = "token_set_ratio") -> List[Optional[Match]]:
+        if not phrases or not self.canon_keys:
+            return [None] * len(phrases)
+        from rapidfuzz import process, fuzz
+        scores = process.cdist(phrases, self.canon_keys, scorer=getattr(fuzz, scorer),
+                               score_cutoff=FUZZY_CUTOFF, workers=1)
+        out = []
+        for row in scores:
+            j = int(row.argmax())
+            out.append(self.index[self.canon_keys[j]] if row[j] >= FUZZY_CUTOFF else None)
+        return out
+
+    def match_token(self, token: str) -> Optional[Match]:
+        # One comma-separated item: exact, alias, then a conservative fuzzy match
+        low = (token or "").strip().casefold()
+        if not low or low in self.non_tech:
+            return None
+        hit = self.index.get(low) or self.aliases.get(low)
+        if hit:
+            return hit
+        return self._fuzzy([low])[0]
+
+    def _in_context(self, text: str, spans: List[Tuple[str, str, int, int]], i: int, n: int) -> bool:
+        # An ambiguous name at words[i:i+n] is taken as tech only in list form or capitalized mid-sentence
+        before = text[spans[i - 1][3]:spans[i][2]] if i > 0 else ""
+        after = text[spans[i + n - 1][3]:spans[i + n][2]] if i + n < len(spans) else ""
+        left = i == 0 or bool(_LIST_GAP.search(before)) or spans[i - 1][0] in _CONJUNCTIONS
+        right = i + n == len(spans) or bool(_LIST_GAP.search(after)) or spans[i + n][0] in _CONJUNCTIONS
+        if left and right:
+            return True
+        return i > 0 and not _SENTENCE_GAP.search(before) and spans[i][1][:1].isupper()
+
+    def scan(self, text: str) -> List[Match]:
+        # Free text: every known phrase in reading order, without duplicates
+        spans = _spans(text)
+        words = [w for w, _, _, _ in spans]
+        found: List[Tuple[int, Match]] = []
+        leftovers: List[Tuple[int, str]] = []
+        run: List[str] = []
+        i = 0
+
+        def flush(pos: int):
+            if 1 < len(run) <= self.max_words:
+                leftovers.append((pos - len(run), " ".join(run)))
+            run.clear()
+
+        while i < len(words):
+            hit, n = self._longest(words, i)
+            if hit:
+                flush(i)
+                if " ".join(words[i:i + n]) not in self.ambiguous or self._in_context(text, spans, i, n):
+                    found.append((i, hit))
+                i += n
+                continue
+            w = words[i]
+            if w not in self.non_tech:
+                leftovers.append((i, w))
+                run.append(w)
+            else:
+                flush(i)
+            i += 1
+        flush(i)
+
+        # token_set_ratio scores any subset as 100 ("server" vs "sql server"), too loose for prose
+        for (pos, _), hit in zip(leftovers, self._fuzzy([p for _, p in leftovers], scorer="token_sort_ratio")):
+            if hit:
+                found.append((pos, hit))
+        out: List[Match] = []
+        for _, hit in sorted(found, key=lambda x: x[0]):
+            if hit not in out:
+                out.append(hit)
+        return out
+
+_matcher: StackMatcher | None = None
+_matcher_lock = threading.Lock()
+
+def get_matcher() -> StackMatcher:
+    global _matcher
+    with _matcher_lock:
+        if _matcher is None:
+            _matcher = StackMatcher.from_file()
+        return _matcher
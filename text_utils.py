@@ -1,50 +1,24 @@
 # text_utils.py
 import json, re
 from typing import Any, List, Dict
-from functools import lru_cache
 
 # ---------- Lightweight app utilities ----------
 def csv_or_list(text: str) -> List[str]:
     return [x.strip() for x in re.split(r"[;,]", text or "") if x.strip()]
 
-# Language detection (auto + safe fallback)
+# Language detection and sentiment: seeded, cached engine in enrichment.py
 def detect_language(text: str, default: str = "en") -> str:
-    try:
-        from langdetect import detect
-        t = (text or "").strip()
-        if not t:
-            return default
-        # langdetect returns ISO-639-1 (e.g., "en")
-        code = detect(t)
-        return code or default
-    except Exception:
-        return default
-
-# Sentiment analysis (fast, cached)
-@lru_cache(maxsize=1)
-def _sentiment_analyzer():
-    try:
-        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-        return SentimentIntensityAnalyzer()
-    except Exception:
-        return None
+    """ISO-639-1 code, or `default` for short/structured text or when detection fails."""
+    from enrichment import get_enricher
+    return get_enricher().language(text, default)
 
 def analyze_sentiment(text: str) -> Dict[str, float | str]:
     """
     Returns {'label': 'positive|neutral|negative', 'score': float in [0,1]}
     Falls back to neutral if analyzer is unavailable.
     """
-    a = _sentiment_analyzer()
-    if not a:
-        return {"label": "neutral", "score": 0.5}
-    s = (text or "").strip()
-    if not s:
-        return {"label": "neutral", "score": 0.5}
-    res = a.polarity_scores(s)
-    comp = float(res.get("compound", 0.0))
-    label = "positive" if comp >= 0.05 else "negative" if comp <= -0.05 else "neutral"
-    score = (comp + 1.0) / 2.0  # map [-1,1] -> [0,1]
-    return {"label": label, "score": round(score, 3)}
+    from enrichment import get_enricher
+    return get_enricher().sentiment(text)
 
 # ---------- Safe text coercion for regex/JSON ----------
 def _ensure_text(x: Any) -> str:
@@ -63,49 +37,222 @@ def _ensure_text(x: Any) -> str:
     return str(x)
 
 # ---------- JSON extraction helpers ----------
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"?|[{}\[\]]', re.DOTALL)
+_JSON_OPENER = re.compile(r"[{\[]")
+_JSON_DECODER = json.JSONDecoder()
+_FENCE = "```"
+_MAX_RESCANS = 8
+_DECODE_BUDGET = 4
+
+def _normalize_json(parsed: Any) -> dict | None:
+    if isinstance(parsed, list):
+        return {"questions": parsed} if any(isinstance(i, dict) and "question" in i for i in parsed) else {"items": parsed}
+    if isinstance(parsed, dict):
+        return parsed
+    return None
+
+def _json_spans(s: str, start: int = 0):
+    """
+    Yields (start, end) of balanced top-level {...} / [...] spans in one left-to-right
+    pass. Inside a container, JSON strings (escapes included) are consumed whole by the
+    token regex, so brackets in string values never count and plain text is skipped at
+    C speed. An opener that never closes, or closes with the wrong bracket, is treated
+    as prose and the scan resumes just after it (a bounded number of times).
+    """
+    pos, rescans = start, 0
+    stack: List[str] = []
+    open_at = -1
+    while True:
+        resume = None
+        for m in _JSON_TOKEN.finditer(s, pos):
+            tok = m.group()
+            if tok[0] == '"':
+                if not stack:
+                    # Quote in prose: not a JSON string, skip just the quote itself
+                    resume = m.start() + 1
+                    break
+                continue
+            if tok in "{[":
+                if not stack:
+                    open_at = m.start()
+                stack.append(tok)
+                continue
+            if not stack:
+                continue
+            if (tok == "}") != (stack[-1] == "{"):
+                stack.clear()
+                resume = open_at + 1
+                break
+            stack.pop()
+            if not stack:
+                yield open_at, m.end()
+        if resume is None:
+            if not stack or rescans >= _MAX_RESCANS:
+                return
+            rescans += 1
+            stack.clear()
+            resume = open_at + 1
+        pos = resume
+
+def _fenced_blocks(s: str) -> List[str]:
+    out, pos = [], 0
+    while True:
+        a = s.find(_FENCE, pos)
+        if a < 0:
+            return out
+        nl = s.find("\n", a)
+        b = s.find(_FENCE, a + len(_FENCE))
+        if b < 0:
+            return out
+        # Skip an optional language tag (```json) on the opening line
+        body_start = nl + 1 if 0 <= nl < b else a + len(_FENCE)
+        out.append(s[body_start:b])
+        pos = b + len(_FENCE)
+
+def _structured(parsed: Any) -> bool:
+    # Objects, or arrays holding objects; bare scalar arrays are usually prose like "[1]"
+    return isinstance(parsed, dict) or (isinstance(parsed, list) and any(isinstance(i, dict) for i in parsed))
+
+def _first_json(region: str) -> dict | None:
+    """
+    Tries the C decoder at each opener; failed attempts are charged against a budget
+    proportional to the input, and once it is spent the linear structural scan takes
+    over, so pathological nesting cannot make extraction quadratic.
+    """
+    fallback, pos, budget = None, 0, _DECODE_BUDGET * len(region)
+    while True:
+        m = _JSON_OPENER.search(region, pos)
+        if not m:
+            return fallback
+        try:
+            parsed, end = _JSON_DECODER.raw_decode(region, m.start())
+        except json.JSONDecodeError as e:
+            budget -= e.pos - m.start() + 1
+            if budget < 0:
+                break
+            pos = m.start() + 1
+            continue
+        except RecursionError:
+            break
+        if _structured(parsed):
+            return _normalize_json(parsed)
+        if fallback is None:
+            fallback = _normalize_json(parsed)
+        pos = end
+    for a, b in _json_spans(region, m.start()):
+        try:
+            parsed = json.loads(region[a:b])
+        except (ValueError, RecursionError):
+            continue
+        if _structured(parsed):
+            return _normalize_json(parsed)
+        if fallback is None:
+            fallback = _normalize_json(parsed)
+    return fallback
+
 def extract_first_json_object(text: Any) -> dict:
-    if isinstance(text, dict):
-        return text
-    if isinstance(text, list):
-        return {"questions": text} if any(isinstance(i, dict) and "question" in i for i in text) else {"items": text}
+    if isinstance(text, (dict, list)):
+        return _normalize_json(text)
     if text is None:
         return {}
     s = _ensure_text(text)
-    m = re.search(r"``````", s, flags=re.DOTALL)
-    if not m:
-        m = re.search(r"(\{.*?\}|\[.*?\])", s, flags=re.DOTALL)
-    candidate = m.group(1) if m else s
-    try:
-        parsed = json.loads(candidate)
-        if isinstance(parsed, list):
-            return {"questions": parsed} if any(isinstance(i, dict) and "question" in i for i in parsed) else {"items": parsed}
-        if isinstance(parsed, dict):
+    # Fenced blocks first, then the whole text; the first span that parses wins
+    for region in _fenced_blocks(s) + [s]:
+        parsed = _first_json(region)
+        if parsed is not None:
             return parsed
-    except Exception:
-        pass
+    # Whole payload, including double-encoded JSON strings
     try:
         parsed = json.loads(s)
-        if isinstance(parsed, list):
-            return {"questions": parsed} if any(isinstance(i, dict) and "question" in i for i in parsed) else {"items": parsed}
-        if isinstance(parsed, dict):
-            return parsed
-    except Exception:
-        pass
-    try:
-        inner = json.loads(candidate)
-        if isinstance(inner, (str, bytes, bytearray)):
-            parsed = json.loads(_ensure_text(inner))
-            if isinstance(parsed, list):
-                return {"questions": parsed} if any(isinstance(i, dict) and "question" in i for i in parsed) else {"items": parsed}
-            if isinstance(parsed, dict):
-                return parsed
-        if isinstance(inner, dict):
-            return inner
-        if isinstance(inner, list):
-            return {"questions": inner} if any(isinstance(i, dict) and "question" in i for i in inner) else {"items": inner}
+        if isinstance(parsed, str):
+            parsed = json.loads(parsed)
+        return _normalize_json(parsed) or {}
     except Exception:
         return {}
-    return {}
+
+class QuestionStreamParser:
+    """
+    Incremental parser for streamed LLM output. Feed text chunks as they arrive;
+    each call returns the objects of the question list (either a top-level array or
+    the "questions" array of a top-level object) whose closing brace has been seen.
+    A top-level "[" only counts once the next non-blank character is "{", so
+    bracketed prose before the JSON ("see [1]") is skipped.
+    """
+
+    def __init__(self, key: str = "questions"):
+        self.key = key
+        self.pos = 0
+        self.stack: List[str] = []      # open containers: "{" or "["
+        self.in_str = False
+        self.esc = False
+        self.str_start = -1
+        self.last_str = None            # last string closed directly inside the top-level object
+        self.last_key = None            # ... once a ":" has made it a key
+        self.maybe_list = False         # a top-level "[" waiting to see whether it holds objects
+        self.target_depth = -1          # depth of the question array once found
+        self.obj_start = -1
+        self._text = ""                 # unscanned input plus the open question object / key, if any
+
+    def feed(self, chunk: str) -> List[dict]:
+        out = []
+        s = self._text + (chunk or "")
+        for i in range(self.pos, len(s)):
+            ch = s[i]
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == "\\":
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+                    if len(self.stack) == 1 and self.stack[0] == "{":
+                        self.last_str, self.last_key = s[self.str_start + 1:i], None
+                continue
+            if self.maybe_list and not ch.isspace():
+                self.maybe_list = False
+                if ch == "{":
+                    self.target_depth = 1
+            if ch == '"':
+                self.in_str, self.str_start = True, i
+            elif ch in "{[":
+                depth = len(self.stack)
+                if ch == "[" and self.target_depth == -1 and depth == 0:
+                    self.maybe_list = True
+                elif ch == "[" and self.target_depth == -1 and depth == 1 and self.stack[0] == "{" \
+                        and self.last_key == self.key:
+                    self.target_depth = 2
+                elif ch == "{" and depth == self.target_depth and self.stack[-1] == "[":
+                    self.obj_start = i
+                self.stack.append(ch)
+            elif ch in ":," and len(self.stack) == 1 and self.stack[0] == "{":
+                self.last_str, self.last_key = None, self.last_str if ch == ":" else None
+            elif ch in "}]":
+                if not self.stack:
+                    continue
+                self.stack.pop()
+                if ch == "}" and self.obj_start >= 0 and len(self.stack) == self.target_depth:
+                    try:
+                        obj = json.loads(s[self.obj_start:i + 1])
+                        if isinstance(obj, dict):
+                            out.append(obj)
+                    except Exception:
+                        pass
+                    self.obj_start = -1
+                elif ch == "]" and len(self.stack) == self.target_depth - 1:
+                    self.target_depth = -2  # list closed; ignore anything after it
+        # Keep only what a later chunk can still need (the open object, or a key being read),
+        # so each feed costs the chunk plus at most one question, not the whole reply so far
+        keep = len(s)
+        if self.obj_start >= 0:
+            keep = self.obj_start
+        if self.in_str and len(self.stack) == 1 and self.stack[0] == "{":
+            keep = min(keep, self.str_start)
+        self._text = s[keep:]
+        self.pos = len(s) - keep
+        if self.obj_start >= 0:
+            self.obj_start -= keep
+        self.str_start -= keep
+        return out
 
 def extract_json(text: Any) -> dict:
     obj = extract_first_json_object(text)
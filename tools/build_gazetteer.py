@@ -0,0 +1,25 @@
+# tools/build_gazetteer.py
+"""
+Builds the offline city index used by LOCATION_MODE=offline|hybrid.
+
+    python tools/build_gazetteer.py cities500.txt [--out data/gazetteer.idx]
+
+Input is any GeoNames cities dump (https://download.geonames.org/export/dump/).
+"""
+import os, sys, time, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gazetteer import build_index, GAZETTEER_PATH
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("source", help="GeoNames tab-separated cities file")
+    ap.add_argument("--out", default=GAZETTEER_PATH)
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    n = build_index(args.source, args.out)
+    size = os.path.getsize(args.out) / 1e6
+    print(f"Indexed {n} city names into {args.out} ({size:.1f} MB) in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
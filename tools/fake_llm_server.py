@@ -0,0 +1,302 @@
+# tools/fake_llm_server.py
+"""
+Local stand-in for the providers, for load tests and offline development. Speaks
+enough of three APIs for this app:
+
+    POST /v1/chat/completions   OpenAI chat completions (JSON or SSE with "stream": true)
+    POST /api/chat              Ollama chat (JSON or NDJSON stream)
+    GET  /search                Nominatim search (for GEOCODER_DOMAIN/GEOCODER_SCHEME)
+    GET  /stats                 request and injected-fault counters
+
+    python tools/fake_llm_server.py [--port 8089] [--latency lognormal:600,0.5]
+        [--error-rate 0.01] [--rate-limit-rate 0.02] [--quota-rate 0] [--rpm 0] [--seed 7]
+
+Replies are canned but shaped like the real thing: question-generation prompts
+get 3 questions per declared topic, grading prompts (single or batched) get a
+verdict per answer (pass from 12 words up), anything else gets a short text.
+--latency is fixed:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA (milliseconds);
+streamed replies spend it before the first chunk and then --chunk-ms per chunk.
+Faults are drawn per request: 500s, 429 rate limits (with Retry-After) and 429
+insufficient_quota; --rpm additionally returns 429 above a real per-minute rate.
+
+Point the app at it with
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake PROVIDER=openai
+    OLLAMA_HOST=http://127.0.0.1:8089 PROVIDER=ollama
+    GEOCODER_DOMAIN=127.0.0.1:8089 GEOCODER_SCHEME=http GEOCODE_MIN_INTERVAL=0
+"""
+import os, re, sys, json, time, math, random, argparse, threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from country_index import get_country_index
+
+PASS_WORDS = 12
+_STACK_LINE = re.compile(r"^(Languages|Frameworks|Databases|Tools):[ \t]*(.*)$", re.MULTILINE)
+_DIFFICULTIES = ("beginner", "intermediate", "advanced")
+
+def parse_latency(spec: str):
+    """'fixed:300', 'uniform:100,900' or 'lognormal:600,0.5' -> sampler(rng) returning seconds."""
+    kind, _, args = (spec or "fixed:0").partition(":")
+    vals = [float(x) for x in args.split(",") if x.strip()] or [0.0]
+    if kind == "fixed":
+        return lambda rng: vals[0] / 1e3
+    if kind == "uniform":
+        lo, hi = vals[0], vals[1] if len(vals) > 1 else vals[0]
+        return lambda rng: rng.uniform(lo, hi) / 1e3
+    if kind == "lognormal":
+        median, sigma = vals[0], vals[1] if len(vals) > 1 else 0.5
+        return lambda rng: rng.lognormvariate(math.log(max(median, 1e-3)), sigma) / 1e3
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+# ---------- canned replies ----------
+def _questions(prompt: str) -> dict:
+    topics = []
+    for _, items in _STACK_LINE.findall(prompt):
+        topics += [t.strip() for t in items.split(",") if t.strip()]
+    out = []
+    for t in topics or ["General"]:
+        out += [{"topic": t, "difficulty": d,
+                 "question": f"({d}) How would you use {t} in a production service, and what would you watch out for?"}
+                for d in _DIFFICULTIES]
+    return {"questions": out}
+
+def _verdict(answer: str) -> dict:
+    ok = len(str(answer or "").split()) >= PASS_WORDS
+    return {"verdict": "pass" if ok else "needs_improvement",
+            "feedback": "Covers the key ideas with an example." if ok else "Too brief; explain the concept and give an example."}
+
+def canned_reply(messages: list) -> str:
+    last = str((messages or [{}])[-1].get("content") or "")
+    if "Declared tech stack:" in last:
+        return json.dumps(_questions(last))
+    try:
+        data = json.loads(last)
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and isinstance(data.get("items"), list):
+        return json.dumps({"results": [{"id": it.get("id"), **_verdict(it.get("answer"))}
+                                       for it in data["items"] if isinstance(it, dict)]})
+    if isinstance(data, dict) and "answer" in data:
+        return json.dumps(_verdict(data["answer"]))
+    return "OK."
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _chunks(text: str, size: int = 24):
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+# ---------- server ----------
+class FakeProvider:
+    """Fault injection, latency sampling and counters shared by the handler threads."""
+
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 quota_rate: float = 0.0, rpm: int = 0, chunk_ms: float = 5.0, seed: int = 7):
+        self.sample = parse_latency(latency)
+        self.error_rate, self.rate_limit_rate, self.quota_rate = error_rate, rate_limit_rate, quota_rate
+        self.rpm, self.chunk_s = rpm, chunk_ms / 1e3
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: deque = deque()
+        self.stats = {"requests": 0, "openai": 0, "ollama": 0, "search": 0, "streamed": 0,
+                      "errors_500": 0, "rate_limited": 0, "quota": 0, "rpm_limited": 0}
+
+    def count(self, *names: str) -> None:
+        with self._lock:
+            for n in names:
+                self.stats[n] += 1
+
+    def draw(self) -> tuple:
+        """(fault or None, latency seconds) for one chat request."""
+        with self._lock:
+            now = time.monotonic()
+            if self.rpm:
+                while self._window and self._window[0] < now - 60:
+                    self._window.popleft()
+                if len(self._window) >= self.rpm:
+                    self.stats["rpm_limited"] += 1
+                    return "rpm", 0.0
+                self._window.append(now)
+            r = self._rng.random()
+            fault = None
+            if r < self.error_rate:
+                fault = "errors_500"
+            elif r < self.error_rate + self.rate_limit_rate:
+                fault = "rate_limited"
+            elif r < self.error_rate + self.rate_limit_rate + self.quota_rate:
+                fault = "quota"
+            if fault:
+                self.stats[fault] += 1
+            return fault, self.sample(self._rng)
+
+_FAULTS = {
+    "errors_500": (500, {"error": {"message": "The server had an error while processing your request.",
+                                   "type": "server_error"}}),
+    "rate_limited": (429, {"error": {"message": "Rate limit reached for requests. Please try again in 1s.",
+                                     "type": "requests", "code": "rate_limit_exceeded"}}),
+    "rpm": (429, {"error": {"message": "Rate limit reached for requests per min (RPM).",
+                            "type": "requests", "code": "rate_limit_exceeded"}}),
+    "quota": (429, {"error": {"message": "You exceeded your current quota, please check your plan and billing details.",
+                              "type": "insufficient_quota", "code": "insufficient_quota"}}),
+}
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    provider: FakeProvider = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: dict = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict:
+        n = int(self.headers.get("Content-Length") or 0)
+        try:
+            data = json.loads(self.rfile.read(n) or b"{}")
+        except ValueError:
+            data = {}
+        return data if isinstance(data, dict) else {}
+
+    def _stream_start(self, content_type: str) -> None:
+        # No length for a stream; the connection closes when it ends
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            with self.provider._lock:
+                return self._send_json(200, dict(self.provider.stats))
+        if url.path in ("/search", "/search.php"):
+            return self._search(parse_qs(url.query))
+        if url.path == "/v1/models":
+            return self._send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path == "/v1/chat/completions":
+            return self._openai(self._body())
+        if path == "/api/chat":
+            return self._ollama(self._body())
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def _search(self, qs: dict) -> None:
+        # Every city exists, in the first requested country; a global probe finds nothing
+        self.provider.count("requests", "search")
+        city = (qs.get("q") or [""])[0].strip()
+        codes = [c for c in (qs.get("countrycodes") or [""])[0].split(",") if c]
+        country = get_country_index().resolve(codes[0]) if codes else None
+        if not city or not country:
+            return self._send_json(200, [])
+        self._send_json(200, [{"place_id": abs(hash((city, country.alpha_2))) % 10**8, "lat": "0.0", "lon": "0.0",
+                               "display_name": f"{city.title()}, {country.name}", "type": "city",
+                               "address": {"city": city.title(), "country": country.name,
+                                           "country_code": country.alpha_2.lower()}}])
+
+    def _fault(self, kind: str) -> bool:
+        fault, delay = self.provider.draw()
+        if fault:
+            status, payload = _FAULTS[fault]
+            if kind == "ollama":
+                payload = {"error": payload["error"]["message"]}
+            self._send_json(status, payload, {"Retry-After": "1"} if status == 429 else None)
+            return True
+        time.sleep(delay)
+        return False
+
+    def _openai(self, req: dict) -> None:
+        self.provider.count("requests", "openai")
+        if self._fault("openai"):
+            return
+        messages = req.get("messages") or []
+        text = canned_reply(messages)
+        model = req.get("model") or "fake-model"
+        rid, created = f"chatcmpl-fake-{self.provider.stats['openai']}", int(time.time())
+        prompt_tokens = sum(_tokens(str(m.get("content") or "")) for m in messages)
+        if not req.get("stream"):
+            return self._send_json(200, {
+                "id": rid, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": _tokens(text),
+                          "total_tokens": prompt_tokens + _tokens(text)}})
+        self.provider.count("streamed")
+        self._stream_start("text/event-stream")
+        deltas = [{"role": "assistant", "content": ""}] + [{"content": c} for c in _chunks(text)]
+        for i, delta in enumerate(deltas + [{}]):
+            chunk = {"id": rid, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": None if delta else "stop"}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if i:
+                time.sleep(self.provider.chunk_s)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _ollama(self, req: dict) -> None:
+        self.provider.count("requests", "ollama")
+        if self._fault("ollama"):
+            return
+        text = canned_reply(req.get("messages") or [])
+        base = {"model": req.get("model") or "fake-model",
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        if req.get("stream", True) is False:  # Ollama streams unless told not to
+            return self._send_json(200, {**base, "message": {"role": "assistant", "content": text},
+                                         "done": True, "eval_count": _tokens(text)})
+        self.provider.count("streamed")
+        self._stream_start("application/x-ndjson")
+        for c in _chunks(text):
+            self.wfile.write((json.dumps({**base, "message": {"role": "assistant", "content": c}, "done": False}) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.provider.chunk_s)
+        self.wfile.write((json.dumps({**base, "message": {"role": "assistant", "content": ""}, "done": True}) + "\n").encode("utf-8"))
+
+def serve(provider: FakeProvider, host: str = "127.0.0.1", port: int = 8089) -> ThreadingHTTPServer:
+    """Starts the server on a daemon thread and returns it (call .shutdown() to stop)."""
+    handler = type("BoundHandler", (Handler,), {"provider": provider})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="fake-llm", daemon=True).start()
+    return httpd
+
+def add_fault_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--latency", default="lognormal:600,0.5", help="fixed:MS | uniform:LO,HI | lognormal:MEDIAN,SIGMA")
+    ap.add_argument("--chunk-ms", type=float, default=5.0, help="delay between streamed chunks")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of 500 replies")
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429 rate-limit replies")
+    ap.add_argument("--quota-rate", type=float, default=0.0, help="share of 429 insufficient_quota replies")
+    ap.add_argument("--rpm", type=int, default=0, help="real per-minute request limit (0 = none)")
+    ap.add_argument("--seed", type=int, default=7)
+
+def provider_from_args(args) -> FakeProvider:
+    return FakeProvider(args.latency, args.error_rate, args.rate_limit_rate, args.quota_rate,
+                        args.rpm, args.chunk_ms, args.seed)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    add_fault_args(ap)
+    args = ap.parse_args()
+    httpd = serve(provider_from_args(args), args.host, args.port)
+    print(f"fake provider on http://{args.host}:{args.port} (latency {args.latency}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        httpd.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# tools/load_generator.py
+"""
+Drives N simulated candidates through intake -> questions -> grading against a
+provider stand-in and reports per-stage latency percentiles and throughput.
+
+    python tools/load_generator.py [--candidates 200] [--concurrency 20] [--provider openai]
+        [--spawn-fake --latency lognormal:600,0.5 --rate-limit-rate 0.02 ...] [--base-url http://127.0.0.1:8089]
+        [--all-llm] [--cache] [--think-ms 0]
+
+Each candidate runs on its own worker thread:
+    intake     the field validators (name, email, phone, years, roles, location, stack)
+    questions  llm_service.generate_questions
+    grade      llm_service.grade_answer, once per question
+    session    the whole candidate, end to end
+Location is checked against the stand-in's Nominatim endpoint. The question
+cache is off unless --cache, so every candidate generates; --all-llm widens the
+grading band so every answer goes to the provider instead of the local tier.
+--spawn-fake starts tools/fake_llm_server.py in-process (the fault flags are the
+same); otherwise --base-url must point at a running one.
+"""
+import os, sys, time, random, argparse, threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm_server import add_fault_args, provider_from_args, serve
+
+NAMES = ["Ana Smith", "Ravi Kumar", "Mei Lin", "John O'Neil", "Fatima Rahman", "Lukas Weber", "Sara Costa"]
+ROLES = ["Backend Engineer", "ML Engineer; Data Scientist", "DevOps Engineer", "Full Stack Developer"]
+CITIES = ["Pune, India", "Mumbai, India", "Berlin, Germany", "Austin, United States", "Dhaka, Bangladesh",
+          "Toronto, Canada", "Lisbon, Portugal"]
+STACKS = ["Python, Django, PostgreSQL, Docker", "Java, Spring, MySQL, Kubernetes", "JavaScript, React, Node.js, MongoDB",
+          "Python, PyTorch, Pandas, AWS", "Go, Redis, PostgreSQL, Terraform"]
+ANSWERS = [
+    "A generator uses yield to produce values lazily, for example streaming a large file line by line without loading it.",
+    "I would check the query plan with EXPLAIN, add a covering index and keep transactions short to avoid lock contention.",
+    "Not sure, I have not used that much.",
+    "Build a small image with a multi-stage Dockerfile and cache the dependency layer so rebuilds stay fast in CI.",
+    "idk",
+]
+
+def _configure_env(args, base_url: str) -> None:
+    # Read by llm_service / api_client / geo_cache at import, so this runs before those imports
+    host = urlsplit(base_url).netloc
+    os.environ["PROVIDER"] = args.provider
+    os.environ["OPENAI_BASE_URL"] = base_url.rstrip("/") + "/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    os.environ["OLLAMA_HOST"] = base_url
+    os.environ["EVAL_ANSWERS"] = "true"
+    os.environ["QUESTION_CACHE"] = "true" if args.cache else "false"
+    os.environ["LOCATION_MODE"] = "nominatim"
+    os.environ["GEOCODER_DOMAIN"], os.environ["GEOCODER_SCHEME"] = host, "http"
+    os.environ["GEOCODE_MIN_INTERVAL"], os.environ["GEOCODE_DB"] = "0", ""
+    if args.all_llm:
+        os.environ["GRADE_BAND_LOW"], os.environ["GRADE_BAND_HIGH"] = "0", "1.01"
+
+class Stages:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def report(self, wall: float) -> None:
+        print(f"{'stage':<10}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for stage in ("intake", "questions", "grade", "session"):
+            xs = sorted(self.samples.get(stage, []))
+            if not xs:
+                continue
+            pick = lambda q: xs[min(len(xs) - 1, int(q * len(xs)))] * 1e3
+            print(f"{stage:<10}{len(xs):>7}{pick(0.50):>10.1f}{pick(0.95):>10.1f}{pick(0.99):>10.1f}{xs[-1] * 1e3:>10.1f}")
+        done = len(self.samples.get("session", []))
+        print(f"{done} candidates in {wall:.2f}s: {done / wall:.2f} candidates/s, "
+              f"{len(self.samples.get('grade', [])) / wall:.1f} grades/s")
+        print("outcomes: " + ", ".join(f"{k} {v}" for k, v in sorted(self.counts.items())))
+
+def run_candidate(i: int, args, stages: Stages) -> None:
+    from interview_session import InterviewSession
+    from llm_service import generate_questions, grade_answer
+
+    rng = random.Random(args.seed * 100003 + i)
+    t_start = time.perf_counter()
+    # The session's own field validators, without the chat turns around them
+    s = InterviewSession(sid=f"load{i:06d}", events=None, async_grading=False, batch_grading=False, enrich_async=False)
+    fields = [("consent", "yes"), ("full_name", rng.choice(NAMES)), ("email", f"load{i}@example.com"),
+              ("phone", f"+9198765{i % 100000:05d}"), ("years_experience", str(rng.randint(0, 20))),
+              ("desired_positions", rng.choice(ROLES)), ("current_location", rng.choice(CITIES)),
+              ("tech_stack", rng.choice(STACKS))]
+    for field, text in fields:
+        if not s.validate_and_set(field, text):
+            stages.count(f"intake_rejected:{field}")
+            return
+    stack = s.candidate["tech_stack"]
+    stages.record("intake", time.perf_counter() - t_start)
+
+    t0 = time.perf_counter()
+    questions, err = generate_questions(stack, "en")
+    stages.record("questions", time.perf_counter() - t0)
+    stages.count("questions_fallback" if err else "questions_llm")
+
+    for q in questions:
+        if args.think_ms:
+            time.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1e3)
+        t0 = time.perf_counter()
+        grade = grade_answer(q, rng.choice(ANSWERS), language="en")
+        stages.record("grade", time.perf_counter() - t0)
+        stages.count(f"tier:{grade.get('tier')}")
+    stages.record("session", time.perf_counter() - t_start)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--candidates", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=20)
+    ap.add_argument("--provider", choices=["openai", "ollama", "cassette"], default="openai",
+                    help="cassette replays CASSETTE_PATH (or records through the stand-in with CASSETTE_MODE=record)")
+    ap.add_argument("--base-url", default="http://127.0.0.1:8089", help="running fake_llm_server (ignored with --spawn-fake)")
+    ap.add_argument("--spawn-fake", action="store_true", help="start the stand-in in this process")
+    ap.add_argument("--port", type=int, default=8089, help="port for --spawn-fake")
+    ap.add_argument("--all-llm", action="store_true", help="send every answer to the provider")
+    ap.add_argument("--cache", action="store_true", help="keep the question cache on")
+    ap.add_argument("--think-ms", type=float, default=0.0, help="mean pause before each answer")
+    add_fault_args(ap)
+    args = ap.parse_args()
+
+    fake = None
+    if args.spawn_fake:
+        fake = provider_from_args(args)
+        serve(fake, "127.0.0.1", args.port)
+        args.base_url = f"http://127.0.0.1:{args.port}"
+    _configure_env(args, args.base_url)
+
+    from api_client import client_stats
+    from rate_limiter import rate_limit_stats
+    from circuit_breaker import breaker_stats
+
+    stages = Stages()
+    run_candidate(-1, args, Stages())  # warm imports, matcher, rubric and local grader
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="candidate") as pool:
+        for f in [pool.submit(run_candidate, i, args, stages) for i in range(args.candidates)]:
+            f.result()
+    wall = time.perf_counter() - t0
+
+    print(f"{args.candidates} candidates, concurrency {args.concurrency}, provider {args.provider} at {args.base_url}")
+    stages.report(wall)
+    if fake is not None:
+        print("stand-in: " + ", ".join(f"{k} {v}" for k, v in fake.stats.items() if v))
+    print(f"http client: {client_stats()}")
+    print(f"rate limiter: {rate_limit_stats()}")
+    print(f"breakers: {breaker_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# tools/migrate_storage.py
+"""
+Imports the JSON-file store (data/candidates, data/answers, data/profiles) into SQLite.
+
+    python tools/migrate_storage.py [--db data/talentscout.sqlite3] [--dry-run]
+
+Safe to re-run: records are upserted by candidate ID / email. Candidate creation
+time is taken from the file's mtime. Set STORAGE_BACKEND=sqlite afterwards.
+"""
+import os, sys, json, time, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_storage import CAND_DIR, PROF_DIR, ANSW_DIR, STORAGE_DB, SqliteStore
+
+def _json_files(folder: str):
+    if not os.path.isdir(folder):
+        return
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".json"):
+            yield name[:-5], os.path.join(folder, name)
+
+def _read(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  skip {path}: {e}")
+        return None
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=STORAGE_DB)
+    ap.add_argument("--dry-run", action="store_true", help="read and validate only")
+    args = ap.parse_args()
+
+    store = None if args.dry_run else SqliteStore(args.db)
+    t0 = time.perf_counter()
+    n_cand = n_ans = n_prof = 0
+    for cid, path in _json_files(CAND_DIR):
+        rec = _read(path)
+        if not isinstance(rec, dict):
+            continue
+        if store:
+            store.save_candidate(cid, rec, created_at=os.path.getmtime(path))
+        n_cand += 1
+        apath = os.path.join(ANSW_DIR, f"{cid}.json")
+        answers = _read(apath) if os.path.exists(apath) else None
+        if isinstance(answers, list):
+            if store:
+                store.save_answers(cid, answers)
+            n_ans += 1
+    for safe_email, path in _json_files(PROF_DIR):
+        prof = _read(path)
+        if not isinstance(prof, dict):
+            continue
+        if store:
+            store.save_profile(safe_email, prof)
+        n_prof += 1
+
+    verb = "Found" if args.dry_run else f"Imported into {args.db}:"
+    print(f"{verb} {n_cand} candidates ({n_ans} with answers), {n_prof} profiles "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
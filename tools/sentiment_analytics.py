@@ -0,0 +1,240 @@
+# tools/sentiment_analytics.py
+"""
+Batch sentiment/language analytics over stored interviews.
+
+    python tools/sentiment_analytics.py [--out data/analytics] [--format parquet|npz]
+                                        [--workers N] [--chunk 2000] [--detect-language]
+                                        [--synthetic 100000]
+
+Candidates are streamed from data_storage; each candidate's user turns come from
+its session event log (data/events/<id>), or from the saved answers when there
+is no log. Turns are scored with VADER in chunks on a process pool (repeated
+replies such as "yes" are scored once per chunk) and aggregated with NumPy per
+candidate, desired role, location and day. Output is one Parquet file per table
+when pyarrow is installed, otherwise a single NPZ.
+
+Language comes from the session language recorded with each turn;
+--detect-language re-detects it with the seeded detector (much slower than scoring).
+--synthetic N skips storage and scores N generated turns, for timing the pipeline.
+"""
+import os, sys, time, random, argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "analytics")
+
+Turn = Tuple[str, float, str]  # (text, unix ts or 0 when unknown, language)
+
+# ---------- worker side ----------
+_analyzer = None
+_detect = None
+
+def _init_worker(detect_language: bool):
+    global _analyzer, _detect
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    _analyzer = SentimentIntensityAnalyzer()
+    if detect_language:
+        from enrichment import get_enricher
+        _detect = get_enricher().language
+
+def _score_chunk(texts: List[str]) -> Tuple[np.ndarray, List[str] | None]:
+    # texts are unique within the chunk; compound scores come back in the same order
+    scores = np.fromiter((_analyzer.polarity_scores(t)["compound"] for t in texts), dtype=np.float32, count=len(texts))
+    langs = [_detect(t, "") for t in texts] if _detect else None
+    return scores, langs
+
+# ---------- reading stored interviews ----------
+def _user_turns(cid: str, events, load_answers) -> List[Turn]:
+    turns = []
+    for ev in events.read(cid):
+        data = ev.get("data") or {}
+        if ev.get("type") == "message" and data.get("role") == "user" and data.get("content"):
+            turns.append((data["content"], float(ev.get("ts") or 0), (data.get("meta") or {}).get("lang") or ""))
+    if not turns:
+        turns = [(a.get("answer") or "", 0.0, "") for a in load_answers(cid) if a.get("answer")]
+    return turns
+
+def stored_interviews() -> Iterator[Tuple[str, List[str], str, List[Turn]]]:
+    from data_storage import iter_candidates, load_answers
+    from event_log import get_event_log
+    events = get_event_log()
+    for cid, rec in iter_candidates():
+        turns = _user_turns(cid, events, load_answers)
+        if turns:
+            yield cid, list(rec.get("desired_positions") or []), rec.get("current_location") or "", turns
+
+def synthetic_interviews(n_turns: int, seed: int = 7) -> Iterator[Tuple[str, List[str], str, List[Turn]]]:
+    rng = random.Random(seed)
+    roles = ["Backend Engineer", "ML Engineer", "Data Scientist", "Software Engineer"]
+    places = ["Pune, India", "Dhaka, Bangladesh", "Berlin, Germany", "Austin, United States"]
+    words = ("good great slow broken love hate fine okay cache index query latency retry deadlock "
+             "memory leak profile timeout clean fast frustrating excellent terrible").split()
+    t0, made, i = time.time() - 90 * 86400, 0, 0
+    while made < n_turns:
+        k = min(14, n_turns - made)
+        turns = [("yes", t0 + made * 60, "en")] + [
+            (" ".join(rng.choices(words, k=rng.randint(6, 20))), t0 + (made + j) * 60, "en") for j in range(1, k)]
+        yield f"s{i:06d}", [rng.choice(roles)], rng.choice(places), turns
+        made, i = made + k, i + 1
+
+# ---------- pipeline ----------
+class Columns:
+    """Per-turn columns plus the dimension tables they index into."""
+
+    def __init__(self):
+        self.cand_ids: List[str] = []
+        self.cand_roles: List[List[int]] = []
+        self.cand_loc: List[int] = []
+        self.roles: Dict[str, int] = {}
+        self.locations: Dict[str, int] = {}
+        self.turn_cand: List[np.ndarray] = []
+        self.turn_day: List[np.ndarray] = []
+        self.turn_score: List[np.ndarray] = []
+        self.langs: Dict[str, int] = {}
+        self.turn_lang: List[np.ndarray] = []
+
+    def intern(self, table: Dict[str, int], key: str) -> int:
+        return table.setdefault(key, len(table))
+
+def _chunks(interviews, cols: Columns, chunk: int):
+    # Groups turns into chunks of unique texts; yields (texts, per-turn index into texts, cand, day, lang)
+    texts, slot, t_idx, t_cand, t_day, t_lang = [], {}, [], [], [], []
+    for cid, roles, location, turns in interviews:
+        c = len(cols.cand_ids)
+        cols.cand_ids.append(cid)
+        cols.cand_roles.append([cols.intern(cols.roles, r) for r in roles] or [cols.intern(cols.roles, "")])
+        cols.cand_loc.append(cols.intern(cols.locations, location))
+        for text, ts, lang in turns:
+            j = slot.get(text)
+            if j is None:
+                j = slot[text] = len(texts)
+                texts.append(text)
+            t_idx.append(j), t_cand.append(c), t_day.append(int(ts // 86400) if ts else -1), t_lang.append(lang)
+        if len(t_idx) >= chunk:
+            yield texts, t_idx, t_cand, t_day, t_lang
+            texts, slot, t_idx, t_cand, t_day, t_lang = [], {}, [], [], [], []
+    if t_idx:
+        yield texts, t_idx, t_cand, t_day, t_lang
+
+def score(interviews, workers: int, chunk: int, detect_language: bool) -> Columns:
+    cols = Columns()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(detect_language,)) as pool:
+        inflight: deque = deque()
+
+        def drain_one():
+            fut, t_idx, t_cand, t_day, t_lang = inflight.popleft()
+            scores, langs = fut.result()
+            idx = np.asarray(t_idx, dtype=np.int64)
+            cols.turn_score.append(scores[idx])
+            cols.turn_cand.append(np.asarray(t_cand, dtype=np.int32))
+            cols.turn_day.append(np.asarray(t_day, dtype=np.int32))
+            if langs is not None:
+                t_lang = [langs[j] or t_lang[n] for n, j in enumerate(t_idx)]
+            cols.turn_lang.append(np.fromiter((cols.intern(cols.langs, l or "und") for l in t_lang),
+                                              dtype=np.int16, count=len(t_lang)))
+
+        for texts, t_idx, t_cand, t_day, t_lang in _chunks(interviews, cols, chunk):
+            inflight.append((pool.submit(_score_chunk, texts), t_idx, t_cand, t_day, t_lang))
+            if len(inflight) >= 2 * workers:  # bounded memory while streaming
+                drain_one()
+        while inflight:
+            drain_one()
+    return cols
+
+def _group(keys: np.ndarray, scores: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+    n = np.bincount(keys, minlength=size).astype(np.int64)
+    s = np.bincount(keys, weights=scores, minlength=size)
+    ss = np.bincount(keys, weights=scores.astype(np.float64) ** 2, minlength=size)
+    pos = np.bincount(keys, weights=(scores >= 0.05), minlength=size)
+    neg = np.bincount(keys, weights=(scores <= -0.05), minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, s / n, np.nan)
+        std = np.sqrt(np.maximum(np.where(n > 0, ss / n, np.nan) - mean ** 2, 0))
+        return {"turns": n, "mean_compound": mean.astype(np.float32), "std_compound": std.astype(np.float32),
+                "positive_share": np.where(n > 0, pos / n, np.nan).astype(np.float32),
+                "negative_share": np.where(n > 0, neg / n, np.nan).astype(np.float32)}
+
+def aggregate(cols: Columns) -> Dict[str, Dict[str, np.ndarray]]:
+    scores = np.concatenate(cols.turn_score) if cols.turn_score else np.zeros(0, np.float32)
+    cand = np.concatenate(cols.turn_cand) if cols.turn_cand else np.zeros(0, np.int32)
+    day = np.concatenate(cols.turn_day) if cols.turn_day else np.zeros(0, np.int32)
+    lang = np.concatenate(cols.turn_lang) if cols.turn_lang else np.zeros(0, np.int16)
+    n_cand = len(cols.cand_ids)
+    label = lambda table: np.array(sorted(table, key=table.get), dtype=object).astype(str)
+
+    tables = {"candidates": {"candidate_id": np.array(cols.cand_ids, dtype=str),
+                             "location": label(cols.locations)[np.asarray(cols.cand_loc, dtype=np.int64)]
+                             if n_cand else np.zeros(0, str),
+                             **_group(cand, scores, n_cand)}}
+    # Roles are multi-valued: a turn counts towards every role its candidate applied for
+    pairs = [(c, r) for c, rs in enumerate(cols.cand_roles) for r in rs]
+    if pairs and len(scores):
+        pc, pr = np.asarray(pairs, dtype=np.int64).T
+        order = np.argsort(cand, kind="stable")
+        starts = np.searchsorted(cand[order], np.arange(n_cand + 1))
+        per_cand = np.diff(starts)
+        turn_role = np.repeat(pr, per_cand[pc])
+        turn_rows = np.concatenate([order[starts[c]:starts[c + 1]] for c in pc]) if len(pc) else np.zeros(0, np.int64)
+        tables["roles"] = {"role": label(cols.roles), **_group(turn_role, scores[turn_rows], len(cols.roles))}
+    loc_of_turn = np.asarray(cols.cand_loc, dtype=np.int64)[cand] if n_cand else np.zeros(0, np.int64)
+    tables["locations"] = {"location": label(cols.locations), **_group(loc_of_turn, scores, len(cols.locations))}
+    tables["languages"] = {"language": label(cols.langs), **_group(lang.astype(np.int64), scores, len(cols.langs))}
+    dated = day >= 0  # answers-only interviews have no turn timestamps
+    if dated.any():
+        day, d0 = day[dated], int(day[dated].min())
+        g = _group((day - d0).astype(np.int64), scores[dated], int(day.max()) - d0 + 1)
+        keep = g["turns"] > 0
+        days = (np.arange(len(keep)) + d0)[keep]
+        tables["daily"] = {"date": days.astype("datetime64[D]").astype(str), **{k: v[keep] for k, v in g.items()}}
+    return tables
+
+def write(tables: Dict[str, Dict[str, np.ndarray]], out: str, fmt: str) -> List[str]:
+    os.makedirs(out, exist_ok=True)
+    if fmt == "parquet":
+        import pyarrow as pa, pyarrow.parquet as pq
+        paths = []
+        for name, columns in tables.items():
+            path = os.path.join(out, f"{name}.parquet")
+            pq.write_table(pa.table({k: pa.array(v) for k, v in columns.items()}), path, compression="zstd")
+            paths.append(path)
+        return paths
+    path = os.path.join(out, "sentiment_summary.npz")
+    np.savez_compressed(path, **{f"{t}__{k}": v for t, cols in tables.items() for k, v in cols.items()})
+    return [path]
+
+def _default_format() -> str:
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "npz"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--format", choices=["parquet", "npz"], default=None, help="default: parquet if pyarrow is installed")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--chunk", type=int, default=2000, help="turns per worker task")
+    ap.add_argument("--detect-language", action="store_true")
+    ap.add_argument("--synthetic", type=int, default=0, metavar="N")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    source = synthetic_interviews(args.synthetic) if args.synthetic else stored_interviews()
+    cols = score(source, args.workers, args.chunk, args.detect_language)
+    t1 = time.perf_counter()
+    tables = aggregate(cols)
+    paths = write(tables, args.out, args.format or _default_format())
+    t2 = time.perf_counter()
+    n = int(tables["candidates"]["turns"].sum())
+    print(f"Scored {n} turns from {len(cols.cand_ids)} candidates in {t1 - t0:.2f}s "
+          f"({n / max(t1 - t0, 1e-9):,.0f} turns/s, {args.workers} workers); aggregated and wrote in {t2 - t1:.2f}s")
+    for p in paths:
+        print(f"  {p}")
+
+if __name__ == "__main__":
+    main()